@@ -0,0 +1,159 @@
+"""
+asyncio-based runner for checker subprocesses
+"""
+
+import asyncio
+import os
+import signal
+import subprocess
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import TypeVar
+
+from models import ProcessOutcome
+from scheduler import MEASURES_CHILDREN, MemoryAwareScheduler, reap
+
+T = TypeVar('T')
+
+
+def _new_group_options() -> dict:
+    """Spawn options that put the child in its own process group"""
+    if os.name == 'nt':
+        return {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {'start_new_session': True}
+
+
+def kill_process_group(process: asyncio.subprocess.Process | subprocess.Popen) -> None:
+    """Kill a checker and everything it started (npx -> node -> tsc)"""
+    if process.returncode is not None:
+        return
+    try:
+        if os.name == 'nt':
+            subprocess.run(['taskkill', '/T', '/F', '/PID', str(process.pid)], capture_output=True)
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+    except OSError:
+        pass  # Already gone
+
+
+async def _read_pipe(pipe) -> bytes:
+    """Read a subprocess pipe to the end without blocking the event loop"""
+    reader = asyncio.StreamReader()
+    transport, _ = await asyncio.get_running_loop().connect_read_pipe(
+        lambda: asyncio.StreamReaderProtocol(reader), pipe)
+    try:
+        return await reader.read()
+    finally:
+        transport.close()
+
+
+class AsyncCheckRunner:
+    """
+    Runs one checker subprocess per item from an event loop, starting a process only
+    when the scheduler has a free slot. A process that exceeds the timeout, or is
+    still running when the run is cancelled (Ctrl-C, or stop being set), has its
+    process group killed. Where os.wait4 is available the runner reaps each process
+    itself, so the scheduler learns that process's peak RSS.
+    """
+
+    def __init__(self, cwd: Path, scheduler: MemoryAwareScheduler, timeout: float | None,
+                 env: dict[str, str] | None = None, stop: threading.Event | None = None) -> None:
+        self.cwd = cwd
+        self.scheduler = scheduler
+        self.timeout = timeout
+        self.env = env
+        self.stop = stop
+
+    async def _run_one(self, argv: list[str], slots: asyncio.Condition) -> ProcessOutcome:
+        async with slots:
+            await slots.wait_for(self.scheduler.try_acquire)
+        outcome = None
+        try:
+            outcome = await self._spawn(argv)
+            return outcome
+        finally:
+            self.scheduler.release(outcome.peak_mb if outcome else None)
+            async with slots:
+                slots.notify_all()
+
+    async def _start(self, argv: list[str]) -> asyncio.subprocess.Process | subprocess.Popen:
+        if MEASURES_CHILDREN:
+            return subprocess.Popen(argv, cwd=self.cwd, env=self.env, stdin=subprocess.DEVNULL,
+                                    stdout=subprocess.PIPE, stderr=subprocess.PIPE, **_new_group_options())
+        return await asyncio.create_subprocess_exec(
+            *argv,
+            cwd=self.cwd,
+            env=self.env,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            **_new_group_options(),
+        )
+
+    async def _communicate(self, process: asyncio.subprocess.Process | subprocess.Popen) -> tuple[bytes, bytes]:
+        if isinstance(process, subprocess.Popen):
+            stdout, stderr = await asyncio.gather(_read_pipe(process.stdout), _read_pipe(process.stderr))
+            return stdout, stderr
+        return await process.communicate()
+
+    async def _wait(self, process: asyncio.subprocess.Process | subprocess.Popen) -> float | None:
+        """Wait for the process to exit; returns its peak RSS in MB when it could be measured"""
+        if isinstance(process, subprocess.Popen):
+            return await asyncio.get_running_loop().run_in_executor(None, reap, process)
+        await process.wait()
+        return None
+
+    async def _spawn(self, argv: list[str]) -> ProcessOutcome:
+        start = time.perf_counter()
+        try:
+            process = await self._start(argv)
+        except OSError as e:
+            return ProcessOutcome(None, error=str(e))
+
+        try:
+            stdout, stderr = await asyncio.wait_for(self._communicate(process), self.timeout)
+        except TimeoutError:
+            kill_process_group(process)
+            peak_mb = await self._wait(process)
+            return ProcessOutcome(None, error=f"timed out after {self.timeout:g}s",
+                                  duration=time.perf_counter() - start, started=start, peak_mb=peak_mb)
+        except asyncio.CancelledError:
+            kill_process_group(process)
+            await self._wait(process)
+            raise
+
+        try:
+            peak_mb = await self._wait(process)
+        except asyncio.CancelledError:
+            kill_process_group(process)  # Reaped by the wait already in progress
+            raise
+        return ProcessOutcome(process.returncode,
+                              stdout.decode('utf-8', errors='replace'),
+                              stderr.decode('utf-8', errors='replace'),
+                              duration=time.perf_counter() - start, started=start, peak_mb=peak_mb)
+
+    async def _run_all(self, jobs: list[tuple[T, list[str]]],
+                       on_complete: Callable[[T, ProcessOutcome], None]) -> None:
+        slots = asyncio.Condition()
+        tasks = {asyncio.create_task(self._run_one(argv, slots)): item for item, argv in jobs}
+        try:
+            async for task in asyncio.as_completed(tasks):
+                on_complete(tasks[task], task.result())
+                if self.stop is not None and self.stop.is_set():
+                    break
+        finally:
+            # On cancellation (or an exception in on_complete) reap every process before returning
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def run(self, jobs: list[tuple[T, list[str]]], on_complete: Callable[[T, ProcessOutcome], None]) -> None:
+        """
+        Run the (item, argv) jobs and call on_complete(item, outcome) in completion order.
+        Once stop is set, the remaining jobs are cancelled and their processes killed.
+        KeyboardInterrupt is re-raised once all child process groups are killed.
+        """
+        if jobs:
+            asyncio.run(self._run_all(jobs, on_complete))
@@ -0,0 +1,210 @@
+"""
+Batched checking (--batch): one compiler program per chapter or for the whole test
+tree, and one Node process for all JavaScript syntax checks
+"""
+
+import json
+import os
+import subprocess
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from models import CommandNotFoundError, Diagnostic, FileCheckResult, TestConfig
+from tracing import CHECK_CATEGORY
+
+if TYPE_CHECKING:
+    from type_checker import TypeChecker
+
+# Name of the generated tsconfig used by batched TypeScript checking
+BATCH_PROJECT_NAME = "tsconfig.batch.json"
+
+# Node script that syntax-checks a list of JavaScript files in one process
+JS_SYNTAX_CHECKER = Path(__file__).resolve().parent / "js_syntax_check.mjs"
+
+
+class BatchExecutor:
+    """
+    Checks many generated files per process and splits what the process reports back
+    into one result per file, shaped like the per-file checks' results.
+    """
+
+    def __init__(self, config: TestConfig, checker: "TypeChecker") -> None:
+        self.config = config
+        self.checker = checker
+
+    def _write_batch_project(self, project_dir: Path, ts_files: list[Path], name: str) -> Path:
+        """
+        Write a tsconfig that type-checks ts_files as one incremental program with the
+        options of the generated tsconfig.json. The .tsbuildinfo lives in the cache
+        directory so it survives workspace rebuilds.
+        """
+        build_info = (self.config.cache_dir / "tsbuildinfo" / f"{name}.tsbuildinfo").resolve()
+        build_info.parent.mkdir(parents=True, exist_ok=True)
+
+        base_config = Path(os.path.relpath(self.config.temp_dir / "tsconfig.json", project_dir)).as_posix()
+        if not base_config.startswith('.'):
+            base_config = './' + base_config
+        project = {
+            "extends": base_config,
+            "compilerOptions": {
+                "incremental": True,
+                "tsBuildInfoFile": build_info.as_posix(),
+            },
+            "files": [Path(os.path.relpath(f, project_dir)).as_posix() for f in sorted(ts_files)],
+            "include": [],
+        }
+
+        project_path = project_dir / BATCH_PROJECT_NAME
+        with open(project_path, 'w', encoding='utf-8') as f:
+            json.dump(project, f, indent=2)
+        return project_path
+
+    def check_typescript_project(self, project_path: Path, ts_files: list[Path]) -> list[FileCheckResult]:
+        """
+        Type-check a batch project with a single compiler process and split the
+        diagnostics back into one result per file, shaped like check_single_typescript_file.
+        """
+        checker = self.checker
+        relative_project = str(project_path.relative_to(self.config.temp_dir))
+        try:
+            with checker.tracer.span(relative_project, CHECK_CATEGORY, checker="ts", files=len(ts_files)):
+                result = checker.cmd_discovery.run_tsc(
+                    ['--project', relative_project, '--pretty', 'false'],
+                    self.config.temp_dir,
+                    env=checker.scheduler.child_env()
+                )
+        except (CommandNotFoundError, subprocess.CalledProcessError) as e:
+            error_msg = f"Error checking {relative_project}: {e}"
+            return [checker.tooling_failure(error_msg, "", "ts")]
+
+        # Diagnostics start with "path(line,col): error TS..."; indented lines continue the previous one
+        lines_by_file: dict[str, list[str]] = {}
+        unattributed: list[str] = []
+        current: list[str] = unattributed
+        for line in result.stdout.splitlines():
+            if not line.strip():
+                continue
+            if ': error TS' in line and '(' in line.split(': error TS', 1)[0]:
+                file_part = line.split('(')[0].replace('\\', '/').strip()
+                current = lines_by_file.setdefault(file_part, [])
+            elif not line.startswith(' '):
+                current = unattributed
+            current.append(line)
+
+        results: list[FileCheckResult] = []
+        for ts_file in ts_files:
+            relative_path = checker.records.relative_path(ts_file)
+            file_lines = lines_by_file.pop(relative_path, [])
+            file_output = f"Checking {ts_file.name}:"
+            if not file_lines:
+                results.append(FileCheckResult(file_output + " ✅ OK", [], file=relative_path))
+            else:
+                file_output += " ❌ FAILED\n" + '\n'.join(file_lines)
+                diagnostics = checker.parse_typescript_diagnostics('\n'.join(file_lines))
+                results.append(FileCheckResult(file_output, [d.summary() for d in diagnostics],
+                                               relative_path, diagnostics, file=relative_path))
+
+        # Diagnostics for files outside the batch (or with no file at all) still fail the run
+        for other_lines in lines_by_file.values():
+            unattributed.extend(other_lines)
+        if unattributed or (result.returncode != 0 and not any(r.failing_path for r in results)):
+            details = '\n'.join(unattributed) or result.stdout.strip() or result.stderr.strip()
+            error_msg = f"Error checking {relative_project}: {details}"
+            failure = checker.tooling_failure(error_msg, "", "ts")
+            failure.diagnostics = checker.parse_typescript_diagnostics(details) or failure.diagnostics
+            results.append(failure)
+        return results
+
+    def _check_and_cache_project(self, project_path: Path, ts_files: list[Path]) -> list[FileCheckResult]:
+        """Check a batch project and cache its per-file results unless the compiler run itself failed."""
+        results = self.check_typescript_project(project_path, ts_files)
+        self.checker.records.store_cached(ts_files, results, "ts")
+        return results
+
+    def run_typescript_check(self, ts_files: list[Path]) -> tuple[str, list[str], set[str]]:
+        """
+        Type-check .ts files as one program per chapter directory (batch_mode 'chapter')
+        or one program for the whole test tree (batch_mode 'tree').
+        """
+        if not ts_files:
+            return "✅ No TypeScript files to check", [], set()
+
+        results, uncached = self.checker.records.split_cached(ts_files, "ts")
+        self.checker.emit(results, "ts")
+
+        batches: dict[Path, list[Path]] = {}
+        for ts_file in uncached:
+            project_dir = self.config.temp_dir if self.config.batch_mode == 'tree' else ts_file.parent
+            batches.setdefault(project_dir, []).append(ts_file)
+
+        projects = {
+            self._write_batch_project(project_dir, files,
+                                      'tree' if project_dir == self.config.temp_dir
+                                      else f"chapter-{project_dir.name}"): files
+            for project_dir, files in batches.items()
+        }
+
+        if projects:
+            print(f"Checking {len(uncached)} TypeScript files as {len(projects)} batched program(s)...")
+        batch_results = self.checker.run_in_parallel(
+            list(projects),
+            lambda project: self._check_and_cache_project(project, projects[project]),
+            "ts"
+        ) if projects else []
+
+        for batch in batch_results:
+            results.extend(batch if isinstance(batch, list) else [batch])
+        return self.checker.summarize_results(results, len(ts_files), "TypeScript")
+
+    def check_javascript_batch(self, js_files: list[Path]) -> list[FileCheckResult]:
+        """
+        Syntax-check JavaScript files with one Node process running js_syntax_check.mjs.
+        Each file is parsed in isolation and reported with its error type, message, line and column.
+        """
+        checker = self.checker
+        relative_paths = [checker.records.relative_path(js_file) for js_file in js_files]
+        try:
+            with checker.tracer.span(JS_SYNTAX_CHECKER.name, CHECK_CATEGORY, checker="js", files=len(js_files)):
+                result = checker.cmd_discovery.run_node(
+                    ['--experimental-vm-modules', '--no-warnings', str(JS_SYNTAX_CHECKER)],
+                    self.config.temp_dir,
+                    input=json.dumps(relative_paths),
+                    env=checker.scheduler.child_env()
+                )
+            file_reports = json.loads(result.stdout)
+        except (CommandNotFoundError, subprocess.CalledProcessError, OSError, ValueError) as e:
+            error_msg = f"Error checking JavaScript batch: {e}"
+            return [checker.tooling_failure(error_msg, "", "js")]
+
+        results: list[FileCheckResult] = []
+        for js_file, relative_path, report in zip(js_files, relative_paths, file_reports):
+            file_output = f"Checking {js_file.name}:"
+            if report["ok"]:
+                results.append(FileCheckResult(file_output + " ✅ OK", [], file=relative_path))
+                continue
+
+            location = f"{relative_path}:{report['line']}:{report['column']}" if report["line"] else relative_path
+            file_output += f" ❌ FAILED\n{location}\n{report['errorType']}: {report['message']}"
+            error_msg = f"JS Syntax Error in {js_file.name}: {report['errorType']}: {report['message']}"
+            if report["line"]:
+                error_msg += f" (line {report['line']}, column {report['column']})"
+            diagnostic = Diagnostic(relative_path, report["line"], report["column"],
+                                    report["errorType"], report["message"], checker="js")
+            results.append(FileCheckResult(file_output, [error_msg], relative_path, [diagnostic],
+                                           file=relative_path))
+        return results
+
+    def run_javascript_check(self, js_files: list[Path]) -> tuple[str, list[str], set[str]]:
+        """Syntax-check all JavaScript files in a single Node process."""
+        if not js_files:
+            return "✅ No JavaScript files to check", [], set()
+
+        results, uncached = self.checker.records.split_cached(js_files, "js")
+        self.checker.emit(results, "js")
+        if uncached:
+            print(f"Checking {len(uncached)} JavaScript files in one batched process...")
+            batch_results = self.check_javascript_batch(uncached)
+            self.checker.records.store_cached(uncached, batch_results, "js")
+            self.checker.emit(batch_results, "js")
+            results.extend(batch_results)
+        return self.checker.summarize_results(results, len(js_files), "JavaScript")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark for code extraction throughput
+
+Compares the previous whole-file regex extractor with the streaming fence
+parser on a synthetic book, reporting time, throughput and how many
+examples each one finds.
+
+Usage:
+    python bench_extract.py --chapters 40 --examples 200 --repeat 3
+"""
+
+import argparse
+import re
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from extractor import CodeExtractor
+from models import CodeType, TestConfig
+from synthetic_book import write_synthetic_book
+
+# The extractor's previous pattern, kept here as the baseline
+LEGACY_PATTERN = re.compile(r'```(ts|js)\n(.*?)\n```', re.DOTALL)
+
+
+def legacy_extract(markdown_file: Path) -> int:
+    """Extract examples the way the regex extractor did: read the whole file, then scan it"""
+    with open(markdown_file, 'r', encoding='utf-8') as f:
+        content = f.read()
+    matches: list[tuple[str, CodeType]] = []
+    for match in LEGACY_PATTERN.finditer(content):
+        code = match.group(2).strip()
+        if code:
+            matches.append((code, CodeType.TYPESCRIPT if match.group(1) == 'ts' else CodeType.JAVASCRIPT))
+    return len(matches)
+
+
+def time_extractor(extract: Callable[[Path], int], files: list[Path], repeat: int) -> tuple[list[float], int]:
+    """Run extract over every file repeat times; return per-pass durations and examples found"""
+    durations: list[float] = []
+    found = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        found = sum(extract(markdown_file) for markdown_file in files)
+        durations.append(time.perf_counter() - start)
+    return durations, found
+
+
+def main() -> None:
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Compare regex and streaming code extraction')
+    parser.add_argument('--chapters', type=int, default=40,
+                        help='Chapters in the synthetic book (default: %(default)s)')
+    parser.add_argument('--examples', type=int, default=200,
+                        help='Code blocks per chapter (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Passes over the book per extractor (default: %(default)s)')
+    parser.add_argument('--crlf', action='store_true',
+                        help='Use CRLF line endings')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as book_dir:
+        expected, _ = write_synthetic_book(Path(book_dir), args.chapters, args.examples, args.crlf)
+        files = sorted(Path(book_dir).glob("*.md"))
+        megabytes = sum(f.stat().st_size for f in files) / (1024 * 1024)
+        print(f"📚 Synthetic book: {len(files)} chapters, {megabytes:.1f} MB, {expected} code examples")
+
+        extractor = CodeExtractor(TestConfig.from_args(book_dir=book_dir))
+
+        def streaming_extract(markdown_file: Path) -> int:
+            return sum(1 for _ in extractor.iter_code_blocks(markdown_file))
+
+        print(f"\n{'extractor':<12} {'examples':>9} {'median s':>9} {'MB/s':>8}")
+        for label, extract in [("regex", legacy_extract), ("streaming", streaming_extract)]:
+            durations, found = time_extractor(extract, files, args.repeat)
+            median = statistics.median(durations)
+            print(f"{label:<12} {found:>9} {median:>9.3f} {megabytes / median:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the memory held by extracted examples
+
+Extracts a synthetic book (about 100k examples by default) twice and keeps
+the whole list alive, as a run does through file generation and reporting:
+once into the previous CodeExample layout (a plain dataclass holding a
+copy of every snippet) and once into the compact one (__slots__, offsets
+into the code text shared per chapter). Reports traced memory, bytes per
+example and the time to build, and then to materialize, all the code.
+
+Usage:
+    python bench_memory.py --chapters 100 --examples 1170
+"""
+
+import argparse
+import gc
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from extractor import CodeExtractor, iter_block_spans
+from models import ChapterSource, CodeType, TestConfig
+from synthetic_book import write_synthetic_book
+
+
+@dataclass
+class LegacyCodeExample:
+    """The previous CodeExample layout, kept here as the baseline"""
+    chapter: str
+    number: int
+    code: str
+    source_file: str
+    code_type: CodeType
+    filename: str = ""
+    start_line: int = 0
+    end_line: int = 0
+
+    def __post_init__(self) -> None:
+        if not self.filename:
+            self.filename = f"{self.chapter}_example_{self.number:02d}.{self.code_type.value}"
+
+
+def extract_legacy(extractor: CodeExtractor) -> list[LegacyCodeExample]:
+    """Extract every example with its own copy of the code, as before"""
+    examples: list[LegacyCodeExample] = []
+    for markdown_file in extractor.find_markdown_files():
+        chapter = ChapterSource(str(markdown_file))  # Dropped after the file: only the copies are kept
+        with open(markdown_file, 'r', encoding='utf-8', newline='') as f:
+            for number, (code_type, block) in enumerate(iter_block_spans(f, chapter), 1):
+                examples.append(LegacyCodeExample(markdown_file.stem, number, chapter.code(block), str(markdown_file),
+                                                  code_type, start_line=chapter.block_field(block, 3),
+                                                  end_line=chapter.block_field(block, 4)))
+    return examples
+
+
+def measure(build: Callable[[], list]) -> tuple[list, int, int, float]:
+    """Build the example list under tracemalloc; return it with retained bytes, peak bytes and seconds"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    examples = build()
+    seconds = time.perf_counter() - start
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return examples, retained, peak, seconds
+
+
+def main() -> None:
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Compare the memory of copied and compact extracted examples')
+    parser.add_argument('--chapters', type=int, default=100,
+                        help='Chapters in the synthetic book (default: %(default)s)')
+    parser.add_argument('--examples', type=int, default=1170,
+                        help='Code blocks per chapter (default: %(default)s)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as book_dir:
+        expected, _ = write_synthetic_book(Path(book_dir), args.chapters, args.examples)
+        megabytes = sum(f.stat().st_size for f in Path(book_dir).glob("*.md")) / (1024 * 1024)
+        print(f"📚 Synthetic book: {args.chapters} chapters, {megabytes:.1f} MB, {expected} code examples")
+
+        extractor = CodeExtractor(TestConfig.from_args(book_dir=book_dir))
+        print(f"\n{'layout':<10} {'examples':>9} {'retained MB':>12} {'peak MB':>9} {'B/example':>10} "
+              f"{'instance B':>11} {'extract s':>10} {'code s':>8}")
+        for label, build in [("copied", lambda: extract_legacy(extractor)),
+                             ("compact", extractor.extract_all_examples)]:
+            examples, retained, peak, seconds = measure(build)
+            start = time.perf_counter()
+            sum(len(example.code) for example in examples)
+            materialize = time.perf_counter() - start
+            first = examples[0]
+            instance = sys.getsizeof(first) + (sys.getsizeof(vars(first)) if hasattr(first, '__dict__') else 0)
+            print(f"{label:<10} {len(examples):>9} {retained / 2**20:>12.1f} {peak / 2**20:>9.1f} "
+                  f"{retained / max(1, len(examples)):>10.0f} {instance:>11} {seconds:>10.2f} {materialize:>8.2f}")
+            del examples
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the example tester pipeline
+
+Generates a synthetic book and times each phase separately: extraction,
+test file generation, checking and report rendering. With --fake the
+checks run against fake_toolchain.py instead of tsc/node, so results do
+not depend on Node. Results are written as JSON and can be compared with
+an earlier run.
+
+Usage:
+    python bench_pipeline.py --fake --chapters 10 --examples 50 --error-rate 0.1
+    python bench_pipeline.py --fake --output after.json --compare before.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from fake_toolchain import FakeCommandDiscovery
+from main import ExampleTester
+from models import TestConfig
+from synthetic_book import write_synthetic_book
+
+PHASES = ["extract", "generate", "check", "report"]
+
+
+def run_pipeline(book_dir: Path, work_dir: Path, args: argparse.Namespace) -> tuple[dict[str, float], int, int]:
+    """Run the pipeline once; return seconds per phase, examples found and errors reported"""
+    work_dir.mkdir(parents=True)
+    config = TestConfig.from_args(
+        book_dir=book_dir,
+        temp_dir=work_dir / "test",
+        cache_dir=work_dir / "cache",
+        use_cache=args.cache,
+        batch_mode=args.batch,
+        executor=args.executor,
+        results_stream=work_dir / "test_results.jsonl",
+    )
+    tester = ExampleTester(config)
+    if args.fake:
+        fake = FakeCommandDiscovery(args.latency)
+        tester.cmd_discovery = tester.type_checker.cmd_discovery = fake
+        tester.type_checker.provisioner.cmd_discovery = fake
+
+    timings: dict[str, float] = {}
+    start = time.perf_counter()
+    examples = tester.extractor.extract_all_examples()
+    timings["extract"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tester.file_generator.create_test_files(examples)
+    timings["generate"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tester.sink.open(examples=len(examples))
+    ts_output, js_output, errors, diagnostics = tester.type_checker.run_checks(examples)
+    tester.sink.close()
+    timings["check"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tester.file_generator.create_consolidated_file(examples, ts_output, js_output, diagnostics,
+                                                   config.results_stream, work_dir / "test_results.txt")
+    timings["report"] = time.perf_counter() - start
+    return timings, len(examples), len(errors)
+
+
+def summarize(samples: list[float]) -> dict[str, float | list[float]]:
+    """Statistics for one phase"""
+    return {
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "max": max(samples),
+        "samples": samples,
+    }
+
+
+def print_comparison(result: dict, baseline: dict) -> None:
+    """Print the change in median time per phase against an earlier result"""
+    print(f"\n{'phase':<10} {'before s':>9} {'after s':>9} {'change':>8}")
+    for phase in PHASES + ["total"]:
+        before = baseline.get("phases", {}).get(phase, {}).get("median")
+        after = result["phases"][phase]["median"]
+        if before:
+            print(f"{phase:<10} {before:>9.3f} {after:>9.3f} {(after - before) / before:>+8.1%}")
+
+
+def main() -> None:
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Time each phase of the example tester on a synthetic book')
+    parser.add_argument('--chapters', type=int, default=10,
+                        help='Chapters in the synthetic book (default: %(default)s)')
+    parser.add_argument('--examples', type=int, default=50,
+                        help='Code blocks per chapter (default: %(default)s)')
+    parser.add_argument('--error-rate', type=float, default=0.1,
+                        help='Share of examples with a deliberate error (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Pipeline runs, each in a fresh workspace (default: %(default)s)')
+    parser.add_argument('--fake', action='store_true',
+                        help='Check with fake_toolchain.py instead of tsc/node')
+    parser.add_argument('--latency', type=float, default=0.0, metavar='MS',
+                        help='Extra time each fake check takes (default: %(default)s)')
+    parser.add_argument('--executor', choices=['thread', 'async'], default='thread',
+                        help='Executor for per-file checks (default: %(default)s)')
+    parser.add_argument('--batch', choices=['chapter', 'tree'],
+                        help='Batch mode for checks')
+    parser.add_argument('--cache', action='store_true',
+                        help='Keep the result cache enabled (runs still start from an empty cache)')
+    parser.add_argument('--output', default='bench_pipeline.json',
+                        help='Where to write the JSON results (default: %(default)s)')
+    parser.add_argument('--compare',
+                        help='Earlier JSON results to compare against')
+    parser.add_argument('--verbose', action='store_true',
+                        help="Show the tester's own output")
+    args = parser.parse_args()
+
+    samples: dict[str, list[float]] = {phase: [] for phase in PHASES + ["total"]}
+    with tempfile.TemporaryDirectory() as scratch:
+        book_dir = Path(scratch) / "book"
+        generated, broken = write_synthetic_book(book_dir, args.chapters, args.examples,
+                                                 error_rate=args.error_rate)
+        print(f"📚 Synthetic book: {args.chapters} chapters, {generated} examples, {broken} broken")
+
+        for run in range(args.repeat):
+            output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+            with output:
+                timings, found, errors = run_pipeline(book_dir, Path(scratch) / f"run_{run}", args)
+            for phase in PHASES:
+                samples[phase].append(timings[phase])
+            samples["total"].append(sum(timings.values()))
+            print(f"   run {run + 1}: " + ", ".join(f"{phase} {timings[phase]:.3f}s" for phase in PHASES))
+
+    result = {
+        "benchmark": "pipeline",
+        "created": datetime.now().isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {
+            "chapters": args.chapters, "examples_per_chapter": args.examples, "error_rate": args.error_rate,
+            "repeat": args.repeat, "fake": args.fake, "latency_ms": args.latency,
+            "executor": args.executor, "batch": args.batch, "cache": args.cache,
+        },
+        "examples": found,
+        "broken_examples": broken,
+        "errors_reported": errors,
+        "phases": {phase: summarize(values) for phase, values in samples.items()},
+    }
+
+    print(f"\n{'phase':<10} {'median s':>9} {'min s':>9}")
+    for phase in PHASES + ["total"]:
+        print(f"{phase:<10} {result['phases'][phase]['median']:>9.3f} {result['phases'][phase]['min']:>9.3f}")
+    if errors != broken:
+        print(f"⚠️  Reported {errors} errors for {broken} broken examples")
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+    print(f"📝 Wrote {args.output}")
+
+    if args.compare:
+        try:
+            with open(args.compare, 'r', encoding='utf-8') as f:
+                print_comparison(result, json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Could not read {args.compare}: {e}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
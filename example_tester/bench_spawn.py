@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for checker process spawn overhead
+
+Times the per-example cost of the old invocation path (the command line run
+through a shell with shell=True: npx tsc, or the discovered node command)
+against direct invocation of node_modules/typescript/bin/tsc and node with an
+argument vector, over the book's own examples.
+
+Usage:
+    python bench_spawn.py --chapters 3 --limit 20
+"""
+
+import argparse
+import os
+import shlex
+import statistics
+import subprocess
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from file_generator import COMPILER_OPTIONS, option_args
+from main import ExampleTester
+from models import TestConfig
+from utils import CommandDiscovery
+
+
+def time_spawns(run: Callable[[str], object], files: list[str], repeat: int) -> list[float]:
+    """Run one spawn per file (repeat times) and return each duration in seconds"""
+    durations: list[float] = []
+    for _ in range(repeat):
+        for file in files:
+            start = time.perf_counter()
+            run(file)
+            durations.append(time.perf_counter() - start)
+    return durations
+
+
+def run_through_shell(discovery: CommandDiscovery, cmd_type: str, args: list[str],
+                      temp_dir: Path) -> subprocess.CompletedProcess[str]:
+    """The invocation before direct exec: npx tsc or node, as one command line run by a shell"""
+    discovery.use_direct = False
+    argv = discovery.command_vector(cmd_type, temp_dir) + args
+    command_line = subprocess.list2cmdline(argv) if os.name == 'nt' else shlex.join(argv)
+    return subprocess.run(command_line, cwd=temp_dir, capture_output=True, text=True, shell=True)
+
+
+def run_direct(discovery: CommandDiscovery, cmd_type: str, args: list[str],
+               temp_dir: Path) -> subprocess.CompletedProcess[str]:
+    """The current invocation: the local tsc script or node, exec'd with an argument vector"""
+    discovery.use_direct = True
+    return discovery.run_direct(discovery.command_vector(cmd_type, temp_dir) + args, temp_dir)
+
+
+def print_row(label: str, durations: list[float]) -> None:
+    """Print one benchmark row"""
+    if not durations:
+        print(f"{label:<32} {'-':>7}")
+        return
+    print(f"{label:<32} {len(durations):>7} {sum(durations):>9.2f} "
+          f"{statistics.mean(durations) * 1000:>9.1f} {statistics.median(durations) * 1000:>9.1f}")
+
+
+def main() -> None:
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Measure per-spawn overhead of tsc/node invocation paths')
+    parser.add_argument('--book-dir', default=r'.\docs\Chapters',
+                        help='Directory containing markdown files (default: %(default)s)')
+    parser.add_argument('--temp-dir', default='test_bench',
+                        help='Directory for generated example files (default: %(default)s)')
+    parser.add_argument('--chapters', type=int, nargs='+',
+                        help='Benchmark only specific chapters')
+    parser.add_argument('--limit', type=int, default=20,
+                        help='Maximum number of files per language (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='Number of passes over the files (default: %(default)s)')
+    args = parser.parse_args()
+
+    config = TestConfig.from_args(book_dir=args.book_dir, temp_dir=args.temp_dir,
+                                  specific_chapters=args.chapters, sync_workspace=True)
+    tester = ExampleTester(config)
+    examples = tester.extractor.extract_all_examples()
+    tester.file_generator.create_test_files(examples)
+    tester.type_checker.provisioner.provision()
+
+    discovery = tester.cmd_discovery
+    temp_dir = config.temp_dir
+    ts_files = [str(f.relative_to(temp_dir)) for f in tester.type_checker.find_typescript_files()[:args.limit]]
+    js_files = [str(f.relative_to(temp_dir)) for f in tester.type_checker.find_javascript_files()[:args.limit]]
+
+    if discovery.resolve_tsc(temp_dir) is None:
+        print("⚠️  Local TypeScript compiler not found; direct tsc rows fall back to npx without a shell")
+
+    def row(label: str, files: list[str], invoke: Callable, cmd_type: str,
+            args: Callable[[str], list[str]]) -> tuple[str, list[str], Callable[[str], object]]:
+        return label, files, lambda file: invoke(discovery, cmd_type, args(file), temp_dir)
+
+    rows = [
+        row("tsc --version (shell + npx)", [""], run_through_shell, 'tsc', lambda _: ['--version']),
+        row("tsc --version (direct)", [""], run_direct, 'tsc', lambda _: ['--version']),
+        row("tsc per example (shell + npx)", ts_files, run_through_shell, 'tsc',
+            lambda f: [*option_args(COMPILER_OPTIONS), f]),
+        row("tsc per example (direct)", ts_files, run_direct, 'tsc', lambda f: [*option_args(COMPILER_OPTIONS), f]),
+        row("node --check (shell)", js_files, run_through_shell, 'node', lambda f: ['--check', f]),
+        row("node --check (direct)", js_files, run_direct, 'node', lambda f: ['--check', f]),
+    ]
+
+    # Warm up discovery and the OS file cache so the first row isn't penalized
+    discovery.discover_commands()
+    discovery.run_tsc(['--version'], temp_dir)
+
+    print(f"\n{'mode':<32} {'spawns':>7} {'total s':>9} {'mean ms':>9} {'median ms':>9}")
+    results: dict[str, list[float]] = {}
+    for label, files, run in rows:
+        repeat = args.repeat * (5 if files == [""] else 1)
+        results[label] = time_spawns(run, files, repeat) if files else []
+        print_row(label, results[label])
+
+    for before, after in [("tsc --version (shell + npx)", "tsc --version (direct)"),
+                          ("tsc per example (shell + npx)", "tsc per example (direct)"),
+                          ("node --check (shell)", "node --check (direct)")]:
+        if results[before] and results[after]:
+            saved = statistics.mean(results[before]) - statistics.mean(results[after])
+            print(f"📉 {after}: {saved * 1000:.1f} ms saved per spawn "
+                  f"({statistics.mean(results[before]) / statistics.mean(results[after]):.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
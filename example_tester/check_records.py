@@ -0,0 +1,172 @@
+"""
+Bookkeeping shared by the checkers: the example behind each generated file, its cached
+result, its recorded check duration, and how long each check phase took
+"""
+
+from collections.abc import Callable
+from pathlib import Path
+
+from durations import DurationHistory, simulate_makespan
+from last_failed import LastFailed
+from models import CodeExample, FileCheckResult, Makespan, TestConfig
+from result_cache import ResultCache
+from scheduler import MemoryAwareScheduler
+from tracing import CHECK_CATEGORY, Tracer
+
+
+class CheckRecords:
+    """
+    What a run knows about the generated files it checks, keyed by their path relative
+    to the test directory. Caches results per example, orders files slowest first from
+    the durations recorded in earlier runs, and compares each phase's wall-clock time
+    with what those durations predicted.
+    """
+
+    def __init__(self, config: TestConfig, tracer: Tracer, scheduler: MemoryAwareScheduler) -> None:
+        self.config = config
+        self.tracer = tracer
+        self.scheduler = scheduler
+        self.examples_by_file: dict[str, CodeExample] = {}
+        self.result_cache: ResultCache | None = None
+        self.durations = DurationHistory(config.cache_dir / "durations.json")
+        # Per-snippet times inside the compiler host leave out process startup, so they are kept apart
+        self.host_durations = DurationHistory(config.cache_dir / "host_durations.json")
+        self.last_failed = LastFailed(config.cache_dir / "last_failed.json")
+        self.makespans: dict[str, Makespan] = {}
+        self._measured: dict[str, float] = {}  # Check durations of the current phase by relative path
+        self._with_history = 0  # Files of the current phase with a recorded duration
+
+    def load(self, examples: list[CodeExample]) -> None:
+        """Start a run over the generated files of examples, with the history of earlier runs"""
+        self.track(examples)
+        self.makespans = {}
+        self.durations.load()
+        self.host_durations.load()
+        self.last_failed.load()
+
+    def track(self, examples: list[CodeExample]) -> None:
+        """Map the generated files of examples back to them"""
+        self.examples_by_file = {example.filename.replace('\\', '/'): example for example in examples}
+
+    def save(self) -> None:
+        """Keep the check durations of this run for the next one"""
+        self.durations.save()
+        self.host_durations.save()
+
+    def relative_path(self, file: Path) -> str:
+        """Path of a generated file relative to the test directory, with forward slashes"""
+        return str(file.relative_to(self.config.temp_dir)).replace('\\', '/')
+
+    def example(self, file: Path) -> CodeExample | None:
+        """The example behind a generated file, if it is known"""
+        return self.examples_by_file.get(self.relative_path(file))
+
+    def cache_key(self, file: Path, checker: str) -> str | None:
+        """Cache key for the example behind a generated file, if it is known"""
+        if self.result_cache is None:
+            return None
+        example = self.example(file)
+        if example is None:
+            return None
+        return self.result_cache.key(example.code, example.code_type, checker)
+
+    def cached(self, checker: str, single_file_checker: Callable[[Path], FileCheckResult]
+               ) -> Callable[[Path], FileCheckResult]:
+        """Wrap a single-file checker so cache hits are answered without a subprocess"""
+        def check(file: Path) -> FileCheckResult:
+            key = self.cache_key(file, checker)
+            if key is None:
+                return single_file_checker(file)
+            assert self.result_cache is not None
+            cached = self.result_cache.get(key, self.relative_path(file))
+            if cached is not None:
+                return cached
+            result = single_file_checker(file)
+            if not result.tooling_failure:
+                self.result_cache.put(key, self.relative_path(file), result)
+            return result
+        return check
+
+    def split_cached(self, files: list[Path], checker: str) -> tuple[list[FileCheckResult], list[Path]]:
+        """Answer what the cache can and return (cached results, files still to check)."""
+        cached_results: list[FileCheckResult] = []
+        uncached: list[Path] = []
+        for file in files:
+            key = self.cache_key(file, checker)
+            cached = self.result_cache.get(key, self.relative_path(file)) if key and self.result_cache else None
+            if cached is not None:
+                cached_results.append(cached)
+            else:
+                uncached.append(file)
+        return cached_results, uncached
+
+    def store_cached(self, files: list[Path], results: list[FileCheckResult], checker: str) -> None:
+        """Cache one result per file, unless a batch-level tooling failure was reported."""
+        if self.result_cache is None or any(r.tooling_failure for r in results):
+            return
+        for file, result in zip(files, results):
+            key = self.cache_key(file, checker)
+            if key is not None:
+                self.result_cache.put(key, self.relative_path(file), result)
+
+    def record_check(self, file: Path, checker: str, start: float, end: float, error: str = "",
+                     durations: DurationHistory | None = None) -> None:
+        """
+        Trace the checker subprocess of a generated file and, if it finished,
+        remember how long the check took (in durations, default self.durations)
+        """
+        relative_path = self.relative_path(file)
+        args: dict[str, object] = {"file": relative_path, "checker": checker}
+        example = self.examples_by_file.get(relative_path)
+        if example is not None:
+            args["source"] = f"{Path(example.source_file).name}:{example.start_line}"
+        if error:
+            args["error"] = error
+        self.tracer.add(relative_path, CHECK_CATEGORY, start, end, **args)
+        if error:
+            return
+
+        self._measured[relative_path] = end - start
+        identity = self.identity(file)
+        if identity is not None:
+            (durations or self.durations).record(identity, end - start)
+
+    def identity(self, file: Path) -> str | None:
+        """Identity of the example behind a generated file, if it is known"""
+        example = self.example(file)
+        return example.identity if example else None
+
+    def previously_failed(self, file: Path) -> bool:
+        """Whether the example behind a generated file failed in the last run"""
+        example = self.example(file)
+        return example is not None and example in self.last_failed
+
+    def longest_first(self, files: list[Path], durations: DurationHistory | None = None
+                      ) -> tuple[list[Path], dict[Path, float]]:
+        """
+        Order files with the examples that failed last run first, then by their check
+        duration recorded in durations (default self.durations), slowest first, and
+        return the estimates
+        """
+        durations = durations or self.durations
+        estimates = {file: durations.estimate(self.identity(file)) for file in files}
+        self._with_history = sum(1 for file in files if self.identity(file) in durations)
+        self._measured = {}
+        return sorted(files, key=lambda file: (self.previously_failed(file), estimates[file]), reverse=True), estimates
+
+    def record_makespan(self, checker_name: str, listing_order: list[Path], scheduled: list[Path],
+                        estimates: dict[Path, float], actual: float) -> None:
+        """Compare the phase's wall-clock time with what the recorded durations predicted"""
+        ran = [file for file in scheduled if self.relative_path(file) in self._measured]
+        if not ran:
+            return
+        workers = self.scheduler.phase_level
+        ran_set = set(ran)
+        self.makespans[checker_name] = Makespan(
+            expected=simulate_makespan([estimates[file] for file in ran], workers),
+            listing_order=simulate_makespan([estimates[file] for file in listing_order if file in ran_set], workers),
+            actual=actual,
+            jobs=len(ran),
+            workers=workers,
+            with_history=min(self._with_history, len(ran)),
+        )
@@ -0,0 +1,78 @@
+"""
+Per-example check duration history used for longest-job-first scheduling
+"""
+
+import heapq
+import json
+import os
+import statistics
+import threading
+from pathlib import Path
+
+# Weight of the newest measurement in the running average of an example's duration
+SMOOTHING = 0.5
+
+# Assumed duration in seconds when nothing has been recorded yet
+DEFAULT_DURATION = 1.0
+
+
+class DurationHistory:
+    """
+    Remembers how long each example took to check, keyed by CodeExample.identity,
+    so later runs can start the slowest examples first.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._durations: dict[str, float] = {}
+        self._median: float | None = None  # Estimate for unknown examples, computed on first use
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        """Read the recorded durations (a missing or corrupt file starts an empty history)"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._durations = {key: float(value) for key, value in json.load(f).items()}
+        except (OSError, ValueError, AttributeError):
+            self._durations = {}
+        self._median = None
+
+    def save(self) -> None:
+        """Write the history atomically"""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_suffix(".tmp")
+            with self._lock, open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._durations, f, indent=1, sort_keys=True)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"⚠️  Warning: Could not save check durations: {e}")
+
+    def record(self, identity: str, seconds: float) -> None:
+        """Fold a new measurement into the example's running average"""
+        with self._lock:
+            previous = self._durations.get(identity)
+            self._durations[identity] = seconds if previous is None else (
+                SMOOTHING * seconds + (1 - SMOOTHING) * previous)
+            self._median = None
+
+    def __contains__(self, identity: object) -> bool:
+        return identity in self._durations
+
+    def estimate(self, identity: str | None) -> float:
+        """Expected duration of an example; unknown examples get the median of the known ones"""
+        with self._lock:
+            if identity is not None and identity in self._durations:
+                return self._durations[identity]
+            if self._median is None:
+                self._median = (statistics.median(self._durations.values()) if self._durations
+                                else DEFAULT_DURATION)
+            return self._median
+
+
+def simulate_makespan(durations: list[float], workers: int) -> float:
+    """Wall-clock time for running jobs in the given order on workers that each take the next job when free"""
+    finish_times = [0.0] * max(1, min(workers, len(durations)))
+    for duration in durations:
+        heapq.heappush(finish_times, heapq.heappop(finish_times) + duration)
+    return max(finish_times, default=0.0)
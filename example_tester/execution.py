@@ -0,0 +1,172 @@
+"""
+Expected-output annotations and sandboxing for --execute
+"""
+
+import re
+from collections.abc import Iterable
+
+from models import ExpectedOutput
+
+# "// Output:" starts a block of expected output lines; text after the colon is its first line
+OUTPUT_BLOCK_PATTERN = re.compile(r'^\s*//\s*Output:\s?(?P<first>.*)$')
+COMMENT_LINE_PATTERN = re.compile(r'^\s*//\s?(?P<text>.*)$')
+
+# A top-level "console.log(...) // value" line
+INLINE_LOG_PATTERN = re.compile(r'^console\.log\(.*\)\s*;?\s*//\s*(?P<expected>.+?)\s*$')
+
+# Examples whose output order or completion depends on the event loop are not verified from inline comments
+ASYNC_PATTERN = re.compile(r'\b(?:setTimeout|setInterval|setImmediate|Promise|async|await|queueMicrotask)\b')
+
+# Trailing remark in an inline annotation, e.g. '// "object" (confusing but historical!)'
+REMARK_PATTERN = re.compile(r'\s+\([^)]*\)$')
+
+# Words around the value in an inline annotation, e.g. "// false - each symbol is unique", "// Still 5000"
+PREFIX_SEPARATOR = re.compile(r'^(?:\s*[-:,;(]|\s+)')
+SUFFIX_SEPARATOR = re.compile(r'(?:[-:,;=]\s*|\s+)$')
+
+# A comment line that keeps an example from being run, e.g. one that needs a browser
+SKIP_MARKER_PATTERN = re.compile(r'^\s*//\s*@skip-execute\b', re.MULTILINE)
+
+# How the result of an example that was not run, or that only has warnings, is marked
+SKIPPED_LABEL = "⏭️  SKIPPED: "
+WARNING_LABEL = "⚠️  WARNING"
+MARKED_REASON = "marked // @skip-execute"
+
+# Message of the ReferenceError thrown for an undeclared identifier
+NOT_DEFINED_PATTERN = re.compile(r'^(?P<name>[\w$]+) is not defined$')
+
+
+def skips_execution(code: str) -> bool:
+    """Whether an example is marked with a "// @skip-execute" comment"""
+    return SKIP_MARKER_PATTERN.search(code) is not None
+
+
+def undefined_name(error_name: str, message: str) -> str | None:
+    """The identifier of a ReferenceError 'X is not defined' (None for other errors)"""
+    match = NOT_DEFINED_PATTERN.match(message) if error_name == "ReferenceError" else None
+    return match['name'] if match else None
+
+
+def declares(code: str, name: str) -> bool:
+    """Whether code declares name at the start of a statement (variable, function, class or import)"""
+    escaped = re.escape(name)
+    return re.search(
+        rf'^\s*(?:export\s+)?(?:(?:const|let|var|class|(?:async\s+)?function\*?)\s+{escaped}\b'
+        rf'|(?:const|let|var)\s*[{{\[][^=]*(?<![\w$]){escaped}(?![\w$])'
+        rf'|import\b[^;]*(?<![\w$]){escaped}(?![\w$]))', code, re.MULTILINE) is not None
+
+
+def expected_output(code: str) -> ExpectedOutput | None:
+    """
+    The output an example documents: a "// Output:" comment block (compared exactly), or
+    else a trailing comment on every console.log line when they are all top-level
+    statements (compared leniently, since such comments are written for readers, and
+    only reported as warnings)
+    """
+    lines = code.splitlines()
+    for index, line in enumerate(lines):
+        match = OUTPUT_BLOCK_PATTERN.match(line)
+        if match:
+            expected = [match['first'].rstrip()] if match['first'].strip() else []
+            for following in lines[index + 1:]:
+                comment = COMMENT_LINE_PATTERN.match(following)
+                if not comment:
+                    break
+                expected.append(comment['text'].rstrip())
+            return ExpectedOutput(expected, lenient=False)
+
+    log_lines = [line for line in lines if 'console.' in line and not line.lstrip().startswith('//')]
+    if not log_lines or ASYNC_PATTERN.search(code):
+        return None
+    matches = [INLINE_LOG_PATTERN.match(line) for line in log_lines]
+    if not all(matches):
+        return None
+    expected = [match['expected'] for match in matches if match]
+    if any('Error' in value for value in expected):
+        return None  # Annotates a throw rather than printed output
+    return ExpectedOutput(expected, lenient=True)
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r'\s+', ' ', text.replace('"', "'")).strip()
+
+
+def line_matches(actual: str, expected: str, lenient: bool) -> bool:
+    """
+    Compare one printed line with its annotation. Leniently, quote style and spacing
+    are ignored, a quoted annotation matches the bare string console.log prints, a
+    trailing remark in parentheses may be dropped, and the printed value may be the
+    first or last word of an annotation that explains it.
+    """
+    if actual.rstrip() == expected.rstrip():
+        return True
+    if not lenient:
+        return False
+    printed = _normalize(actual)
+    for candidate in (expected, REMARK_PATTERN.sub('', expected)):
+        candidate = _normalize(candidate)
+        if printed == candidate:
+            return True
+        if len(candidate) >= 2 and candidate[0] == candidate[-1] == "'" and printed == candidate[1:-1]:
+            return True
+    if printed:
+        annotation = _normalize(expected)
+        if annotation.startswith(printed) and PREFIX_SEPARATOR.match(annotation[len(printed):]):
+            return True
+        if annotation.endswith(printed) and SUFFIX_SEPARATOR.search(annotation[:-len(printed)]):
+            return True
+    return False
+
+
+def compare_output(stdout: str, expected: ExpectedOutput) -> str | None:
+    """Describe the first difference between printed and expected output (None if they match)"""
+    actual = stdout.rstrip('\n').splitlines() if stdout.strip() else []
+    for number, (printed, wanted) in enumerate(zip(actual, expected.lines), 1):
+        if not line_matches(printed, wanted, expected.lenient):
+            return f"line {number}: expected {wanted!r}, printed {printed!r}"
+    if len(actual) < len(expected.lines):
+        return f"line {len(actual) + 1}: expected {expected.lines[len(actual)]!r}, printed nothing"
+    if len(actual) > len(expected.lines):
+        return f"line {len(expected.lines) + 1}: printed {actual[len(expected.lines)]!r}, expected nothing"
+    return None
+
+
+def permission_args(node_version: str, read_paths: list[str]) -> list[str]:
+    """
+    Node flags that deny file writes and child processes, allow reads of read_paths only
+    and allow the worker threads examples run in; [] if this Node has no permission model
+    (before v20)
+    """
+    match = re.match(r'v?(\d+)', node_version)
+    major = int(match[1]) if match else 0
+    if major < 20:
+        return []
+    flag = '--permission' if major >= 23 else '--experimental-permission'
+    return [flag, *(f'--allow-fs-read={path}' for path in read_paths), '--allow-worker']
+
+
+def collect_notes(results: Iterable[tuple[str, str]]) -> tuple[list[str], list[str]]:
+    """Skipped examples and inline-annotation warnings from the (file, output) of run results"""
+    skipped: list[str] = []
+    warnings: list[str] = []
+    for file, output in results:
+        first, *rest = output.splitlines() or [""]
+        if SKIPPED_LABEL in first:
+            skipped.append(f"{file}: {first.split(SKIPPED_LABEL, 1)[1]}")
+        elif first.endswith(WARNING_LABEL):
+            warnings.extend(f"{file}: {line}" for line in rest)
+    return skipped, warnings
+
+
+def with_notes(summary: str, skipped: list[str], warnings: list[str]) -> str:
+    """The execution summary with the skipped examples and warnings listed after its first line"""
+    notes = []
+    if skipped:
+        notes.append(f"⏭️  Skipped {len(skipped)} example(s):\n" + '\n'.join(f"   {note}" for note in skipped))
+    if warnings:
+        notes.append(f"⚠️  {len(warnings)} inline annotation warning(s), not counted as failures:\n"
+                     + '\n'.join(f"   {note}" for note in warnings))
+    if not notes:
+        return summary
+    first, _, details = summary.partition('\n\n')
+    return '\n\n'.join([first, *notes, details])
@@ -0,0 +1,243 @@
+"""
+Running the examples that document their output (--execute)
+"""
+
+import json
+import re
+import shutil
+import subprocess
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from execution import (MARKED_REASON, SKIPPED_LABEL, WARNING_LABEL, compare_output, declares, expected_output, permission_args,
+                       skips_execution, undefined_name, with_notes)
+from file_generator import EXECUTE_DIR, file_header, generated_filename
+from models import CodeExample, CommandNotFoundError, Diagnostic, DiagnosticIndex, ExpectedOutput, FileCheckResult, TestConfig
+from tracing import EXECUTE_CATEGORY
+
+if TYPE_CHECKING:
+    from type_checker import TypeChecker
+
+# Node script that strips the types from TypeScript examples for --execute
+TRANSPILER = Path(__file__).resolve().parent / "transpile_examples.mjs"
+
+# Node script that runs the examples of --execute in a pool of worker threads
+RUNNER = Path(__file__).resolve().parent / "run_examples.mjs"
+
+
+class ExecutionRunner:
+    """
+    Runs every example that documents its output in a pool of Node worker threads and
+    compares what it prints with the documentation. Results go through the checker like
+    those of the checks, under the 'run' checker.
+    """
+
+    def __init__(self, config: TestConfig, checker: "TypeChecker") -> None:
+        self.config = config
+        self.checker = checker
+        self.output: str | None = None  # Report section of --execute
+        self.executed = 0
+        self.warnings: list[str] = []  # Problems of examples documented by inline comments
+        self.skipped: list[str] = []  # Examples that were not run, with the reason
+
+    def _write_runnable_modules(self, runnable: list[tuple[CodeExample, ExpectedOutput]],
+                                execute_dir: Path) -> tuple[dict[Path, tuple[CodeExample, ExpectedOutput]],
+                                                            list[FileCheckResult]]:
+        """
+        Write one ES module per example into execute_dir: JavaScript as generated, TypeScript
+        with its types stripped by one transpile_examples.mjs process. Returns the modules
+        and a failing result for every example that could not be transpiled.
+        """
+        if execute_dir.exists():
+            shutil.rmtree(execute_dir)
+        modules: dict[Path, tuple[CodeExample, ExpectedOutput]] = {}
+        for example, expected in runnable:
+            modules[execute_dir / Path(generated_filename(example)).with_suffix('.mjs')] = (example, expected)
+
+        to_transpile: list[dict[str, str]] = []
+        for module, (example, _) in modules.items():
+            if example.is_typescript:
+                to_transpile.append({"code": file_header(example) + example.code, "out": str(module)})
+            else:
+                module.parent.mkdir(parents=True, exist_ok=True)
+                module.write_text(file_header(example) + example.code, encoding='utf-8')
+        if not to_transpile:
+            return modules, []
+
+        failures: list[FileCheckResult] = []
+        try:
+            result = self.checker.cmd_discovery.run_node([str(TRANSPILER)], self.config.temp_dir,
+                                                         input=json.dumps(to_transpile),
+                                                         timeout=self.config.check_timeout)
+            reports = json.loads(result.stdout)
+        except (CommandNotFoundError, subprocess.SubprocessError, OSError, ValueError) as e:
+            reports = [{"out": item["out"], "ok": False, "message": str(e)} for item in to_transpile]
+        for report in reports:
+            if not report["ok"]:
+                example, _ = modules.pop(Path(report["out"]))
+                relative_path = DiagnosticIndex.normalize(example.filename or generated_filename(example))
+                failure = self.checker.tooling_failure(f"Error running {Path(relative_path).name}: "
+                                                       f"could not strip types: {report['message']}",
+                                                       relative_path, "run")
+                failures.append(failure)
+        return modules, failures
+
+    def interpret_execution(self, example: CodeExample, expected: ExpectedOutput, module: Path,
+                            report: dict) -> FileCheckResult:
+        """
+        Turn the pool's report on one example into a result: limits, uncaught errors, exit
+        code, then output. Only examples with a "// Output:" block can fail; problems of
+        inline-annotated ones are recorded in warnings. A ReferenceError for a name
+        declared by an earlier example of the chapter means the example continues that
+        one, so it is recorded in skipped instead.
+        """
+        relative_path = DiagnosticIndex.normalize(example.filename or generated_filename(example))
+        file_output = f"Running {Path(relative_path).name}:"
+        error = report.get("error")
+        if report.get("limit") == "timeout":
+            diagnostics = [Diagnostic(relative_path, None, None, "Timeout",
+                                      f"timed out after {self.config.execute_timeout:g}s", checker="run")]
+        elif report.get("limit") == "cpu":
+            diagnostics = [Diagnostic(relative_path, None, None, "CPULimit",
+                                      f"exceeded {self.config.execute_cpu_seconds}s of CPU time", checker="run")]
+        elif report.get("limit") == "memory":
+            diagnostics = [Diagnostic(relative_path, None, None, "MemoryLimit",
+                                      f"exceeded the {self.config.execute_memory_mb} MB heap limit", checker="run")]
+        elif error:
+            name = undefined_name(error["name"], error["message"])
+            if name is not None and any(declares(example.source.code(block), name)
+                                        for block in range(example.block)):
+                reason = f"uses '{name}' from an earlier example"
+                self.skipped.append(f"{relative_path}: {reason}")
+                return FileCheckResult(f"{file_output} {SKIPPED_LABEL}{reason}", [], file=relative_path)
+            line = column = None
+            position = re.search(rf'{re.escape(module.as_uri())}:(\d+):(\d+)', error["stack"])
+            if position and example.is_javascript:  # Lines of a transpiled module are not the example's
+                line, column = int(position[1]), int(position[2])
+            diagnostics = [Diagnostic(relative_path, line, column, error["name"], error["message"], checker="run")]
+        elif report.get("exitCode"):
+            diagnostics = [Diagnostic(relative_path, None, None, "ExitCode",
+                                      f"exited with code {report['exitCode']}", checker="run")]
+        else:
+            mismatch = compare_output(report.get("stdout", ""), expected)
+            if mismatch is None:
+                return FileCheckResult(file_output + " ✅ OK", [], file=relative_path)
+            diagnostics = [Diagnostic(relative_path, None, None, "OutputMismatch", mismatch, checker="run")]
+
+        if expected.lenient:
+            self.warnings.extend(f"{relative_path}: {d.summary()}" for d in diagnostics)
+            return FileCheckResult('\n'.join([f"{file_output} {WARNING_LABEL}", *(d.summary() for d in diagnostics)]),
+                                   [], file=relative_path)
+        stdout, stderr = report.get("stdout", "").rstrip(), report.get("stderr", "").strip()
+        details = '\n'.join(part for part in (
+            '\n'.join(d.summary() for d in diagnostics),
+            f"stdout:\n{stdout}" if stdout else "",
+            f"stderr:\n{stderr}" if stderr else "",
+        ) if part)
+        return FileCheckResult(f"{file_output} ❌ FAILED\n{details}", [d.summary() for d in diagnostics],
+                               relative_path, diagnostics, file=relative_path)
+
+    def _run_pool(self, node: list[str], execute_dir: Path, modules: list[Path],
+                  on_report: Callable[[Path, dict], None]) -> None:
+        """Run modules in one run_examples.mjs worker pool, handing each report over as it arrives"""
+        sandbox = permission_args(self.checker.cmd_discovery.get_version('node'), [str(execute_dir), str(RUNNER)])
+        if not sandbox:
+            print("⚠️  Warning: This Node has no permission model; examples run without file system restrictions")
+        request = {
+            "modules": [str(module) for module in modules],
+            "workers": self.checker.scheduler.begin("run", len(modules)),
+            "timeoutMs": round(self.config.execute_timeout * 1000),
+            "cpuMs": self.config.execute_cpu_seconds * 1000,
+            "heapMb": self.config.execute_memory_mb,
+        }
+        process = subprocess.Popen(node + ['--no-warnings', *sandbox, str(RUNNER)], cwd=execute_dir,
+                                   text=True, encoding='utf-8', stdin=subprocess.PIPE,
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        stderr = ""
+        try:
+            # stderr is drained by a thread, so a chatty pool cannot block on a full pipe
+            stderr_lines: list[str] = []
+            assert process.stdin is not None and process.stdout is not None and process.stderr is not None
+            drain = threading.Thread(target=lambda: stderr_lines.extend(process.stderr), daemon=True)
+            drain.start()
+            process.stdin.write(json.dumps(request))
+            process.stdin.close()
+            for line in process.stdout:
+                report = json.loads(line)
+                on_report(Path(report["module"]), report)
+                if self.checker.stop.is_set():
+                    break
+            process.wait()
+            drain.join(timeout=5)
+            stderr = ''.join(stderr_lines).strip()
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+        if process.returncode and not self.checker.stop.is_set():
+            raise OSError(f"worker pool exited with code {process.returncode}: {stderr[-500:]}")
+
+    def run(self, examples: list[CodeExample]) -> tuple[str, list[str], set[str]]:
+        """
+        Run every example that documents its output in a pool of Node worker threads,
+        each with a CPU time budget, a V8 heap limit, a wall-clock timeout and, where
+        Node supports it, no permission to write files or start processes. Compare what
+        it prints with the documented output. Same return shape as the checks.
+        """
+        checker = self.checker
+        self.warnings = []
+        self.skipped = []
+        runnable: list[tuple[CodeExample, ExpectedOutput]] = []
+        for example in examples:
+            expected = expected_output(example.code)
+            if expected is None:
+                continue
+            if skips_execution(example.code):
+                relative_path = DiagnosticIndex.normalize(example.filename)
+                self.skipped.append(f"{relative_path}: {MARKED_REASON}")
+                checker.emit([FileCheckResult(f"Running {Path(relative_path).name}: {SKIPPED_LABEL}{MARKED_REASON}",
+                                              [], file=relative_path)], "run")
+            else:
+                runnable.append((example, expected))
+        self.executed = len(runnable)
+        marked = len(self.skipped)
+        if not runnable:
+            return "✅ No examples document their output", [], set()
+
+        execute_dir = (self.config.temp_dir / EXECUTE_DIR).resolve()
+        modules, results = self._write_runnable_modules(runnable, execute_dir)
+        checker.emit(results, "run")
+
+        def on_report(module: Path, report: dict) -> None:
+            example, expected = modules[module]
+            end = time.perf_counter()
+            args: dict[str, object] = {"file": example.filename, "checker": "run",
+                                       "source": f"{Path(example.source_file).name}:{example.start_line}"}
+            if report.get("limit") or report.get("error"):
+                args["error"] = report.get("limit") or report["error"]["name"]
+            checker.tracer.add(f"run {module.relative_to(execute_dir).as_posix()}", EXECUTE_CATEGORY,
+                               end - report.get("seconds", 0.0), end, **args)
+            result = self.interpret_execution(example, expected, module, report)
+            checker.emit([result], "run")
+            results.append(result)
+
+        print(f"Running {len(modules)} examples that document their output...")
+        try:
+            node = checker.cmd_discovery.command_vector('node', self.config.temp_dir)
+            self._run_pool(node, execute_dir, list(modules), on_report)
+        except (CommandNotFoundError, OSError, ValueError) as e:
+            reported = {result.file for result in results}
+            failures = [checker.tooling_failure(f"Error running {module.name}: {e}", example.filename, "run")
+                        for module, (example, _) in modules.items() if example.filename not in reported]
+            checker.emit(failures, "run")
+            results.extend(failures)
+
+        not_self_contained = len(self.skipped) - marked
+        output, errors, failing = checker.summarize_results(results, len(runnable) - not_self_contained, "Execution")
+        if self.warnings:
+            print(f"⚠️  {len(self.warnings)} inline output annotation(s) differ from what was printed "
+                  f"(listed under EXECUTION RESULTS)")
+        return with_notes(output, self.skipped, self.warnings), errors, failing
@@ -3,9 +3,140 @@ TypeScript and JavaScript code extraction from markdown files
 """
 
 import re
+import unicodedata
+from collections.abc import Iterable, Iterator
 from pathlib import Path
 
-from models import CodeExample, TestConfig, CodeType
+from git_changes import LineRanges, overlaps_changes
+from models import ChapterSource, CodeExample, TestConfig, CodeType
+
+# Opening code fence: up to three spaces of indentation, a run of at least three
+# backticks or tildes, and an info string whose first word names the language
+FENCE_PATTERN = re.compile(r'^(?P<indent> {0,3})(?P<fence>`{3,}|~{3,})\s*(?P<info>.*)$')
+
+FENCE_STARTS = ('```', '~~~')
+
+# ATX heading: up to three spaces, one to six '#', the title and an optional closing run of '#'
+HEADING_PATTERN = re.compile(r'^ {0,3}#{1,6}(?:[ \t]+(?P<title>.*?))?(?:[ \t]+#+)?[ \t]*$')
+
+# Markdown link or image in a heading, of which only the text is kept
+LINK_PATTERN = re.compile(r'!?\[([^\]]*)\]\([^)]*\)')
+
+# Longest heading slug used in example ids (and so in generated file names)
+MAX_SLUG_LENGTH = 40
+
+# Fence languages that are extracted, by the lowercased first word of the info string
+LANGUAGE_ALIASES = {
+    'ts': CodeType.TYPESCRIPT,
+    'typescript': CodeType.TYPESCRIPT,
+    'js': CodeType.JAVASCRIPT,
+    'javascript': CodeType.JAVASCRIPT,
+}
+
+
+def fence_language(info: str) -> CodeType | None:
+    """Language of a fence from its info string, e.g. 'ts', 'typescript title="x"' or '{.js}'"""
+    words = info.strip().lstrip('{').split(maxsplit=1)
+    if not words:
+        return None
+    return LANGUAGE_ALIASES.get(words[0].lstrip('.').rstrip('}').lower())
+
+
+def heading_slug(title: str) -> str:
+    """File-name-safe slug of a heading, e.g. 'Generic `Box<T>` types' -> 'generic-box-t-types'"""
+    text = unicodedata.normalize('NFKD', LINK_PATTERN.sub(r'\1', title))
+    slug = re.sub(r'[^a-z0-9]+', '-', text.encode('ascii', 'ignore').decode('ascii').lower()).strip('-')
+    if len(slug) > MAX_SLUG_LENGTH:
+        cut = slug.rfind('-', 0, MAX_SLUG_LENGTH + 1)  # Cut at a word boundary where there is one
+        slug = slug[:cut if cut > 0 else MAX_SLUG_LENGTH]
+    return slug
+
+
+# One line with its line break, split the way a file opened with newline='' is read
+LINE_PATTERN = re.compile(r'[^\r\n]*(?:\r\n|\r|\n)|[^\r\n]+')
+
+def iter_lines(text: str) -> Iterator[str]:
+    """Lines of a text including their line breaks"""
+    for match in LINE_PATTERN.finditer(text):
+        yield match.group()
+
+
+def iter_block_spans(lines: Iterable[str], chapter: ChapterSource) -> Iterator[tuple[CodeType, int]]:
+    """
+    Stream through markdown lines once, appending the lines of every TypeScript/JavaScript
+    fence to chapter and recording where the block's code is (leading and trailing blank
+    lines excluded). Yields (code_type, block index in chapter). Blocks of other languages
+    are skipped but still tracked, so their contents can never open a fence. Headings
+    outside blocks are recorded in chapter as they are passed.
+    """
+    fence = ""  # Opening fence of the block being read ('' outside blocks)
+    indent = 0
+    code_type: CodeType | None = None
+    body: list[tuple[int, int, bool]] = []  # (start offset, end offset, blank) per line
+    body_start = 0
+    opening_fence = 0
+    line_number = 0
+
+    for line_number, raw_line in enumerate(lines, 1):
+        line = raw_line.rstrip('\r\n')
+        content = line.lstrip(' ')
+        if not fence:
+            if content[:1] == '#':
+                match = HEADING_PATTERN.match(line)
+                if match:
+                    chapter.add_heading(heading_slug(match['title'] or ""))
+                continue
+            if content[:3] not in FENCE_STARTS:
+                continue
+            match = FENCE_PATTERN.match(line)
+            # A backtick fence's info string may not contain backticks
+            if match and not (match['fence'][0] == '`' and '`' in match['info']):
+                fence = match['fence']
+                indent = len(match['indent'])
+                code_type = fence_language(match['info'])
+                body = []
+                opening_fence = line_number
+                body_start = line_number + 1
+            continue
+
+        if (content.startswith(fence) and content.rstrip().strip(fence[0]) == "" and
+                len(line) - len(content) <= 3):
+            if code_type is not None:
+                block = _trim_block(chapter, body, body_start, indent, (opening_fence, line_number))
+                if block is not None:
+                    yield code_type, block
+            fence = ""
+            continue
+
+        if code_type is not None:
+            blank = not content.strip()
+            if blank and all(is_blank for _, _, is_blank in body):
+                body.append((0, 0, True))  # Leading blank lines are trimmed, so they need not be kept
+            else:
+                offset = chapter.append(raw_line)
+                body.append((offset, offset + len(line), blank))
+
+    chapter.finish()
+    if fence and code_type is not None:
+        print(f"⚠️  Warning: Unclosed code fence at {chapter.path}:{opening_fence} was ignored")
+
+
+def _trim_block(chapter: ChapterSource, body: list[tuple[int, int, bool]], body_start: int,
+                indent: int, fences: tuple[int, int]) -> int | None:
+    """
+    Strip surrounding blank lines from a block body and record it with the lines of its
+    (opening, closing) fences; None if nothing is left
+    """
+    first = 0
+    while first < len(body) and body[first][2]:
+        first += 1
+    last = len(body)
+    while last > first and body[last - 1][2]:
+        last -= 1
+    if first == last:
+        return None
+    return chapter.add_block(body[first][0], body[last - 1][1], indent, body_start + first, body_start + last - 1,
+                             *fences)
 
 
 class CodeExtractor:
@@ -13,46 +144,38 @@ class CodeExtractor:
 
     def __init__(self, config: TestConfig) -> None:
         self.config = config
+        # Set for --changed-since: only these files, and only examples touched by their changed lines
+        self.changed_lines: dict[Path, LineRanges] | None = None
 
     def extract_code_blocks_content(self, content: str) -> list[tuple[str, CodeType]]:
         """Extract TypeScript and JavaScript code blocks from markdown content, preserving order"""
-        # Pattern to match both ts and js code blocks with their positions
-        pattern = r'```(ts|js)\n(.*?)\n```'
-
-        matches = []
-        for match in re.finditer(pattern, content, re.DOTALL):
-            lang = match.group(1)
-            code = match.group(2).strip()
-
-            if code:  # Only include non-empty code blocks
-                code_type = CodeType.TYPESCRIPT if lang == 'ts' else CodeType.JAVASCRIPT
-                matches.append((code, code_type))
-
-        return matches
-
-    def extract_code_blocks(self, markdown_file: Path) -> list[CodeExample]:
-        """Extract TypeScript and JavaScript code blocks from a markdown file"""
+        chapter = ChapterSource("markdown")
+        return [(chapter.code(block), code_type) for code_type, block in iter_block_spans(iter_lines(content), chapter)]
+
+    def iter_code_blocks(self, markdown_file: Path) -> Iterator[CodeExample]:
+        """
+        Lazily yield the TypeScript and JavaScript examples of a markdown file, reading it
+        line by line. Their code is collected in one ChapterSource shared by the examples.
+        """
+        chapter_name = markdown_file.stem
+        source = ChapterSource(str(markdown_file))
         try:
-            with open(markdown_file, 'r', encoding='utf-8') as f:
-                content = f.read()
+            with open(markdown_file, 'r', encoding='utf-8', newline='') as f:
+                spans = iter_block_spans(f, source)
+                for number, (code_type, block) in enumerate(spans, 1):
+                    yield CodeExample(
+                        chapter=chapter_name,
+                        number=number,
+                        source=source,
+                        code_type=code_type,
+                        block=block
+                    )
         except (OSError, UnicodeDecodeError) as e:
             print(f"⚠️  Warning: Could not read {markdown_file}: {e}")
-            return []
 
-        code_blocks = self.extract_code_blocks_content(content)
-        chapter_name = markdown_file.stem
-        examples = []
-
-        for i, (code, code_type) in enumerate(code_blocks, 1):
-            examples.append(CodeExample(
-                chapter=chapter_name,
-                number=i,
-                code=code,
-                code_type=code_type,
-                source_file=str(markdown_file)
-            ))
-
-        return examples
+    def extract_code_blocks(self, markdown_file: Path) -> list[CodeExample]:
+        """Extract TypeScript and JavaScript code blocks from a markdown file"""
+        return list(self.iter_code_blocks(markdown_file))
 
     def find_markdown_files(self) -> list[Path]:
         """Find markdown files, optionally filtered by chapter numbers"""
@@ -62,6 +185,9 @@ class CodeExtractor:
             print(f"❌ Error accessing directory {self.config.book_dir}: {e}")
             return []
 
+        if self.changed_lines is not None:
+            all_files = [f for f in all_files if f.resolve() in self.changed_lines]
+
         if not self.config.specific_chapters:
             return all_files
 
@@ -86,6 +212,9 @@ class CodeExtractor:
 
         for md_file in markdown_files:
             file_examples = self.extract_code_blocks(md_file)
+            if self.changed_lines is not None:
+                ranges = self.changed_lines[md_file.resolve()]
+                file_examples = [example for example in file_examples if overlaps_changes(example, ranges)]
             examples.extend(file_examples)
 
         return examples
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Stand-in for tsc and node used by bench_pipeline.py --fake
+
+Run as a script it mimics the output formats the tester parses:
+`tsc [compiler flags] FILE`, `tsc --project CONFIG --pretty false`,
+`node --check FILE` and the batch syntax checker (a JSON file list on
+stdin). A line containing ERROR_MARKER is reported as an error, so results
+are deterministic and independent of Node. FakeCommandDiscovery routes the
+tester's subprocess calls to it.
+"""
+
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from utils import CommandDiscovery
+
+# Lines containing this marker are reported as errors (see synthetic_book.py)
+ERROR_MARKER = "bench-error"
+
+FAKE_SCRIPT = Path(__file__).resolve()
+
+
+def marked_lines(path: Path) -> list[tuple[int, str]]:
+    """(line number, text) of every marked line of a file"""
+    try:
+        lines = path.read_text(encoding='utf-8').splitlines()
+    except OSError:
+        return []
+    return [(number, line) for number, line in enumerate(lines, 1) if ERROR_MARKER in line]
+
+
+def typescript_errors(file: str) -> list[str]:
+    """tsc --pretty false diagnostics for one file"""
+    return [f"{file}({number},1): error TS2322: Type 'string' is not assignable to type 'number'."
+            for number, _ in marked_lines(Path(file))]
+
+
+def fake_tsc(args: list[str]) -> int:
+    """tsc: per-file or --project checking"""
+    if '--project' in args:
+        project = Path(args[args.index('--project') + 1])
+        with open(project, 'r', encoding='utf-8') as f:
+            files = [(project.parent / name).as_posix() for name in json.load(f).get("files", [])]
+    elif '--version' in args:
+        print("Version 0.0.0-fake")
+        return 0
+    else:
+        files = [arg for arg in args if arg.endswith(('.ts', '.js'))]
+    errors = [error for file in files for error in typescript_errors(file)]
+    print('\n'.join(errors))
+    return 2 if errors else 0
+
+
+def fake_node_check(file: str) -> int:
+    """node --check: the first marked line is a syntax error"""
+    marked = marked_lines(Path(file))
+    if not marked:
+        return 0
+    number, line = marked[0]
+    print(f"{Path(file).resolve()}:{number}\n{line}\n^\n\nSyntaxError: Unexpected token", file=sys.stderr)
+    return 1
+
+
+def fake_batch_check() -> int:
+    """js_syntax_check.mjs: JSON file list on stdin, JSON reports on stdout"""
+    reports = []
+    for file in json.load(sys.stdin):
+        marked = marked_lines(Path(file))
+        if marked:
+            reports.append({"file": file, "ok": False, "errorType": "SyntaxError",
+                            "message": "Unexpected token", "line": marked[0][0], "column": 1})
+        else:
+            reports.append({"file": file, "ok": True, "errorType": None, "message": None,
+                            "line": None, "column": None})
+    print(json.dumps(reports))
+    return 0
+
+
+def main(argv: list[str]) -> int:
+    """Entry point: fake_toolchain.py [--latency MS] {tsc|node} ARGS..."""
+    if argv[:1] == ['--latency']:
+        time.sleep(float(argv[1]) / 1000)
+        argv = argv[2:]
+    tool, args = argv[0], argv[1:]
+    if tool == 'tsc':
+        return fake_tsc(args)
+    if '--check' in args:
+        return fake_node_check(args[args.index('--check') + 1])
+    if args and args[-1].endswith('.mjs'):
+        return fake_batch_check()
+    print("v0.0.0-fake")
+    return 0
+
+
+class FakeCommandDiscovery(CommandDiscovery):
+    """CommandDiscovery whose tsc, node and npm are this script (and a no-op install)"""
+
+    def __init__(self, latency_ms: float = 0.0) -> None:
+        super().__init__()
+        self.latency_ms = latency_ms
+
+    def _fake(self, tool: str) -> list[str]:
+        """Argument vector that runs this script as tool"""
+        return [sys.executable, str(FAKE_SCRIPT), '--latency', str(self.latency_ms), tool]
+
+    def discover_commands(self) -> bool:
+        return True
+
+    def get_version(self, cmd_type: str) -> str:
+        return "fake"
+
+    def run_subprocess(self, cmd_type: str, args: list[str], temp_dir: Path, **kwargs) -> subprocess.CompletedProcess[str]:
+        if cmd_type == 'npm':
+            (temp_dir / "node_modules").mkdir(exist_ok=True)
+            return subprocess.CompletedProcess(['npm'] + args, 0, "", "")
+        tool = 'tsc' if cmd_type == 'npx' else 'node'
+        return self.run_direct(self._fake(tool) + args[1 if tool == 'tsc' else 0:], temp_dir, **kwargs)
+
+    def run_tsc(self, args: list[str], temp_dir: Path, **kwargs) -> subprocess.CompletedProcess[str]:
+        return self.run_direct(self._fake('tsc') + args, temp_dir, **kwargs)
+
+    def run_node(self, args: list[str], temp_dir: Path, **kwargs) -> subprocess.CompletedProcess[str]:
+        return self.run_direct(self._fake('node') + args, temp_dir, **kwargs)
+
+    def command_vector(self, cmd_type: str, temp_dir: Path) -> list[str]:
+        return self._fake('tsc' if cmd_type == 'tsc' else 'node')
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
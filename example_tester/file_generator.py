@@ -6,8 +6,70 @@ import json
 import shutil
 from datetime import datetime
 from pathlib import Path
+from typing import TextIO
+
+from models import CodeExample, DiagnosticIndex, TestConfig
+from result_sink import iter_sorted_outputs
+
+# Lines of the comment header written above each example's code
+HEADER_LINES = 5
+
+# Directory in the test directory holding the runnable modules of --execute
+EXECUTE_DIR = "execute"
+
+# Directories of the test directory that are not chapters, so --sync never removes them
+WORKSPACE_DIRS = frozenset({"node_modules", EXECUTE_DIR})
+
+# compilerOptions of the generated tsconfig.json. Per-file checks pass the same options as
+# flags (option_args) and the compiler host uses them too, so every mode reports the same
+# diagnostics. moduleDetection=force keeps every example an isolated module.
+COMPILER_OPTIONS: dict[str, object] = {
+    "target": "ES2020",
+    "module": "ESNext",
+    "moduleResolution": "node",
+    "moduleDetection": "force",
+    "strict": True,
+    "esModuleInterop": True,
+    "skipLibCheck": True,
+    "forceConsistentCasingInFileNames": True,
+    "noEmit": True,
+    "allowUnreachableCode": True,
+    "allowUnusedLabels": True,
+    "allowJs": True,  # Allow JavaScript files to be processed
+    "checkJs": False,  # Don't type-check JavaScript files with TypeScript
+}
+
+
+def option_args(options: dict[str, object]) -> list[str]:
+    """tsc command-line flags for compilerOptions"""
+    args: list[str] = []
+    for name, value in options.items():
+        if isinstance(value, bool):
+            args += [f"--{name}", "true" if value else "false"]
+        elif isinstance(value, list):
+            args += [f"--{name}", ",".join(map(str, value))]
+        else:
+            args += [f"--{name}", str(value)]
+    return args
+
 
-from models import CodeExample, TestConfig
+def generated_filename(example: CodeExample) -> str:
+    """
+    Path of an example's generated file relative to the test directory, named by the
+    example's stable id so that edits elsewhere in the book do not rename it
+    """
+    return f"{example.example_id}.{example.code_type.value}"
+
+
+def file_header(example: CodeExample) -> str:
+    """Comment header written above an example's code (HEADER_LINES lines)"""
+    language_name = "TypeScript" if example.is_typescript else "JavaScript"
+    return f"""// Extracted from: {example.source_file}
+// Example id: {example.example_id}
+// Language: {language_name}
+// Auto-generated - do not edit directly
+
+"""
 
 
 class FileGenerator:
@@ -15,6 +77,28 @@ class FileGenerator:
 
     def __init__(self, config: TestConfig) -> None:
         self.config = config
+        self.files_written = 0
+        self.files_unchanged = 0
+        self.files_removed = 0
+
+    def write_file(self, path: Path, content: str) -> bool:
+        """
+        Write content to path. In sync mode an identical existing file is left
+        untouched so its mtime is preserved. Returns True if the file was written.
+        """
+        if self.config.sync_workspace:
+            try:
+                if path.read_text(encoding='utf-8') == content:
+                    self.files_unchanged += 1
+                    return False
+            except (OSError, UnicodeDecodeError):
+                pass
+
+        # newline='' keeps the bytes identical across platforms so later comparisons stay exact
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(content)
+        self.files_written += 1
+        return True
 
     def create_package_json(self) -> None:
         """Create package.json for TypeScript and JavaScript dependencies"""
@@ -30,33 +114,18 @@ class FileGenerator:
         }
 
         package_path = self.config.temp_dir / "package.json"
-        with open(package_path, 'w', encoding='utf-8') as f:
-            json.dump(package_json, f, indent=2)
+        self.write_file(package_path, json.dumps(package_json, indent=2))
 
     def create_tsconfig(self) -> None:
         """Create TypeScript configuration file"""
         tsconfig = {
-            "compilerOptions": {
-                "target": "ES2020",
-                "module": "ESNext",
-                "moduleResolution": "node",
-                "strict": True,
-                "esModuleInterop": True,
-                "skipLibCheck": True,
-                "forceConsistentCasingInFileNames": True,
-                "noEmit": True,
-                "allowUnreachableCode": True,
-                "allowUnusedLabels": True,
-                "allowJs": True,  # Allow JavaScript files to be processed
-                "checkJs": False  # Don't type-check JavaScript files with TypeScript
-            },
+            "compilerOptions": COMPILER_OPTIONS,
             "include": ["**/*.ts"],  # Only include TypeScript files for type checking
             "exclude": ["**/*.js"]   # Explicitly exclude JavaScript files from TypeScript checking
         }
 
         tsconfig_path = self.config.temp_dir / "tsconfig.json"
-        with open(tsconfig_path, 'w', encoding='utf-8') as f:
-            json.dump(tsconfig, f, indent=2)
+        self.write_file(tsconfig_path, json.dumps(tsconfig, indent=2))
 
     def create_support_files(self) -> None:
         """Create .gitignore and README files"""
@@ -69,21 +138,20 @@ package-lock.json
 *.log
 *.tmp
 """
-        with open(self.config.temp_dir / ".gitignore", 'w', encoding='utf-8') as f:
-            f.write(gitignore_content)
+        self.write_file(self.config.temp_dir / ".gitignore", gitignore_content)
 
         # README.md
-        readme_content = f"""# TypeScript and JavaScript Book Examples Test Directory
-
-Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+        readme_content = """# TypeScript and JavaScript Book Examples Test Directory
 
 This directory contains automatically extracted TypeScript and JavaScript examples from the book chapters.
 
 ## Structure
 - `package.json` - Dependencies for both TypeScript and JavaScript
+- `node_modules` - Link to the shared toolchain installed for this package.json
 - `tsconfig.json` - TypeScript compiler configuration (excludes .js files)
 - `chapter*/` - Example directories organized by chapter
-- Each chapter contains numbered files with appropriate extensions (.ts or .js)
+- `execute/` - Runnable modules of the examples (only with --execute)
+- Each chapter contains one file per example, named by the heading above it and a hash of its code, with the appropriate extension (.ts or .js)
 
 ## Testing Approach
 - TypeScript files (.ts) are checked with the TypeScript compiler
@@ -91,11 +159,11 @@ This directory contains automatically extracted TypeScript and JavaScript exampl
 - Examples maintain the order they appear in the markdown files
 
 ## Usage
-This directory is automatically recreated each time the test script runs.
+This directory is automatically recreated each time the test script runs
+(or updated in place when run with --sync).
 See `test_results.txt` in the parent directory for consolidated results.
 """
-        with open(self.config.temp_dir / "README.md", 'w', encoding='utf-8') as f:
-            f.write(readme_content)
+        self.write_file(self.config.temp_dir / "README.md", readme_content)
 
     def create_config_files(self) -> None:
         """Create all configuration and support files"""
@@ -103,6 +171,11 @@ See `test_results.txt` in the parent directory for consolidated results.
         self.create_tsconfig()
         self.create_support_files()
 
+    @property
+    def checks_snippets_in_memory(self) -> bool:
+        """Whether TypeScript examples are checked from memory (--executor host), so need no files"""
+        return self.config.executor == "host" and not self.config.batch_mode
+
     def create_chapter_files(self, chapters: dict[str, list[CodeExample]]) -> None:
         """Create TypeScript and JavaScript files organized by chapter"""
         for chapter_name, chapter_examples in chapters.items():
@@ -113,6 +186,10 @@ See `test_results.txt` in the parent directory for consolidated results.
             ts_count = sum(1 for ex in chapter_examples if ex.is_typescript)
             js_count = sum(1 for ex in chapter_examples if ex.is_javascript)
 
+            # Named by the example's stable id, so a subset (--shard) or an edit elsewhere keeps the same names
+            for example in chapter_examples:
+                example.filename = generated_filename(example)
+
             # Create chapter README
             readme_content = f"""# {chapter_name.title()} Examples
 
@@ -122,39 +199,59 @@ This directory contains {len(chapter_examples)} examples extracted from {chapter
 
 ## Examples (in order of appearance):
 """
-            for i, example in enumerate(chapter_examples, 1):
+            for example in chapter_examples:
                 extension = example.code_type.value
-                readme_content += f"- `example_{i:02d}.{extension}` - Example {example.number} from the source ({extension.upper()})\n"
+                readme_content += f"- `{Path(example.filename).name}` ({extension.upper()})\n"
 
-            with open(chapter_dir / "README.md", 'w', encoding='utf-8') as f:
-                f.write(readme_content)
+            self.write_file(chapter_dir / "README.md", readme_content)
 
             # Create code files with appropriate extensions
-            for i, example in enumerate(chapter_examples, 1):
-                extension = example.code_type.value
-                file_path = chapter_dir / f"example_{i:02d}.{extension}"
-
-                language_name = "TypeScript" if example.is_typescript else "JavaScript"
-                header = f"""// Extracted from: {example.source_file}
-// Original example number: {example.number}
-// Language: {language_name}
-// Auto-generated - do not edit directly
-
-"""
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(header + example.code)
-
-                # Update filename for later reference
-                example.filename = str(file_path.relative_to(self.config.temp_dir))
+            expected_files: set[str] = set()
+            for example in chapter_examples:
+                file_path = self.config.temp_dir / example.filename
+                if example.is_typescript and self.checks_snippets_in_memory:
+                    continue  # The compiler host gets the source text directly
+
+                self.write_file(file_path, file_header(example) + example.code)
+                expected_files.add(file_path.name)
+
+            if self.config.sync_workspace:
+                self.remove_stale_examples(chapter_dir, expected_files)
+
+    def remove_stale_examples(self, chapter_dir: Path, expected_files: set[str]) -> int:
+        """Delete generated example files in chapter_dir that no longer correspond to an example"""
+        removed = 0
+        for stale_file in chapter_dir.glob("*.*"):
+            if stale_file.suffix in ('.ts', '.js') and stale_file.name not in expected_files:
+                stale_file.unlink()
+                removed += 1
+        self.files_removed += removed
+        return removed
+
+    def remove_stale_chapters(self, chapter_names: set[str]) -> None:
+        """Delete chapter directories left over from a previous run"""
+        try:
+            for item in self.config.temp_dir.iterdir():
+                if (item.is_dir() and not item.name.startswith('.') and
+                        item.name not in WORKSPACE_DIRS and item.name not in chapter_names):
+                    shutil.rmtree(item)
+                    print(f"🗑️  Removed stale chapter directory: {item.name}")
+        except OSError as e:
+            print(f"⚠️  Warning: Could not remove stale chapters: {e}")
 
     def setup_test_directory(self) -> None:
         """Setup the test directory structure"""
-        if self.config.temp_dir.exists():
-            shutil.rmtree(self.config.temp_dir)
-            print(f"🗑️  Removed existing test directory: {self.config.temp_dir}")
+        self.files_written = self.files_unchanged = self.files_removed = 0
+
+        if self.config.sync_workspace and self.config.temp_dir.exists():
+            print(f"♻️  Syncing existing test directory: {self.config.temp_dir}")
+        else:
+            if self.config.temp_dir.exists():
+                shutil.rmtree(self.config.temp_dir)
+                print(f"🗑️  Removed existing test directory: {self.config.temp_dir}")
 
-        self.config.temp_dir.mkdir(exist_ok=True)
-        print(f"📁 Created test directory: {self.config.temp_dir}")
+            self.config.temp_dir.mkdir(exist_ok=True)
+            print(f"📁 Created test directory: {self.config.temp_dir}")
 
         if self.config.specific_chapters:
             chapters_str = ', '.join(map(str, self.config.specific_chapters))
@@ -182,87 +279,37 @@ This directory contains {len(chapter_examples)} examples extracted from {chapter
             chapters[example.chapter].append(example)
 
         # Create chapter directories and files
+        if self.config.sync_workspace:
+            self.remove_stale_chapters(set(chapters))
         self.create_chapter_files(chapters)
 
-    def should_include_example(self, example: CodeExample, failing_files: set[str]) -> bool:
+        if self.config.sync_workspace:
+            print(f"🔄 Synced workspace: {self.files_written} written, "
+                  f"{self.files_unchanged} unchanged, {self.files_removed} removed")
+
+    def should_include_example(self, example: CodeExample, diagnostics: DiagnosticIndex) -> bool:
         """Determine if an example should be included in the output"""
         if self.config.include_all_examples:
             return True
+        return diagnostics.has_errors(example.filename)
 
-        # Check if this example's filename matches any of the failing files
-        # Normalize both paths to use forward slashes for comparison
-        example_file = example.filename.replace('\\', '/')
-
-        for failing_file in failing_files:
-            # Normalize the failing file path too
-            normalized_failing_file = failing_file.replace('\\', '/')
-
-            # Exact match
-            if example_file == normalized_failing_file:
-                return True
-
-            # Check if failing file is a relative path that matches the end of example file
-            if example_file.endswith('/' + normalized_failing_file):
-                return True
-
-            # Check if example file is a relative path that matches the end of failing file
-            if normalized_failing_file.endswith('/' + example_file):
-                return True
-
-        return False
-
-    def extract_errors_for_file(self, filename: str, type_check_output: str, js_check_output: str) -> list[str]:
-        """Extract specific error messages for a given file"""
-        errors = []
-
-        # Get just the filename for comparison
-        file_basename = Path(filename).name
-
-        # Extract TypeScript errors from individual file checking output
-        # Look for sections that start with "Checking filename:" and contain "❌ FAILED"
-        sections = type_check_output.split('\n\n')
-        for section in sections:
-            if f"Checking {file_basename}:" in section and "❌ FAILED" in section:
-                # Extract error lines from this section
-                lines = section.split('\n')
-                for line in lines:
-                    if ': error TS' in line:
-                        try:
-                            if '): error TS' in line:
-                                error_part = line.split('): error TS', 1)[1]
-                                if ':' in error_part:
-                                    error_code, message = error_part.split(':', 1)
-                                    errors.append(f"TS{error_code.strip()}: {message.strip()}")
-                                else:
-                                    errors.append(f"TS{error_part.strip()}")
-                            else:
-                                # Fallback for different error formats
-                                if 'error TS' in line:
-                                    error_part = line.split('error TS', 1)[1]
-                                    if ':' in error_part:
-                                        error_code, message = error_part.split(':', 1)
-                                        errors.append(f"TS{error_code.strip()}: {message.strip()}")
-                        except (IndexError, ValueError):
-                            # If parsing fails, include the line as-is
-                            if 'error TS' in line:
-                                errors.append(line.strip())
-
-        # Extract JavaScript errors
-        js_sections = js_check_output.split('\n\n')
-        for section in js_sections:
-            if f"Checking {file_basename}:" in section and "❌ FAILED" in section:
-                lines = section.split('\n')
-                for line in lines:
-                    if ('SyntaxError:' in line or 'ReferenceError:' in line or
-                        'TypeError:' in line or 'Error:' in line):
-                        errors.append(f"JS: {line.strip()}")
-
-        return errors
+    def write_streamed_sections(self, f: TextIO, results_stream: Path, checker: str) -> None:
+        """Write the per-file check sections for one checker from the results stream"""
+        for i, output in enumerate(iter_sorted_outputs(results_stream, checker, self.config.show_successes)):
+            if i:
+                f.write("\n\n")
+            f.write(output)
 
     def create_consolidated_file(self, examples: list[CodeExample],
-                               type_check_output: str, js_check_output: str, failing_files: set[str]) -> None:
-        """Create consolidated file with all examples and check results"""
-        output_path = Path("test_results.txt")
+                               type_check_output: str, js_check_output: str, diagnostics: DiagnosticIndex,
+                               results_stream: Path | None = None,
+                               output_path: Path = Path("test_results.txt"),
+                               execution_output: str | None = None) -> None:
+        """
+        Create consolidated file with all examples and check results.
+        With a results_stream, the per-file check sections are rendered from the JSONL stream.
+        execution_output is the summary of --execute, if examples were run.
+        """
 
         # Count examples by type
         ts_count = sum(1 for ex in examples if ex.is_typescript)
@@ -294,6 +341,8 @@ This directory contains {len(chapter_examples)} examples extracted from {chapter
             f.write("TYPESCRIPT CHECK RESULTS\n")
             f.write("=" * 80 + "\n")
             f.write(type_check_output)
+            if results_stream is not None:
+                self.write_streamed_sections(f, results_stream, "ts")
             f.write("\n\n")
 
             # JavaScript check results
@@ -301,14 +350,25 @@ This directory contains {len(chapter_examples)} examples extracted from {chapter
             f.write("JAVASCRIPT CHECK RESULTS\n")
             f.write("=" * 80 + "\n")
             f.write(js_check_output)
+            if results_stream is not None:
+                self.write_streamed_sections(f, results_stream, "js")
             f.write("\n\n")
 
+            if execution_output is not None:
+                f.write("=" * 80 + "\n")
+                f.write("EXECUTION RESULTS\n")
+                f.write("=" * 80 + "\n")
+                f.write(execution_output)
+                if results_stream is not None:
+                    self.write_streamed_sections(f, results_stream, "run")
+                f.write("\n\n")
+
             # Examples by chapter (filtered based on mode)
             chapters: dict[str, list[CodeExample]] = {}
             included_count = 0
 
             for example in examples:
-                if self.should_include_example(example, failing_files):
+                if self.should_include_example(example, diagnostics):
                     if example.chapter not in chapters:
                         chapters[example.chapter] = []
                     chapters[example.chapter].append(example)
@@ -337,16 +397,25 @@ This directory contains {len(chapter_examples)} examples extracted from {chapter
                     f.write(f"Example {i:02d} (Original #{example.number})\n")
                     f.write(f"File: {example.filename}\n")
                     f.write(f"Language: {'TypeScript' if example.is_typescript else 'JavaScript'}\n")
-                    f.write(f"Source: {example.source_file}\n")
-
-                    # Extract and display specific errors for this example
-                    example_errors = self.extract_errors_for_file(example.filename, type_check_output, js_check_output)
+                    if example.start_line:
+                        f.write(f"Source: {example.source_file}:{example.start_line}-{example.end_line}\n")
+                    else:
+                        f.write(f"Source: {example.source_file}\n")
+
+                    # Display the diagnostics recorded for this example, located in the markdown
+                    example_errors = []
+                    for diagnostic in diagnostics.for_file(example.filename):
+                        source_line = example.source_line(diagnostic.line - HEADER_LINES) if diagnostic.line else None
+                        location = f" ({Path(example.source_file).name}:{source_line})" if source_line else ""
+                        # The location goes after the first line of a multi-line message chain
+                        first, *chain = diagnostic.summary().split('\n')
+                        example_errors.append('\n'.join([first + location, *chain]))
 
                     if example_errors:
                         f.write("Status: ❌ HAS ERRORS\n")
                         f.write("Errors:\n")
                         for error in example_errors:
-                            f.write(f"  • {error}\n")
+                            f.write("  • " + error.replace('\n', '\n  ') + "\n")
                     elif self.config.include_all_examples:
                         f.write("Status: ✅ No errors\n")
 
@@ -357,14 +426,24 @@ This directory contains {len(chapter_examples)} examples extracted from {chapter
         print(f"📝 Created consolidated file: {output_path}")
 
         if not self.config.include_all_examples and len(examples) > 0:
-            included_count = sum(1 for ex in examples if self.should_include_example(ex, failing_files))
+            included_count = sum(1 for ex in examples if self.should_include_example(ex, diagnostics))
             if included_count < len(examples):
                 print(f"📊 Included {included_count} examples with errors (out of {len(examples)} total)")
 
     def cleanup(self) -> None:
         """Remove temporary files but keep the test structure"""
         node_modules = self.config.temp_dir / "node_modules"
-        if node_modules.exists():
+        if self.config.sync_workspace:
+            # A synced workspace is meant to be reused, so keep its dependencies
+            print(f"📁 Test directory preserved for next sync: {self.config.temp_dir}")
+        elif node_modules.is_symlink() or node_modules.is_junction():
+            # Only drop the link; the shared toolchain stays installed for the next run
+            if node_modules.is_symlink():
+                node_modules.unlink()
+            else:
+                node_modules.rmdir()
+            print(f"🧹 Unlinked shared node_modules")
+        elif node_modules.exists():
             shutil.rmtree(node_modules)
             print(f"🧹 Cleaned up node_modules")
         else:
@@ -0,0 +1,79 @@
+"""
+Markdown lines changed since a git ref, for --changed-since
+"""
+
+import re
+import subprocess
+from pathlib import Path
+
+from models import CodeExample
+
+# "@@ -12,3 +14,5 @@": the changed lines in the current version of the file
+HUNK_PATTERN = re.compile(r'^@@ -\d+(?:,\d+)? \+(?P<start>\d+)(?:,(?P<count>\d+))? @@')
+
+# Changed line ranges of a file (1-based, inclusive); None when the whole file is new
+LineRanges = list[tuple[int, int]] | None
+
+
+def git_output(args: list[str], cwd: Path) -> str:
+    """stdout of a git command; ValueError with git's message if it fails"""
+    try:
+        result = subprocess.run(['git', *args], cwd=cwd, capture_output=True, text=True,
+                                encoding='utf-8', timeout=60)
+    except (OSError, subprocess.SubprocessError) as e:
+        raise ValueError(f"could not run git: {e}") from None
+    if result.returncode != 0:
+        raise ValueError(result.stderr.strip() or f"git {args[0]} failed")
+    return result.stdout
+
+
+def parse_diff(diff: str, base_dir: Path) -> dict[Path, LineRanges]:
+    """Changed line ranges per file from `git diff --unified=0 --relative` output"""
+    changes: dict[Path, LineRanges] = {}
+    current: Path | None = None
+    new_file = False
+    for line in diff.splitlines():
+        if line.startswith('diff --git '):
+            current, new_file = None, False
+        elif line.startswith('new file mode'):
+            new_file = True
+        elif line.startswith('+++ '):
+            target = line[4:]
+            if target == '/dev/null':
+                continue  # Deleted: nothing left to check
+            current = (base_dir / target.removeprefix('b/')).resolve()
+            changes[current] = None if new_file else []
+        elif current is not None and (match := HUNK_PATTERN.match(line)):
+            ranges = changes[current]
+            if ranges is None:
+                continue
+            start = int(match['start'])
+            count = int(match['count']) if match['count'] is not None else 1
+            # A pure deletion ("+14,0") removed lines between line 14 and 15
+            ranges.append((start, start + count - 1) if count else (start, start + 1))
+    return changes
+
+
+def changed_markdown_lines(book_dir: Path, ref: str) -> dict[Path, LineRanges]:
+    """
+    Markdown files of book_dir whose current contents (committed or not, and untracked
+    files) differ from ref, mapped to the changed lines of their current version
+    """
+    git_output(['rev-parse', '--verify', f"{ref}^{{commit}}"], book_dir)
+    diff = git_output(['diff', '--unified=0', '--no-renames', '--no-color', '--no-ext-diff', '--relative',
+                       ref, '--', '*.md'], book_dir)
+    changes = parse_diff(diff, book_dir)
+    for untracked in git_output(['ls-files', '--others', '--exclude-standard', '--', '*.md'], book_dir).splitlines():
+        changes[(book_dir / untracked).resolve()] = None
+    return changes
+
+
+def overlaps_changes(example: CodeExample, ranges: LineRanges) -> bool:
+    """
+    Whether a change touches an example's code block, from its opening to its closing
+    fence (blank lines around the code and the fences' info strings included)
+    """
+    if ranges is None or not example.opening_fence:
+        return True
+    first, last = example.opening_fence, example.closing_fence
+    return any(start <= last and first <= end for start, end in ranges)
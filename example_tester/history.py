@@ -0,0 +1,200 @@
+"""
+Local SQLite history of test runs for trend and regression analysis
+"""
+
+import json
+import sqlite3
+import statistics
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from models import CodeExample, TestResults
+from sharding import example_key
+from tracing import CHECK_CATEGORY
+
+# Stored as PRAGMA user_version; bumped whenever SCHEMA changes
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started TEXT NOT NULL,
+    git_revision TEXT NOT NULL,
+    git_dirty INTEGER NOT NULL,
+    typescript_version TEXT NOT NULL,
+    node_version TEXT NOT NULL,
+    options TEXT NOT NULL,
+    examples INTEGER NOT NULL,
+    failed INTEGER NOT NULL,
+    success INTEGER NOT NULL,
+    seconds REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    example TEXT NOT NULL,
+    identity TEXT NOT NULL,
+    file TEXT NOT NULL,
+    source TEXT NOT NULL,
+    checker TEXT NOT NULL,
+    status TEXT NOT NULL,
+    seconds REAL,
+    PRIMARY KEY (run_id, example)
+);
+CREATE INDEX IF NOT EXISTS results_by_example ON results(example, run_id);
+CREATE TABLE IF NOT EXISTS diagnostics (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    example TEXT,
+    file TEXT NOT NULL,
+    line INTEGER,
+    column INTEGER,
+    code TEXT NOT NULL,
+    message TEXT NOT NULL,
+    checker TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS diagnostics_by_run ON diagnostics(run_id, example);
+"""
+
+
+def git_revision(directory: Path) -> tuple[str, bool]:
+    """Commit checked out in directory and whether it has uncommitted changes ('' if not a git checkout)"""
+    try:
+        revision = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=directory, capture_output=True,
+                                  text=True, timeout=10, check=True).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--', '.'], cwd=directory, capture_output=True,
+                                text=True, timeout=10, check=True).stdout
+    except (OSError, subprocess.SubprocessError):
+        return "", False
+    return revision, bool(status.strip())
+
+
+class RunHistory:
+    """
+    Records every run in a SQLite database: one row per run (git revision,
+    toolchain versions, options), one per example (status, check duration)
+    and one per diagnostic.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def connect(self) -> sqlite3.Connection:
+        """Open the database, creating or migrating the schema as needed"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA foreign_keys = ON")
+        if connection.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            connection.executescript(SCHEMA)
+            connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        return connection
+
+    def record(self, results: TestResults, examples: list[CodeExample], started: datetime, seconds: float,
+               revision: tuple[str, bool], versions: dict[str, str], options: dict[str, object]) -> int:
+        """Store one finished run and return its id"""
+        durations: dict[str, float] = {}
+        for span in results.spans:
+            if span.category == CHECK_CATEGORY and "file" in span.args and "error" not in span.args:
+                durations[str(span.args["file"])] = span.duration
+
+        example_rows = []
+        key_by_file: dict[str, str] = {}
+        for example in examples:
+            file = results.diagnostics.normalize(example.filename)
+            key = example_key(example)
+            key_by_file[file] = key
+            status = "failed" if results.diagnostics.has_errors(file) else "passed"
+            example_rows.append((key, example.identity, file, f"{Path(example.source_file).name}:{example.start_line}",
+                                 example.code_type.value, status, durations.get(file)))
+        failed = sum(1 for row in example_rows if row[5] == "failed")
+
+        with self.connect() as connection:
+            cursor = connection.execute(
+                "INSERT INTO runs (started, git_revision, git_dirty, typescript_version, node_version, options,"
+                " examples, failed, success, seconds) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (started.isoformat(timespec='seconds'), revision[0], int(revision[1]),
+                 versions.get("typescript", ""), versions.get("node", ""), json.dumps(options),
+                 len(examples), failed, int(results.success), seconds))
+            run_id = cursor.lastrowid
+            assert run_id is not None
+            connection.executemany("INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                   [(run_id, *row) for row in example_rows])
+            connection.executemany(
+                "INSERT INTO diagnostics VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, key_by_file.get(results.diagnostics.normalize(d.file)), d.file, d.line, d.column,
+                  d.code, d.message, d.checker) for d in results.diagnostics])
+        connection.close()
+        return run_id
+
+
+def latest_run_id(connection: sqlite3.Connection) -> int | None:
+    """Id of the most recent run"""
+    row = connection.execute("SELECT MAX(id) FROM runs").fetchone()
+    return row[0]
+
+
+def resolve_example(connection: sqlite3.Connection, text: str) -> str | None:
+    """
+    Example key ('03/generics-2') for a key, a generated file ('03/generics-1a2b3c4d.ts')
+    or a source location ('03.md:268'), looked up in the most recent run that has it
+    """
+    row = connection.execute(
+        "SELECT example FROM results WHERE example = ? OR file = ? OR source = ? ORDER BY run_id DESC LIMIT 1",
+        (text, text.replace('\\', '/'), text)).fetchone()
+    return row["example"] if row else None
+
+
+def slower_than_median(connection: sqlite3.Connection, factor: float, window: int,
+                       run_id: int | None = None) -> list[dict[str, Any]]:
+    """
+    Examples whose check in run_id (default: the latest run) took more than factor
+    times their median duration over the previous window runs that measured them
+    """
+    run_id = run_id or latest_run_id(connection)
+    if run_id is None:
+        return []
+    current = connection.execute(
+        "SELECT example, identity, file, source, seconds FROM results WHERE run_id = ? AND seconds IS NOT NULL",
+        (run_id,)).fetchall()
+
+    regressions: list[dict[str, Any]] = []
+    for row in current:
+        previous = connection.execute(
+            "SELECT identity, seconds FROM results WHERE example = ? AND run_id < ? AND seconds IS NOT NULL"
+            " ORDER BY run_id DESC LIMIT ?", (row["example"], run_id, window)).fetchall()
+        if not previous:
+            continue
+        median = statistics.median(sample["seconds"] for sample in previous)
+        if median > 0 and row["seconds"] > factor * median:
+            regressions.append({
+                "example": row["example"], "file": row["file"], "source": row["source"],
+                "seconds": row["seconds"], "median": median, "ratio": row["seconds"] / median,
+                "samples": len(previous),
+                "code_changed": previous[0]["identity"] != row["identity"],
+            })
+    return sorted(regressions, key=lambda r: r["ratio"], reverse=True)
+
+
+def example_timeline(connection: sqlite3.Connection, example: str) -> list[sqlite3.Row]:
+    """Status and duration of an example in every run that checked it, oldest first"""
+    return connection.execute(
+        "SELECT runs.id AS run_id, runs.started, runs.git_revision, runs.git_dirty, runs.typescript_version,"
+        " results.identity, results.status, results.seconds,"
+        " (SELECT GROUP_CONCAT(code || ': ' || message, ' | ') FROM diagnostics"
+        "  WHERE diagnostics.run_id = runs.id AND diagnostics.example = results.example) AS diagnostics"
+        " FROM results JOIN runs ON runs.id = results.run_id WHERE results.example = ? ORDER BY runs.id",
+        (example,)).fetchall()
+
+
+def failing_since(timeline: list[sqlite3.Row]) -> tuple[sqlite3.Row | None, sqlite3.Row | None]:
+    """
+    First run of the current failing streak and the last passing run before it.
+    (None, None) if the example passed in its most recent run.
+    """
+    if not timeline or timeline[-1]["status"] != "failed":
+        return None, None
+    index = len(timeline) - 1
+    while index > 0 and timeline[index - 1]["status"] == "failed":
+        index -= 1
+    return timeline[index], timeline[index - 1] if index > 0 else None
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Query the run history recorded by main.py
+
+Examples are named by key (03/generic-constraints-2 = chapter 03, second code
+block under the "Generic Constraints" heading), by generated file
+(03/generic-constraints-1a2b3c4d.ts) or by source location (03.md:268).
+
+Usage:
+    python history_query.py runs
+    python history_query.py slower --factor 2 --window 10
+    python history_query.py failing
+    python history_query.py since 03.md:268
+    python history_query.py timeline 03/generic-constraints-2
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+from history import RunHistory, example_timeline, failing_since, latest_run_id, resolve_example, slower_than_median
+
+
+def describe_run(row: sqlite3.Row) -> str:
+    """One-line description of a run: id, time, revision and TypeScript version"""
+    revision = (row["git_revision"][:10] or "no git") + ("+dirty" if row["git_dirty"] else "")
+    return f"run {row['run_id']} ({row['started']}, {revision}, TypeScript {row['typescript_version'] or '?'})"
+
+
+def show_runs(connection: sqlite3.Connection, args: argparse.Namespace) -> int:
+    """List the most recent runs"""
+    rows = connection.execute("SELECT * FROM runs ORDER BY id DESC LIMIT ?", (args.limit,)).fetchall()
+    for row in reversed(rows):
+        status = "✅" if row["success"] else "❌"
+        revision = (row["git_revision"][:10] or "no git") + ("+dirty" if row["git_dirty"] else "")
+        options = {key: value for key, value in json.loads(row["options"]).items() if value}
+        print(f"{status} {row['id']:>4}  {row['started']}  {revision:<16} TS {row['typescript_version'] or '?':<8} "
+              f"{row['failed']:>4}/{row['examples']:<5} failed  {row['seconds']:7.1f}s  {json.dumps(options)}")
+    return 0
+
+
+def show_slower(connection: sqlite3.Connection, args: argparse.Namespace) -> int:
+    """Examples whose latest check took more than factor times their median; exit 1 if there are any"""
+    regressions = slower_than_median(connection, args.factor, args.window, args.run)
+    if not regressions:
+        print(f"✅ No example got slower than {args.factor:g}x its median")
+        return 0
+    print(f"🐢 {len(regressions)} example(s) slower than {args.factor:g}x their median:")
+    for regression in regressions:
+        note = " (code changed)" if regression["code_changed"] else ""
+        print(f"   {regression['ratio']:5.1f}x  {regression['seconds']:6.2f}s vs {regression['median']:6.2f}s "
+              f"median of {regression['samples']}  {regression['file']} ({regression['source']}){note}")
+    return 1
+
+
+def show_failing(connection: sqlite3.Connection, args: argparse.Namespace) -> int:
+    """Examples that failed in a run, with the run their failure started in"""
+    run_id = args.run or latest_run_id(connection)
+    rows = connection.execute("SELECT example, file, source FROM results WHERE run_id = ? AND status = 'failed'"
+                              " ORDER BY example", (run_id,)).fetchall()
+    if not rows:
+        print(f"✅ No failing examples in run {run_id}")
+        return 0
+    print(f"❌ {len(rows)} failing example(s) in run {run_id}:")
+    for row in rows:
+        first_failure, _ = failing_since([r for r in example_timeline(connection, row["example"])
+                                          if r["run_id"] <= run_id])
+        since = f"since run {first_failure['run_id']}" if first_failure else ""
+        print(f"   {row['file']} ({row['source']}) {since}")
+    return 1
+
+
+def show_since(connection: sqlite3.Connection, args: argparse.Namespace) -> int:
+    """When an example started failing"""
+    timeline = example_timeline(connection, args.example)
+    first_failure, last_pass = failing_since(timeline)
+    if first_failure is None:
+        print(f"✅ {args.example} passed in its latest {describe_run(timeline[-1])}")
+        return 0
+    print(f"❌ {args.example} has failed since {describe_run(first_failure)}")
+    if first_failure["diagnostics"]:
+        print(f"   {first_failure['diagnostics']}")
+    if last_pass is not None:
+        changed = "code changed" if last_pass["identity"] != first_failure["identity"] else "code unchanged"
+        print(f"   Last passed in {describe_run(last_pass)} ({changed})")
+    else:
+        print("   It has failed in every recorded run")
+    return 1
+
+
+def show_timeline(connection: sqlite3.Connection, args: argparse.Namespace) -> int:
+    """Status and duration of an example in every run"""
+    previous_identity = None
+    for row in example_timeline(connection, args.example):
+        status = "✅" if row["status"] == "passed" else "❌"
+        seconds = f"{row['seconds']:6.2f}s" if row["seconds"] is not None else "   -   "
+        edited = " ✏️" if previous_identity not in (None, row["identity"]) else ""
+        print(f"{status} {describe_run(row)} {seconds}{edited}")
+        if row["diagnostics"]:
+            print(f"      {row['diagnostics']}")
+        previous_identity = row["identity"]
+    return 0
+
+
+def main() -> None:
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Query the history of example tester runs')
+    parser.add_argument('--cache-dir', default='.example_cache',
+                        help='Cache directory of the runs (default: %(default)s)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    runs = commands.add_parser('runs', help='List recent runs')
+    runs.add_argument('--limit', type=int, default=20, help='Number of runs (default: %(default)s)')
+    runs.set_defaults(handler=show_runs)
+
+    slower = commands.add_parser('slower', help='Examples that got slower than FACTOR times their median')
+    slower.add_argument('--factor', type=float, default=2.0, help='Slowdown to report (default: %(default)s)')
+    slower.add_argument('--window', type=int, default=10,
+                        help='Earlier runs the median is taken over (default: %(default)s)')
+    slower.add_argument('--run', type=int, help='Run to check (default: the latest)')
+    slower.set_defaults(handler=show_slower)
+
+    failing = commands.add_parser('failing', help='Failing examples and when they started failing')
+    failing.add_argument('--run', type=int, help='Run to list (default: the latest)')
+    failing.set_defaults(handler=show_failing)
+
+    for name, handler, help_text in (('since', show_since, 'When an example started failing'),
+                                     ('timeline', show_timeline, 'Status and duration of an example per run')):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument('example', help='03/generic-constraints-2, 03/generic-constraints-1a2b3c4d.ts or 03.md:268')
+        command.set_defaults(handler=handler)
+
+    args = parser.parse_args()
+    history_db = Path(args.cache_dir) / "history.sqlite3"
+    if not history_db.exists():
+        print(f"❌ No run history at {history_db}")
+        sys.exit(1)
+
+    connection = RunHistory(history_db).connect()
+    try:
+        if hasattr(args, 'example'):
+            example = resolve_example(connection, args.example)
+            if example is None:
+                print(f"❌ {args.example} does not appear in any recorded run")
+                sys.exit(1)
+            args.example = example
+        sys.exit(args.handler(connection, args))
+    finally:
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
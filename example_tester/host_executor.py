@@ -0,0 +1,123 @@
+"""
+TypeScript checking through the persistent compiler host (--executor host)
+"""
+
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from file_generator import COMPILER_OPTIONS, file_header, generated_filename
+from models import CodeExample, CommandNotFoundError, Diagnostic, DiagnosticIndex, FileCheckResult, TestConfig, TsHostError
+from ts_host import TypeScriptHost
+
+if TYPE_CHECKING:
+    from type_checker import TypeChecker
+
+# Snippets sent to the compiler host per request; results are streamed after each one
+HOST_BATCH_SIZE = 25
+
+
+def interpret_host_report(relative_path: str, report: dict) -> FileCheckResult:
+    """
+    Turn the compiler host's report for one snippet into a result shaped like tsc's:
+    like tsc's exit status, only error diagnostics fail it.
+    """
+    file_output = f"Checking {Path(relative_path).name}:"
+    if not any(d["category"] == "error" for d in report["diagnostics"]):
+        return FileCheckResult(file_output + " ✅ OK", [], file=relative_path)
+    diagnostics = [
+        Diagnostic(relative_path, d["line"], d["column"], d["code"], d["message"],
+                   severity=d["category"], checker="ts")
+        for d in report["diagnostics"]
+    ]
+    return FileCheckResult(f"{file_output} ❌ FAILED\n{report['output']}", [d.summary() for d in diagnostics],
+                           relative_path, diagnostics, file=relative_path)
+
+
+class HostExecutor:
+    """
+    Type-checks TypeScript examples from their source text in one long-lived Node process
+    (ts_host.mjs) that keeps the parsed lib files between programs, so no example pays
+    for a compiler start. Results and cache entries are the same as tsc's per file.
+    """
+
+    def __init__(self, config: TestConfig, checker: "TypeChecker") -> None:
+        self.config = config
+        self.checker = checker
+        self.ts_host: TypeScriptHost | None = None
+
+    def _snippet_host(self) -> TypeScriptHost:
+        """The compiler host, created on first use and kept until close()"""
+        if self.ts_host is None:
+            self.ts_host = TypeScriptHost(self.checker.cmd_discovery.command_vector('node', self.config.temp_dir),
+                                          self.config.temp_dir, self.checker.scheduler.child_env())
+        return self.ts_host
+
+    def check_snippets(self, examples: list[CodeExample]) -> list[FileCheckResult]:
+        """
+        Type-check TypeScript examples through the compiler host, HOST_BATCH_SIZE per
+        request, answering what the result cache can first.
+        """
+        records = self.checker.records
+        results: list[FileCheckResult] = []
+        pending: list[tuple[CodeExample, str, str | None]] = []
+        for example in examples:
+            relative_path = DiagnosticIndex.normalize(example.filename or generated_filename(example))
+            records.examples_by_file.setdefault(relative_path, example)
+            key = records.cache_key(self.config.temp_dir / relative_path, "ts")
+            cached = records.result_cache.get(key, relative_path) if records.result_cache and key else None
+            if cached is not None:
+                results.append(cached)
+            else:
+                pending.append((example, relative_path, key))
+        self.checker.emit(results, "ts")
+
+        for offset in range(0, len(pending), HOST_BATCH_SIZE):
+            if self.checker.stop.is_set():
+                break
+            batch = pending[offset:offset + HOST_BATCH_SIZE]
+            timeout = self.config.check_timeout * len(batch) if self.config.check_timeout else None
+            start = time.perf_counter()
+            try:
+                reports = self._snippet_host().check(
+                    [(relative_path, file_header(example) + example.code) for example, relative_path, _ in batch],
+                    COMPILER_OPTIONS, timeout)
+            except (TsHostError, CommandNotFoundError, OSError) as e:
+                batch_results = [self.checker.tooling_failure(f"Error checking {Path(relative_path).name}: {e}",
+                                                              relative_path, "ts") for _, relative_path, _ in batch]
+            else:
+                batch_results = []
+                for (example, relative_path, key), report in zip(batch, reports):
+                    # The host checks one snippet after the other, so the spans follow each other
+                    end = start + report["seconds"]
+                    records.record_check(self.config.temp_dir / relative_path, "ts", start, end,
+                                         durations=records.host_durations)
+                    start = end
+                    result = interpret_host_report(relative_path, report)
+                    if records.result_cache is not None and key is not None:
+                        records.result_cache.put(key, relative_path, result)
+                    batch_results.append(result)
+            self.checker.emit(batch_results, "ts")
+            results.extend(batch_results)
+        return results
+
+    def run(self, ts_files: list[Path]) -> tuple[str, list[str], set[str]]:
+        """TypeScript checking for --executor host. Same return shape as the other checks."""
+        if not ts_files:
+            return "✅ No TypeScript files to check", [], set()
+
+        records = self.checker.records
+        print(f"Checking {len(ts_files)} TypeScript examples in the compiler host...")
+        ordered, estimates = records.longest_first(ts_files, records.host_durations)
+        examples = [records.examples_by_file[records.relative_path(file)] for file in ordered]
+        self.checker.scheduler.begin("ts", 1)
+        start = time.perf_counter()
+        results = self.check_snippets(examples)
+        records.record_makespan("ts", ts_files, ordered, estimates, time.perf_counter() - start)
+        return self.checker.summarize_results(results, len(ts_files), "TypeScript")
+
+    def close(self) -> None:
+        """Stop the compiler host, if one was started"""
+        if self.ts_host is not None:
+            self.ts_host.close()
+            self.ts_host = None
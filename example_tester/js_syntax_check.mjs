@@ -0,0 +1,112 @@
+// Batch JavaScript syntax checker used by type_checker.py
+//
+// Reads a JSON array of file paths on stdin, parses each file in isolation
+// without executing it, and writes a JSON array of per-file results to stdout:
+//   { file, ok, errorType, message, line, column }
+//
+// Files are parsed with the module goal (the generated package.json sets
+// "type": "module"), which needs --experimental-vm-modules. Without it the
+// script goal is used instead.
+
+import { readFileSync } from 'node:fs';
+import vm from 'node:vm';
+
+const moduleGoal = typeof vm.SourceTextModule === 'function';
+
+function parse(source, file) {
+    if (moduleGoal) {
+        new vm.SourceTextModule(source, { identifier: file });
+    } else {
+        new vm.Script(source, { filename: file });
+    }
+}
+
+function tryParse(source, file) {
+    try {
+        parse(source, file);
+        return null;
+    } catch (error) {
+        return error;
+    }
+}
+
+// Whether the first n lines fail to parse with the given message
+function reproduces(lines, n, file, message) {
+    const error = tryParse(lines.slice(0, n).join('\n'), file);
+    return error !== null && error.message === message;
+}
+
+// Line and column of the script parser's error when it fails with the same
+// message, taken from the "file:line" header and caret of its stack
+function scriptPosition(source, file, message) {
+    try {
+        new vm.Script(source, { filename: file });
+        return null;
+    } catch (error) {
+        if (error.message !== message || typeof error.stack !== 'string') {
+            return null;
+        }
+        const [header, , caret] = error.stack.split('\n');
+        const line = Number(header.slice(header.lastIndexOf(':') + 1));
+        const caretIndex = caret ? caret.indexOf('^') : -1;
+        return line ? { line, column: caretIndex >= 0 ? caretIndex + 1 : null } : null;
+    }
+}
+
+// Module parse errors carry no position. Take the script parser's when the
+// first line prefix that reproduces the error confirms it; otherwise binary-search
+// for that prefix (shorter prefixes parse or end with a different error), and use
+// the line's first non-blank character as the column.
+function locate(source, file, error) {
+    const lines = source.trimEnd().split(/\r?\n/);
+    const script = scriptPosition(source, file, error.message);
+    const firstReproducing = (n) => reproduces(lines, n, file, error.message)
+        && (n === 1 || !reproduces(lines, n - 1, file, error.message));
+
+    let line = null;
+    if (error.message === 'Unexpected end of input') {
+        line = lines.length;
+    } else if (script && script.line <= lines.length && firstReproducing(script.line)) {
+        line = script.line;
+    } else {
+        let low = 1;
+        let high = lines.length;
+        while (low < high) {
+            const middle = (low + high) >> 1;
+            if (reproduces(lines, middle, file, error.message)) {
+                high = middle;
+            } else {
+                low = middle + 1;
+            }
+        }
+        line = reproduces(lines, low, file, error.message) ? low : null;
+    }
+
+    let column = script && script.line === line ? script.column : null;
+    if (column === null && line !== null) {
+        column = lines[line - 1].search(/\S/) + 1 || 1;
+    }
+    return { line, column };
+}
+
+function checkFile(file) {
+    let source;
+    try {
+        source = readFileSync(file, 'utf8');
+    } catch (error) {
+        return { file, ok: false, errorType: 'Error', message: error.message, line: null, column: null };
+    }
+
+    const error = tryParse(source, file);
+    if (error === null) {
+        return { file, ok: true, errorType: null, message: null, line: null, column: null };
+    }
+    return { file, ok: false, errorType: error.name, message: error.message, ...locate(source, file, error) };
+}
+
+const chunks = [];
+process.stdin.on('data', (chunk) => chunks.push(chunk));
+process.stdin.on('end', () => {
+    const files = JSON.parse(Buffer.concat(chunks).toString('utf8'));
+    process.stdout.write(JSON.stringify(files.map(checkFile)));
+});
@@ -0,0 +1,81 @@
+"""
+Examples that failed in the previous run, for failed-first ordering and --last-failed
+"""
+
+import json
+import os
+from pathlib import Path
+
+from models import CodeExample, code_digest
+
+
+class LastFailed:
+    """
+    Remembers the failing examples of the last run as CodeExample.identity -> section,
+    and for each such section the digests of the code of all its examples at the time.
+    An example counts as previously failing if its identity failed, or if it is under a
+    section with failures but its code was not there then: an example edited to fix it
+    (new identity and file name) is still selected by --last-failed, while its unchanged
+    siblings are not.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._failed: dict[str, str] = {}
+        self._sections: dict[str, set[str]] = {}
+
+    def load(self) -> None:
+        """Read the recorded failures (a missing or corrupt file means none)"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._failed = {str(identity): str(section) for identity, section in data["failed"].items()}
+            self._sections = {str(section): set(map(str, digests)) for section, digests in data["sections"].items()}
+        except (OSError, ValueError, AttributeError, KeyError, TypeError):
+            self._failed, self._sections = {}, {}
+
+    def save(self) -> None:
+        """Write the failures atomically"""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.path.with_suffix(".tmp")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({"failed": self._failed,
+                           "sections": {section: sorted(digests) for section, digests in self._sections.items()}},
+                          f, indent=1, sort_keys=True)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"⚠️  Warning: Could not save failing examples: {e}")
+
+    def __contains__(self, example: object) -> bool:
+        if not isinstance(example, CodeExample):
+            return False
+        if example.identity in self._failed:
+            return True
+        digests = self._sections.get(example.section)
+        return digests is not None and code_digest(example.code) not in digests
+
+    def __len__(self) -> int:
+        return len(self._failed)
+
+    def update(self, checked: list[CodeExample], failed: list[CodeExample]) -> None:
+        """
+        Replace what is known about the checked examples: those in failed are failing now,
+        the others pass. Failures recorded for code that is no longer in a checked section
+        (edited or removed since) are dropped. Examples that were not checked (other
+        chapters, --fail-fast) keep their state.
+        """
+        current: dict[str, set[str]] = {}  # Digests of the code now under each checked section
+        for example in checked:
+            if example.section not in current:
+                codes = example.source.codes_under(example.source.heading(example.block))
+                current[example.section] = {code_digest(code) for code in codes}
+        checked_identities = {example.identity for example in checked}
+        self._failed = {identity: section for identity, section in self._failed.items()
+                        if identity not in checked_identities and
+                        (section not in current or identity.split(':', 1)[1] in current[section])}
+        for example in failed:
+            self._failed[example.identity] = example.section
+        failing_sections = set(self._failed.values())
+        self._sections = {section: current.get(section, self._sections.get(section, set()))
+                          for section in failing_sections}
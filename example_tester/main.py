@@ -4,13 +4,25 @@ TypeScript/JavaScript Example Tester - Main Entry Point
 Extracts code blocks from markdown files and tests them with appropriate tools
 """
 
+import sqlite3
 import sys
+import time
+from datetime import datetime
+from pathlib import Path
 
+from durations import DurationHistory
 from extractor import CodeExtractor
 from file_generator import FileGenerator
-from models import TestConfig, TestResults
+from git_changes import changed_markdown_lines
+from history import RunHistory, git_revision
+from matrix import MATRIX_REPORT, PROFILES, CompatibilityMatrix
+from models import CodeExample, DiagnosticIndex, TestConfig, TestResults
+from result_sink import JsonlResultSink, load_diagnostics
+from sharding import parse_shard, partition, partition_fingerprint
+from tracing import CHECK_CATEGORY, Tracer, slowest_spans, write_chrome_trace
 from type_checker import TypeChecker
 from utils import CommandDiscovery
+from watcher import BookWatcher, changed_examples
 
 
 class ExampleTester:
@@ -18,19 +30,53 @@ class ExampleTester:
 
     def __init__(self, config: TestConfig) -> None:
         self.config = config
-        self.cmd_discovery = CommandDiscovery()
+        self.cmd_discovery = CommandDiscovery(config.cache_dir / "command_discovery.json")
+        self.cmd_discovery.use_direct = config.direct_invocation
         self.extractor = CodeExtractor(config)
-        self.type_checker = TypeChecker(config, self.cmd_discovery)
+        self.tracer = Tracer()
+        self.type_checker = TypeChecker(config, self.cmd_discovery, self.tracer)
         self.file_generator = FileGenerator(config)
+        self.sink = JsonlResultSink(config.results_stream)
+        self.type_checker.sink = self.sink
+        self.examples: list[CodeExample] = []
+        self.report_complete = False
+        self.run_metadata: dict[str, object] = {}
 
     def run(self) -> TestResults:
         """Run the complete test suite and create consolidated file"""
         print(f"🔍 Extracting examples from: {self.config.book_dir}")
         print(f"📁 Using test directory: {self.config.temp_dir}")
+        self.tracer.reset()
+        started = datetime.now()
 
         try:
+            if self.config.changed_since:
+                error = self.limit_to_changes(self.config.changed_since)
+                if error:
+                    return TestResults(
+                        total_examples=0,
+                        typescript_examples=0,
+                        javascript_examples=0,
+                        type_check_passed=False,
+                        js_check_passed=False,
+                        errors=[error]
+                    )
+
             # Extract examples
-            examples = self.extractor.extract_all_examples()
+            with self.tracer.span("extract", "phase") as args:
+                examples = self.extractor.extract_all_examples()
+                args["examples"] = len(examples)
+            self.examples = examples
+            if not examples and self.config.changed_since:
+                print(f"✅ No examples changed since {self.config.changed_since}")
+                return TestResults(
+                    total_examples=0,
+                    typescript_examples=0,
+                    javascript_examples=0,
+                    type_check_passed=True,
+                    js_check_passed=True,
+                    errors=[]
+                )
             if not examples:
                 return TestResults(
                     total_examples=0,
@@ -41,6 +87,24 @@ class ExampleTester:
                     errors=["No code examples found"]
                 )
 
+            if self.config.last_failed:
+                examples = self.select_last_failed(examples)
+                self.examples = examples
+                if not examples:
+                    print("✅ No examples failed in the last run")
+                    return TestResults(
+                        total_examples=0,
+                        typescript_examples=0,
+                        javascript_examples=0,
+                        type_check_passed=True,
+                        js_check_passed=True,
+                        errors=[]
+                    )
+
+            if self.config.shard:
+                examples = self.select_shard(examples)
+                self.examples = examples
+
             # Count examples by type
             ts_count = sum(1 for ex in examples if ex.is_typescript)
             js_count = sum(1 for ex in examples if ex.is_javascript)
@@ -48,42 +112,298 @@ class ExampleTester:
             print(f"📄 Extracted {len(examples)} examples ({ts_count} TypeScript, {js_count} JavaScript)")
 
             # Create test files
-            self.file_generator.create_test_files(examples)
+            with self.tracer.span("workspace setup", "phase"):
+                self.file_generator.create_test_files(examples)
 
-            # Run checks and create consolidated file
+            # Run checks, streaming each result, and create consolidated file from the stream
             print("Running syntax and type checks...")
-            ts_output, js_output, all_errors, failing_files = self.type_checker.run_checks()
+            self.sink.open(examples=len(examples), chapters=self.config.specific_chapters, **self.run_metadata)
+            with self.tracer.span("checks", "phase"):
+                ts_output, js_output, all_errors, diagnostics = self.type_checker.run_checks(examples)
 
-            self.file_generator.create_consolidated_file(examples, ts_output, js_output, failing_files)
+            self.sink.close()
+            with self.tracer.span("report", "phase"):
+                self.file_generator.create_consolidated_file(examples, ts_output, js_output, diagnostics,
+                                                             self.config.results_stream,
+                                                             execution_output=self.type_checker.execution.output)
+            self.report_complete = True
 
             # Determine if checks passed
             ts_passed = len([e for e in all_errors if e.startswith('TS')]) == 0
             js_passed = len([e for e in all_errors if e.startswith('JS')]) == 0
+            run_passed = len([e for e in all_errors if e.startswith('RUN')]) == 0
+            cache = self.type_checker.records.result_cache
+            unchecked = self.remember_failures(examples, diagnostics)
 
-            return TestResults(
+            results = TestResults(
                 total_examples=len(examples),
                 typescript_examples=ts_count,
                 javascript_examples=js_count,
                 type_check_passed=ts_passed,
                 js_check_passed=js_passed,
-                errors=all_errors
+                errors=all_errors,
+                diagnostics=diagnostics,
+                cache_hits=cache.hits if cache else 0,
+                cache_misses=cache.misses if cache else 0,
+                provision_seconds=self.type_checker.provisioner.provision_seconds,
+                concurrency_levels=self.type_checker.scheduler.levels,
+                peak_checker_rss_mb=self.type_checker.scheduler.peak_mb,
+                makespans=self.type_checker.records.makespans,
+                spans=self.tracer.spans,
+                executed_examples=self.type_checker.execution.executed,
+                execution_passed=run_passed,
+                unchecked_examples=unchecked,
+                unchecked_reason=self.unchecked_reason() if unchecked else ""
             )
+            if self.config.record_history:
+                self.record_history(results, started)
+            return results
 
         finally:
+            self.sink.close()
+            self.type_checker.close()
             if self.config.cleanup:
-                self.file_generator.cleanup()
+                with self.tracer.span("cleanup", "phase"):
+                    self.file_generator.cleanup()
+            self.write_trace()
+
+    def run_matrix(self) -> bool:
+        """
+        Check every TypeScript example once per --matrix version and profile and write
+        the example x cell grid. Returns True if every example passes in every cell.
+        """
+        print(f"🔍 Extracting examples from: {self.config.book_dir}")
+        print(f"📁 Using test directory: {self.config.temp_dir}")
+        self.tracer.reset()
+        try:
+            with self.tracer.span("extract", "phase") as args:
+                examples = self.extractor.extract_all_examples()
+                args["examples"] = len(examples)
+            self.examples = examples
+            ts_examples = [example for example in examples if example.is_typescript]
+            if not ts_examples:
+                print("❌ No TypeScript examples found")
+                return False
+
+            with self.tracer.span("workspace setup", "phase"):
+                self.file_generator.create_test_files(examples)
+            matrix = CompatibilityMatrix(self.config, self.type_checker)
+            with self.tracer.span("checks", "phase"):
+                grid = matrix.run(ts_examples)
+            with self.tracer.span("report", "phase"):
+                matrix.write_report(grid, ts_examples, MATRIX_REPORT)
+            matrix.print_summary(grid)
+            return matrix.all_passed(grid)
+        finally:
+            if self.config.cleanup:
+                with self.tracer.span("cleanup", "phase"):
+                    self.file_generator.cleanup()
+            self.write_trace()
+
+    def limit_to_changes(self, ref: str) -> str | None:
+        """
+        Restrict extraction to the markdown files changed since ref, and within them to the
+        code blocks whose lines (fences included) were changed. Returns an error message if git fails.
+        """
+        try:
+            changes = self.extractor.changed_lines = changed_markdown_lines(self.config.book_dir, ref)
+        except ValueError as e:
+            print(f"❌ Could not find the changes since {ref}: {e}")
+            return f"--changed-since {ref}: {e}"
+        new_files = sum(1 for ranges in changes.values() if ranges is None)
+        hunks = sum(len(ranges) for ranges in changes.values() if ranges)
+        print(f"🔀 {len(changes)} markdown file(s) changed since {ref} "
+              f"({hunks} changed hunk(s), {new_files} new file(s))")
+        return None
+
+    def select_last_failed(self, examples: list[CodeExample]) -> list[CodeExample]:
+        """Keep only the examples that failed in the previous run (or were edited since)"""
+        last_failed = self.type_checker.records.last_failed
+        last_failed.load()
+        selected = [example for example in examples if example in last_failed]
+        if selected:
+            print(f"🔁 Rechecking {len(selected)} of {len(examples)} examples that failed in the last run")
+        return selected
+
+    def remember_failures(self, examples: list[CodeExample], diagnostics: DiagnosticIndex) -> int:
+        """
+        Record which of the checked examples fail, for failed-first ordering and --last-failed.
+        Returns the number of examples that were not checked.
+        """
+        checked = [example for example in examples
+                   if diagnostics.normalize(example.filename) in self.type_checker.checked]
+        failed = [example for example in checked if diagnostics.has_errors(example.filename)]
+        last_failed = self.type_checker.records.last_failed
+        last_failed.update(checked, failed)
+        last_failed.save()
+        return len(examples) - len(checked)
+
+    def unchecked_reason(self) -> str:
+        """Why some examples got no check result"""
+        if self.type_checker.setup_error:
+            return "dependency setup failed"
+        if self.config.fail_fast and self.type_checker.stop.is_set():
+            return "stopped by --fail-fast"
+        return "the checker reported no result for them"
+
+    def select_shard(self, examples: list[CodeExample]) -> list[CodeExample]:
+        """
+        Keep only this machine's share of the examples. Shards are balanced by count, or by
+        the durations in --shard-durations, which every shard must be given to agree on the split.
+        """
+        assert self.config.shard is not None
+        index, count = self.config.shard
+        if self.config.shard_durations:
+            durations = DurationHistory(self.config.shard_durations)
+            durations.load()
+            estimate = lambda example: durations.estimate(example.identity)
+        else:
+            estimate = lambda example: 1.0
+        shards = partition(examples, count, estimate)
+        selected = shards[index - 1]
 
+        self.run_metadata = {
+            "shard": f"{index}/{count}",
+            "partition": partition_fingerprint(shards),
+            "book_examples": len(examples),
+        }
+        if self.config.shard_durations:
+            shard_cost = sum(estimate(example) for example in selected)
+            total_cost = sum(estimate(example) for example in examples)
+            balance = f"~{shard_cost:.1f}s of ~{total_cost:.1f}s estimated check time"
+        else:
+            balance = "balanced by count"
+        print(f"🧩 Shard {index}/{count}: {len(selected)} of {len(examples)} examples ({balance})")
+        return selected
 
-def print_results(results: TestResults) -> None:
-    """Print test results to console"""
+    def watch(self) -> None:
+        """
+        Run once, then keep the workspace and toolchain and recheck only the added or
+        edited examples of each chapter file as it is saved. Runs until interrupted.
+        """
+        results = self.run()
+        print_results(results)
+
+        by_source: dict[str, list[CodeExample]] = {}
+        for example in self.examples:
+            by_source.setdefault(example.source_file, []).append(example)
+        errors_by_identity = {
+            example.identity: [d.summary() for d in results.diagnostics.for_file(example.filename)]
+            for example in self.examples
+        }
+
+        # Incremental results go to the console only; the last full report stays as written
+        self.type_checker.sink = None
+        watcher = BookWatcher(self.extractor)
+        watcher.start()
+        print(f"\n👀 Watching {self.config.book_dir} for changes (Ctrl-C to stop)...")
+
+        while True:
+            changed, deleted = watcher.wait_for_changes()
+            start = time.perf_counter()
+
+            for markdown_file in deleted:
+                by_source.pop(str(markdown_file), None)
+                print(f"🗑️  {markdown_file.name} deleted")
+            if deleted:
+                self.file_generator.remove_stale_chapters(
+                    {example.chapter for examples in by_source.values() for example in examples})
+
+            to_check: list[CodeExample] = []
+            for markdown_file in changed:
+                examples = self.extractor.extract_code_blocks(markdown_file)
+                to_check.extend(changed_examples(by_source.get(str(markdown_file), []), examples))
+                by_source[str(markdown_file)] = examples
+                self.file_generator.create_chapter_files({markdown_file.stem: examples})
+
+            self.examples = [example for examples in by_source.values() for example in examples]
+            current = {example.identity for example in self.examples}
+            errors_by_identity = {identity: errors for identity, errors in errors_by_identity.items()
+                                  if identity in current}
+
+            names = ', '.join(markdown_file.name for markdown_file in changed)
+            print(f"\n🔁 {names or 'Chapters'} changed: rechecking {len(to_check)} added or edited example(s)")
+            check_results = {result.file: result
+                             for result in self.type_checker.check_examples(to_check, self.examples)}
+            for example in to_check:
+                result = check_results.get(example.filename.replace('\\', '/'))
+                errors = result.errors if result else ["No result"]
+                errors_by_identity[example.identity] = errors
+                if errors:
+                    print(f"   ❌ {example.filename} (example {example.number} in {Path(example.source_file).name})")
+                    for error in errors:
+                        print(f"      {error}")
+                else:
+                    print(f"   ✅ {example.filename}")
+
+            checked = [example for example in to_check if example.filename.replace('\\', '/') in check_results]
+            self.type_checker.records.last_failed.update(checked, [example for example in checked
+                                                                   if errors_by_identity[example.identity]])
+            self.type_checker.records.last_failed.save()
+
+            failing = sum(1 for example in self.examples if errors_by_identity.get(example.identity))
+            status = f"❌ {failing} failing" if failing else "✅ all passing"
+            print(f"{status} of {len(self.examples)} examples ({time.perf_counter() - start:.2f}s)")
+
+    def record_history(self, results: TestResults, started: datetime) -> None:
+        """Append this run to the history database; a failure to record never fails the run"""
+        options = {
+            "chapters": self.config.specific_chapters,
+            "batch_mode": self.config.batch_mode,
+            "executor": self.config.executor,
+            "use_cache": self.config.use_cache,
+            **self.run_metadata,
+        }
+        versions = {
+            "typescript": self.type_checker.typescript_version(),
+            "node": self.cmd_discovery.get_version('node'),
+        }
+        try:
+            run_id = RunHistory(self.config.history_db).record(
+                results, self.examples, started, time.perf_counter() - self.tracer.origin,
+                git_revision(self.config.book_dir), versions, options)
+            print(f"🗃️  Recorded as run {run_id} in {self.config.history_db}")
+        except (sqlite3.Error, OSError) as e:
+            print(f"⚠️  Warning: Could not record run history: {e}")
+
+    def write_trace(self) -> None:
+        """Write the spans recorded so far to the configured Chrome trace file"""
+        if self.config.trace_file is None:
+            return
+        try:
+            write_chrome_trace(self.tracer.spans, self.config.trace_file)
+            print(f"🧭 Trace written to {self.config.trace_file} (open in ui.perfetto.dev or chrome://tracing)")
+        except OSError as e:
+            print(f"⚠️  Warning: Could not write trace {self.config.trace_file}: {e}")
+
+    def write_partial_report(self) -> None:
+        """Render test_results.txt from the results streamed before the run was interrupted"""
+        self.sink.close()
+        if self.report_complete or not self.examples or not self.config.results_stream.exists():
+            return
+
+        diagnostics = load_diagnostics(self.config.results_stream)
+        note = "⚠️  Run interrupted - partial results:\n\n"
+        self.file_generator.create_consolidated_file(self.examples, note, note, diagnostics,
+                                                     self.config.results_stream)
+
+
+def print_results(results: TestResults, slowest: int = 10) -> None:
+    """Print test results to console, followed by the phase timings and the slowest checks"""
     if results.success:
         print(f"✅ Successfully processed {results.total_examples} examples")
         print(f"   TypeScript: {results.typescript_examples} examples")
         print(f"   JavaScript: {results.javascript_examples} examples")
+        if results.executed_examples:
+            print(f"   Executed: {results.executed_examples} examples")
     else:
         print(f"⚠️  Processed {results.total_examples} examples with issues:")
         print(f"   TypeScript: {results.typescript_examples} examples (passed: {results.type_check_passed})")
         print(f"   JavaScript: {results.javascript_examples} examples (passed: {results.js_check_passed})")
+        if results.executed_examples:
+            print(f"   Executed: {results.executed_examples} examples (passed: {results.execution_passed})")
+        if results.unchecked_examples:
+            print(f"   Not checked: {results.unchecked_examples} examples ({results.unchecked_reason})")
 
         if results.errors:
             print(f"\n❌ Found {len(results.errors)} error(s):")
@@ -93,6 +413,42 @@ def print_results(results: TestResults) -> None:
                 print(f"   {i:2d}. {display_error}")
             print(f"\n📄 See test_results.txt for complete details")
 
+    if results.provision_seconds:
+        print(f"📦 Toolchain provisioning: {results.provision_seconds:.2f}s")
+    if results.cache_hits or results.cache_misses:
+        print(f"💾 Result cache: {results.cache_hits} hits, {results.cache_misses} misses")
+    if results.concurrency_levels:
+        levels = results.concurrency_levels
+        level_range = f"{min(levels)}" if min(levels) == max(levels) else f"{min(levels)}-{max(levels)}"
+        peaks = ", ".join(f"{checker} {mb:.0f} MB" for checker, mb in results.peak_checker_rss_mb.items())
+        print(f"⚙️  Checker concurrency: {level_range}" + (f" (peak RSS: {peaks})" if peaks else ""))
+    for checker, makespan in results.makespans.items():
+        print(f"⏱️  {checker} makespan: expected {makespan.expected:.2f}s longest-first "
+              f"vs {makespan.listing_order:.2f}s in listing order, actual {makespan.actual:.2f}s "
+              f"({makespan.jobs} checks on {makespan.workers} workers, "
+              f"{makespan.with_history} with recorded durations)")
+
+    phases = sorted((span for span in results.spans if span.category == "phase"), key=lambda span: span.start)
+    if phases:
+        print("⏱️  Phases: " + ", ".join(f"{span.name} {span.duration:.2f}s" for span in phases))
+    checks = slowest_spans(results.spans, CHECK_CATEGORY, slowest)
+    if checks:
+        print(f"🐢 Slowest {len(checks)} check(s):")
+        for span in checks:
+            where = f" ({span.args['source']})" if "source" in span.args else ""
+            note = f" [{span.args['error']}]" if "error" in span.args else ""
+            print(f"   {span.duration:7.2f}s  {span.name}{where}{note}")
+
+
+def shard_argument(text: str) -> tuple[int, int]:
+    """argparse type for --shard"""
+    import argparse
+
+    try:
+        return parse_shard(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
 
 def main() -> None:
     """Main entry point"""
@@ -108,12 +464,68 @@ Examples:
   python main.py --show-successes        # Test all chapters (show successful checks)
   python main.py --chapters 1 2 3       # Test specific chapters (errors only)
   python main.py --no-cleanup           # Keep temporary files
+  python main.py --batch chapter        # One TypeScript program per chapter
+  python main.py --no-cache             # Recheck every example, ignoring cached results
+  python main.py --sync                 # Keep the test directory, rewrite only changed files
+  python main.py --executor async       # Run checker processes from an asyncio event loop
+  python main.py --executor host        # Type-check TypeScript from memory in one compiler process
+  python main.py --chapters 3 --watch   # Recheck edited examples of chapter 3 on every save
+  python main.py --shard 2/4 --results-jsonl shard-2.jsonl
+                                        # Check the second of four shards of equal size
+  python main.py --shard 2/4 --shard-durations durations.json
+                                        # Balance the shards by check durations shared by all of them
+  python merge_results.py shard-*.jsonl # Combine shard results into one report and exit code
+  python main.py --trace trace.json     # Write a timeline of phases and checker processes
+  python main.py --changed-since origin/main
+                                        # Check only code blocks changed on this branch
+  python main.py --execute              # Also run examples that document their output
+  python main.py --last-failed --fail-fast
+                                        # Recheck last run's failures, stop at the first one
+  python main.py --matrix 4.9 5.0 latest --profiles default loose
+                                        # Check TypeScript examples per version and profile
+  python history_query.py slower        # Examples that got slower than 2x their median
+  python history_query.py since 03.md:268
+                                        # When the example at 03.md:268 started failing
 
 Note: 
   - TypeScript (.ts) examples are checked with the TypeScript compiler
   - JavaScript (.js) examples are checked with Node.js syntax validation
   - Examples maintain the order they appear in the markdown files
   - Use --show-successes to see successful file checks in the output
+  - Results are streamed to test_results.jsonl as checks complete; test_results.txt
+    is rendered from that stream (also after Ctrl-C, with the results so far)
+  - --batch checks each chapter (or the whole tree) as one incremental program;
+    .tsbuildinfo files are kept in the cache directory between runs
+  - --executor host sends TypeScript examples to ts_host.mjs, which keeps lib.d.ts
+    and @types parsed between examples; no .ts files are written
+  - A check that exceeds --timeout is killed (with its whole process group under
+    --executor async) and reported as a failure
+  - Concurrency is capped by CPU count and by available memory divided by the
+    largest peak RSS of the last 20 checker processes, each measured as it exits
+    (os.wait4; default estimates on Windows)
+  - Check durations are recorded per example in the cache directory; later runs
+    start the slowest examples first
+  - --trace writes Chrome trace JSON (ui.perfetto.dev, chrome://tracing) with one
+    track per thread for phases and one per concurrent checker process
+  - --changed-since compares the working tree (including uncommitted and untracked
+    chapters) with the ref and keeps the code blocks whose lines or fences changed
+  - Every run is recorded (status, diagnostics and duration per example, TypeScript
+    version, git revision) in history.sqlite3 in the cache directory; query it with
+    history_query.py
+  - --execute runs the examples with a "// Output:" comment block, or a trailing
+    comment on every console.log line, and compares what they print; TypeScript is
+    transpiled first. Only "// Output:" blocks can fail the run: problems of examples
+    with inline comments (compared leniently) are listed as warnings. Examples marked
+    "// @skip-execute", and examples that use names declared by an earlier example
+    (ReferenceError), are skipped. Examples run in a pool of Node worker threads, each
+    with a wall-clock timeout, a CPU time budget, a heap limit and (Node 20+) no
+    permission to write files or start processes
+  - Examples that failed in the last run are checked first (the list is kept in
+    last_failed.json in the cache directory); --last-failed checks only those, and
+    --fail-fast stops starting checks after the first failure
+  - --matrix installs each TypeScript version as its own toolchain in the cache
+    directory, checks every TypeScript example per version and --profiles entry
+    (cached per cell) and writes the grid to test_matrix.txt
         """
     )
 
@@ -129,8 +541,65 @@ Note:
                         help='Show successful file checks in TypeScript/JavaScript results sections')
     parser.add_argument('--chapters', type=int, nargs='+',
                         help='Test only specific chapters (e.g., --chapters 1 2 5)')
+    parser.add_argument('--batch', choices=['chapter', 'tree'],
+                        help='Type-check TypeScript examples as one program per chapter or for the whole tree')
+    parser.add_argument('--cache-dir',
+                        help='Directory for state kept between runs (default: ./.example_cache)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Ignore cached check results and recheck every example')
+    parser.add_argument('--sync', action='store_true',
+                        help='Keep the test directory and node_modules, writing only changed example files')
+    parser.add_argument('--use-npx', action='store_true',
+                        help='Run tsc through npx instead of invoking the local compiler directly')
+    parser.add_argument('--results-jsonl', default='test_results.jsonl',
+                        help='Stream of per-file results, written as checks complete (default: %(default)s)')
+    parser.add_argument('--watch', action='store_true',
+                        help='After the first run, recheck added or edited examples whenever a chapter is saved '
+                             '(implies --sync)')
+    parser.add_argument('--shard', type=shard_argument, metavar='K/N',
+                        help='Check only shard K of N, balanced by example count')
+    parser.add_argument('--shard-durations', metavar='FILE',
+                        help='Balance --shard by the check durations in FILE (a durations.json from the '
+                             'cache directory); give every shard the same file')
+    parser.add_argument('--executor', choices=['thread', 'async', 'host'], default='thread',
+                        help='Run per-file checks from a thread pool or an asyncio event loop, or type-check '
+                             'TypeScript in one persistent compiler host (default: %(default)s)')
+    parser.add_argument('--max-check-memory', type=int, metavar='MB',
+                        help='Cap the V8 heap of each checker process (sets --max-old-space-size)')
+    parser.add_argument('--timeout', type=float, default=120.0, metavar='SECONDS',
+                        help='Per-example check timeout, 0 to disable (default: %(default)s)')
+    parser.add_argument('--trace', metavar='FILE',
+                        help='Write a Chrome trace of the run phases and checker processes to FILE')
+    parser.add_argument('--slowest', type=int, default=10, metavar='N',
+                        help='Number of slowest checks listed after the run, 0 to hide (default: %(default)s)')
+    parser.add_argument('--changed-since', metavar='REF',
+                        help='Check only code blocks in markdown files changed since the git ref REF')
+    parser.add_argument('--no-history', action='store_true',
+                        help='Do not record this run in the history database')
+    parser.add_argument('--execute', action='store_true',
+                        help='Run examples that document their output and compare what they print')
+    parser.add_argument('--execute-timeout', type=float, default=10.0, metavar='SECONDS',
+                        help='Wall-clock limit per executed example (default: %(default)s)')
+    parser.add_argument('--execute-cpu', type=int, default=5, metavar='SECONDS',
+                        help='CPU time (busy event loop) limit per executed example, 0 to disable (default: %(default)s)')
+    parser.add_argument('--execute-memory', type=int, default=256, metavar='MB',
+                        help='V8 heap limit per executed example (default: %(default)s)')
+    parser.add_argument('--last-failed', action='store_true',
+                        help='Check only the examples that failed in the previous run')
+    parser.add_argument('--fail-fast', action='store_true',
+                        help='Stop starting checks after the first failure')
+    parser.add_argument('--matrix', nargs='+', metavar='VERSION',
+                        help='Check TypeScript examples against each typescript npm version (e.g. 4.9 5.4 latest)')
+    parser.add_argument('--profiles', nargs='+', choices=list(PROFILES), default=['default'],
+                        help='compilerOptions profiles checked per --matrix version (default: %(default)s)')
 
     args = parser.parse_args()
+    if args.matrix and args.executor == 'host':
+        parser.error("--matrix checks generated .ts files, which --executor host does not write")
+    if args.shard_durations and not args.shard:
+        parser.error("--shard-durations needs --shard")
+    if args.shard_durations and not Path(args.shard_durations).is_file():
+        parser.error(f"--shard-durations: {args.shard_durations} does not exist")
 
     config = TestConfig.from_args(
         book_dir=args.book_dir,
@@ -138,18 +607,45 @@ Note:
         specific_chapters=args.chapters,
         cleanup=not args.no_cleanup,
         include_all_examples=args.everything,
-        show_successes=args.show_successes
+        show_successes=args.show_successes,
+        batch_mode=args.batch,
+        cache_dir=args.cache_dir,
+        use_cache=not args.no_cache,
+        sync_workspace=args.sync or args.watch,
+        direct_invocation=not args.use_npx,
+        results_stream=args.results_jsonl,
+        executor=args.executor,
+        check_timeout=args.timeout,
+        max_check_memory_mb=args.max_check_memory,
+        shard=args.shard,
+        shard_durations=args.shard_durations,
+        trace_file=args.trace,
+        record_history=not args.no_history,
+        changed_since=args.changed_since,
+        execute=args.execute,
+        execute_timeout=args.execute_timeout,
+        execute_cpu_seconds=args.execute_cpu,
+        execute_memory_mb=args.execute_memory,
+        last_failed=args.last_failed,
+        fail_fast=args.fail_fast,
+        matrix_versions=args.matrix,
+        matrix_profiles=args.profiles
     )
 
     tester = ExampleTester(config)
 
     try:
+        if args.matrix:
+            sys.exit(0 if tester.run_matrix() else 1)
+        if args.watch:
+            tester.watch()  # Only returns by Ctrl-C
         results = tester.run()
-        print_results(results)
+        print_results(results, args.slowest)
         sys.exit(0 if results.success else 1)
 
     except KeyboardInterrupt:
         print("\n⏹️  Processing interrupted")
+        tester.write_partial_report()
         if config.cleanup:
             tester.file_generator.cleanup()
         sys.exit(1)
@@ -0,0 +1,249 @@
+"""
+TypeScript compatibility matrix: every TypeScript example checked against several
+compiler versions and compilerOptions profiles in one run (--matrix)
+"""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from async_runner import AsyncCheckRunner
+from file_generator import COMPILER_OPTIONS, option_args
+from models import CodeExample, FileCheckResult, MatrixCell, ProcessOutcome, TestConfig
+from result_cache import ResultCache
+from tracing import CHECK_CATEGORY
+from type_checker import TypeChecker
+
+# compilerOptions profiles an example can be checked with, applied over COMPILER_OPTIONS
+PROFILES: dict[str, dict[str, object]] = {
+    "default": {},  # The options of a normal run (COMPILER_OPTIONS)
+    "loose": {"strict": False},
+    "es5": {"strict": True, "target": "ES5"},
+    "es2022": {"strict": True, "target": "ES2022", "module": "ES2022"},
+}
+
+MATRIX_REPORT = Path("test_matrix.txt")
+
+# Per example, the result of each cell by label
+Grid = dict[str, dict[str, FileCheckResult]]
+
+
+def with_typescript_version(package_json: str, version: str) -> str:
+    """The test directory's package.json with typescript pinned to an npm version spec"""
+    package = json.loads(package_json)
+    package.setdefault("devDependencies", {})["typescript"] = version
+    return json.dumps(package, indent=2)
+
+
+def cell_status(result: FileCheckResult | None) -> str:
+    """Short grid entry for one cell's result"""
+    if result is None:
+        return "-"
+    if not result.errors:
+        return "✅"
+    if not result.failing_path:
+        return "⚠️ ERROR"  # The check could not run
+    return f"❌ {result.diagnostics[0].code}" if result.diagnostics else "❌"
+
+
+class CompatibilityMatrix:
+    """
+    Provisions one toolchain per TypeScript version side by side in the shared
+    toolchain cache, then checks each generated .ts file once per (version, profile)
+    cell. All cells share one queue of checker processes, ordered slowest first, and
+    every cell has its own result cache environment.
+    """
+
+    def __init__(self, config: TestConfig, checker: TypeChecker) -> None:
+        self.config = config
+        self.checker = checker
+        versions = list(dict.fromkeys(config.matrix_versions or []))
+        profiles = list(dict.fromkeys(config.matrix_profiles))
+        self.cells = [MatrixCell(version, profile, PROFILES[profile])
+                      for version in versions for profile in profiles]
+        self.caches: dict[str, ResultCache] = {}
+
+    def provision(self) -> None:
+        """Install (or reuse) the toolchain of every version, several at once"""
+        try:
+            package_json = (self.config.temp_dir / "package.json").read_text(encoding='utf-8')
+        except OSError as e:
+            for cell in self.cells:
+                cell.error = f"Could not read package.json: {e}"
+            return
+
+        def install(version: str) -> tuple[Path | None, str]:
+            try:
+                return self.checker.provisioner.ensure(with_typescript_version(package_json, version)), ""
+            except Exception as e:
+                return None, f"Could not install typescript@{version}: {e}"
+
+        versions = list(dict.fromkeys(cell.version for cell in self.cells))
+        with self.checker.tracer.span("provision matrix", "step", versions=len(versions)):
+            with ThreadPoolExecutor(max_workers=len(versions)) as executor:
+                installed = dict(zip(versions, executor.map(install, versions)))
+
+        for cell in self.cells:
+            cell.toolchain_dir, cell.error = installed[cell.version]
+            if cell.toolchain_dir is None:
+                continue
+            try:
+                ts_package = cell.toolchain_dir / "node_modules" / "typescript" / "package.json"
+                cell.installed = json.loads(ts_package.read_text(encoding='utf-8')).get("version", "")
+            except (OSError, ValueError):
+                cell.error = f"typescript@{cell.version} is not installed in {cell.toolchain_dir}"
+
+    def _cache(self, cell: MatrixCell) -> ResultCache | None:
+        if not self.config.use_cache:
+            return None
+        if cell.label not in self.caches:
+            self.caches[cell.label] = ResultCache(self.config.cache_dir, {
+                "typescript": cell.installed,
+                "compilerOptions": json.dumps({**COMPILER_OPTIONS, **cell.options}, sort_keys=True),
+                "node": self.checker.cmd_discovery.get_version('node'),
+                "matrix": "per-file",
+            })
+        return self.caches[cell.label]
+
+    def check_args(self, cell: MatrixCell, file: Path) -> list[str]:
+        """tsc arguments checking one generated file under a cell's profile and @types"""
+        assert cell.toolchain_dir is not None
+        args = option_args({**COMPILER_OPTIONS, **cell.options})
+        types_dir = cell.toolchain_dir / "node_modules" / "@types"
+        if types_dir.is_dir():
+            args += ['--typeRoots', str(types_dir.resolve())]
+        return args + [self.checker.records.relative_path(file)]
+
+    def run(self, examples: list[CodeExample]) -> Grid:
+        """Check the generated files of the TypeScript examples in every cell"""
+        self.provision()
+        durations = self.checker.records.durations
+        durations.load()
+        files = {self.config.temp_dir / example.filename: example for example in examples if example.is_typescript}
+        grid: Grid = {self.checker.records.relative_path(file): {} for file in files}
+
+        jobs: list[tuple[tuple[MatrixCell, Path], list[str]]] = []
+        for cell in self.cells:
+            tsc = self.checker.cmd_discovery.resolve_tsc(cell.toolchain_dir) if cell.toolchain_dir else None
+            if tsc is None and not cell.error:
+                cell.error = f"No tsc for typescript@{cell.version} (a direct node invocation is required)"
+            cache = self._cache(cell) if not cell.error else None
+            for file, example in files.items():
+                relative_path = self.checker.records.relative_path(file)
+                if cell.error:
+                    grid[relative_path][cell.label] = self.checker.tooling_failure(
+                        f"Error checking {file.name}: {cell.error}", relative_path, "ts")
+                    continue
+                cached = cache.get(cache.key(example.code, example.code_type, "ts"), relative_path) if cache else None
+                if cached is not None:
+                    grid[relative_path][cell.label] = cached
+                else:
+                    assert tsc is not None
+                    jobs.append(((cell, file), tsc + self.check_args(cell, file)))
+
+        def on_complete(job: tuple[MatrixCell, Path], outcome: ProcessOutcome) -> None:
+            cell, file = job
+            relative_path = self.checker.records.relative_path(file)
+            if outcome.duration:
+                args: dict[str, object] = {"file": relative_path, "checker": "ts", "cell": cell.label}
+                if outcome.error:
+                    args["error"] = outcome.error
+                self.checker.tracer.add(f"{relative_path} [{cell.label}]", CHECK_CATEGORY, outcome.started,
+                                        outcome.started + outcome.duration, **args)
+            if outcome.error or outcome.returncode is None:
+                result = self.checker.tooling_failure(f"Error checking {file.name}: {outcome.error}",
+                                                      relative_path, "ts")
+            else:
+                result = self.checker.interpret_typescript_result(file, outcome.returncode,
+                                                                  outcome.stdout, outcome.stderr)
+                cache = self._cache(cell)
+                if cache is not None:
+                    example = files[file]
+                    cache.put(cache.key(example.code, example.code_type, "ts"), relative_path, result)
+            grid[relative_path][cell.label] = result
+
+        cached = sum(len(results) for results in grid.values())
+        print(f"Checking {len(files)} TypeScript examples in {len(self.cells)} matrix cells "
+              f"({len(jobs)} checks, {cached} cached or unavailable)...")
+        jobs.sort(key=lambda job: durations.estimate(files[job[0][1]].identity), reverse=True)
+        self.checker.scheduler.begin("ts", len(jobs))
+        runner = AsyncCheckRunner(self.config.temp_dir, self.checker.scheduler, self.config.check_timeout,
+                                  self.checker.scheduler.child_env())
+        start = time.perf_counter()
+        runner.run(jobs, on_complete)
+        print(f"⏱️  Matrix checks took {time.perf_counter() - start:.2f}s")
+        for cache in self.caches.values():
+            cache.prune()
+        return grid
+
+    def passing(self, grid: Grid, cell: MatrixCell) -> int:
+        """Number of examples that pass in a cell"""
+        return sum(1 for results in grid.values() if cell.label in results and not results[cell.label].errors)
+
+    @staticmethod
+    def differs(results: dict[str, FileCheckResult]) -> bool:
+        """Whether an example's outcome depends on the cell"""
+        return len({cell_status(result) for result in results.values()}) > 1
+
+    def write_report(self, grid: Grid, examples: list[CodeExample], output_path: Path = MATRIX_REPORT) -> None:
+        """Write the example x cell grid, followed by the diagnostics of every failing cell"""
+        by_file = {example.filename.replace('\\', '/'): example for example in examples}
+        labels = [cell.label for cell in self.cells]
+        width = max([len(file) for file in grid] + [len("Example")])
+        source_width = max([len(self._source(example)) for example in by_file.values()] + [len("Source")])
+        column = max([len(label) for label in labels] + [10])
+
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write("=" * 80 + "\n")
+            f.write("TYPESCRIPT COMPATIBILITY MATRIX\n")
+            f.write("=" * 80 + "\n\n")
+            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+            f.write(f"TypeScript examples: {len(grid)}\n\n")
+            for cell in self.cells:
+                installed = f"TypeScript {cell.installed}" if cell.installed else cell.error
+                f.write(f"{cell.label:<{column}}  {self.passing(grid, cell):4d}/{len(grid)} passing  "
+                        f"{installed}  {json.dumps(cell.options)}\n")
+            f.write(f"\nExamples whose result depends on the version or profile: "
+                    f"{sum(1 for results in grid.values() if self.differs(results))}\n\n")
+
+            f.write(f"{'Example':<{width}}  {'Source':<{source_width}}  "
+                    + "  ".join(f"{label:<{column}}" for label in labels).rstrip() + "\n")
+            for file, results in sorted(grid.items()):
+                source = self._source(by_file[file]) if file in by_file else ""
+                f.write(f"{file:<{width}}  {source:<{source_width}}  "
+                        + "  ".join(f"{cell_status(results.get(label)):<{column}}" for label in labels).rstrip()
+                        + "\n")
+
+            f.write("\n" + "=" * 80 + "\n")
+            f.write("FAILURES\n")
+            f.write("=" * 80 + "\n")
+            for file, results in sorted(grid.items()):
+                failing = [(label, results[label]) for label in labels if label in results and results[label].errors]
+                if not failing:
+                    continue
+                source = f" ({self._source(by_file[file])})" if file in by_file else ""
+                f.write(f"\n--- {file}{source}\n")
+                for label, result in failing:
+                    for error in result.errors:
+                        f.write(f"[{label}] {error}\n")
+        print(f"📝 Created matrix report: {output_path}")
+
+    @staticmethod
+    def _source(example: CodeExample) -> str:
+        return f"{Path(example.source_file).name}:{example.start_line}"
+
+    def print_summary(self, grid: Grid) -> None:
+        """Print the pass count of every cell and how many examples depend on the cell"""
+        for cell in self.cells:
+            passing = self.passing(grid, cell)
+            icon = "✅" if passing == len(grid) else "❌"
+            installed = f"TypeScript {cell.installed}" if cell.installed else cell.error
+            print(f"{icon} {cell.label}: {passing}/{len(grid)} passing ({installed})")
+        differing = sum(1 for results in grid.values() if self.differs(results))
+        print(f"🔀 {differing} example(s) pass in some cells and fail in others")
+
+    def all_passed(self, grid: Grid) -> bool:
+        """Whether every example passes in every cell"""
+        return all(not result.errors for results in grid.values() for result in results.values())
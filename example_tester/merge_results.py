@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Merge the result streams of several --shard runs
+
+Combines the per-shard JSONL streams into one stream, renders one
+test_results.txt from it, checks that every example of the book was
+checked by exactly one shard, and exits with the overall status.
+
+Usage:
+    python merge_results.py shard-1.jsonl shard-2.jsonl shard-3.jsonl
+"""
+
+import sys
+from collections import Counter
+from pathlib import Path
+
+from execution import MARKED_REASON, collect_notes, with_notes
+from extractor import CodeExtractor
+from file_generator import FileGenerator, generated_filename
+from main import print_results
+from models import TestConfig, TestResults
+from result_sink import JsonlResultSink, iter_records, load_diagnostics, read_run_header, record_to_result
+from type_checker import SUMMARY_WORDING
+
+
+def merge_streams(shard_files: list[Path], sink: JsonlResultSink
+                  ) -> tuple[dict[str, list[str]], Counter[str], list[tuple[str, str]]]:
+    """
+    Copy every result record into sink. Returns the errors per checker, how many
+    times each (checker, file) was reported, and the (file, output) of the
+    passing --execute results, which carry the skipped examples and warnings.
+    """
+    errors: dict[str, list[str]] = {"ts": [], "js": [], "run": []}
+    reported: Counter[str] = Counter()
+    run_outputs: list[tuple[str, str]] = []
+    for shard_file in shard_files:
+        for record in iter_records(shard_file):
+            key = f"{record['checker']}:{record['file']}"
+            reported[key] += 1
+            if record["file"] and reported[key] > 1:
+                continue  # Already merged from another shard
+            sink.write(record["checker"], record_to_result(record))
+            errors.setdefault(record["checker"], []).extend(record["errors"])
+            if record["checker"] == "run" and record["status"] != "failed":
+                run_outputs.append((record["file"], record["output"]))
+    return errors, reported, run_outputs
+
+
+def summary_line(file_count: int, file_type: str, errors: list[str]) -> str:
+    """Section header in the same form as a single run's"""
+    passed, failed = SUMMARY_WORDING[file_type]
+    if not errors:
+        return f"✅ All {file_count} {passed}!\n\n"
+    return f"❌ {failed}:\n\n"
+
+
+def main() -> None:
+    """Main entry point"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Merge result streams from --shard runs into one report')
+    parser.add_argument('shards', nargs='+',
+                        help='Result streams (--results-jsonl) of the shard runs')
+    parser.add_argument('--book-dir', default=r'.\docs\Chapters',
+                        help='Directory containing markdown files (default: %(default)s)')
+    parser.add_argument('--chapters', type=int, nargs='+',
+                        help='Chapters the shards were run with')
+    parser.add_argument('--everything', action='store_true',
+                        help='Include all examples in output (default: only show examples with errors)')
+    parser.add_argument('--show-successes', action='store_true',
+                        help='Show successful file checks in TypeScript/JavaScript results sections')
+    parser.add_argument('--output-jsonl', default='test_results.jsonl',
+                        help='Merged result stream (default: %(default)s)')
+    args = parser.parse_args()
+
+    config = TestConfig.from_args(book_dir=args.book_dir, specific_chapters=args.chapters,
+                                  include_all_examples=args.everything, show_successes=args.show_successes,
+                                  results_stream=args.output_jsonl)
+    shard_files = [Path(shard) for shard in args.shards]
+    if config.results_stream.resolve() in {shard_file.resolve() for shard_file in shard_files}:
+        parser.error("--output-jsonl must not be one of the shard streams")
+
+    headers = [read_run_header(shard_file) or {} for shard_file in shard_files]
+    for shard_file, header in zip(shard_files, headers):
+        print(f"🧩 {shard_file}: shard {header.get('shard', '?')}, {header.get('examples', '?')} examples")
+    partitioned_differently = len({header.get("partition") for header in headers}) > 1
+
+    examples = CodeExtractor(config).extract_all_examples()
+    for example in examples:
+        example.filename = generated_filename(example)
+
+    sink = JsonlResultSink(config.results_stream)
+    sink.open(merged_from=[str(shard_file) for shard_file in shard_files],
+              shards=[header.get("shard") for header in headers], examples=len(examples))
+    try:
+        errors, reported, run_outputs = merge_streams(shard_files, sink)
+    finally:
+        sink.close()
+
+    all_errors = errors["ts"] + errors["js"] + errors["run"]
+    if partitioned_differently:
+        all_errors.append("Shards were partitioned differently (different chapters, book revisions "
+                          "or --shard-durations files)")
+    missing = [example.filename for example in examples
+               if not reported[f"{example.code_type.value}:{example.filename}"]]
+    duplicated = [key.split(':', 1)[1] for key, count in reported.items() if count > 1 and not key.endswith(':')]
+    if missing:
+        all_errors.append(f"No shard checked {len(missing)} example(s): {', '.join(missing[:10])}"
+                          + (" ..." if len(missing) > 10 else ""))
+    if duplicated:
+        print(f"⚠️  Warning: {len(duplicated)} example(s) were checked by more than one shard")
+
+    ts_count = sum(1 for example in examples if example.is_typescript)
+    js_count = sum(1 for example in examples if example.is_javascript)
+    # Every example that documents its output has one "run" record, including the skipped ones
+    executed = sum(1 for key in reported if key.startswith("run:") and key != "run:")
+    execution_output = None
+    if executed:
+        skipped, warnings = collect_notes(run_outputs)
+        execution_output = with_notes(summary_line(executed - len(skipped), "Execution", errors["run"]),
+                                      skipped, warnings)
+        executed -= sum(1 for note in skipped if note.endswith(MARKED_REASON))
+    diagnostics = load_diagnostics(config.results_stream)
+    FileGenerator(config).create_consolidated_file(
+        examples,
+        summary_line(ts_count, "TypeScript", errors["ts"]),
+        summary_line(js_count, "JavaScript", errors["js"]),
+        diagnostics,
+        config.results_stream,
+        execution_output=execution_output,
+    )
+
+    results = TestResults(
+        total_examples=len(examples),
+        typescript_examples=ts_count,
+        javascript_examples=js_count,
+        type_check_passed=not any(error.startswith('TS') for error in all_errors),
+        js_check_passed=not any(error.startswith('JS') for error in all_errors),
+        errors=all_errors,
+        diagnostics=diagnostics,
+        executed_examples=executed,
+        execution_passed=not errors["run"],
+    )
+    print_results(results)
+    sys.exit(0 if results.success else 1)
+
+
+if __name__ == '__main__':
+    main()
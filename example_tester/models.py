@@ -2,9 +2,14 @@
 Data models for the TypeScript/JavaScript Example Tester
 """
 
-from dataclasses import dataclass
+import hashlib
+import re
+from array import array
+from collections.abc import Iterator
+from dataclasses import dataclass, field, fields, asdict
 from pathlib import Path
 from enum import Enum
+from typing import Any
 
 
 class CodeType(Enum):
@@ -13,14 +18,139 @@ class CodeType(Enum):
     TYPESCRIPT = "ts"
 
 
-@dataclass
+# Line breaks of markdown read with newline='' (how the extractor splits lines)
+LINE_BREAK_PATTERN = re.compile(r'\r\n|\r|\n')
+
+
+def code_text(text: str, start: int, end: int, indent: int = 0) -> str:
+    """
+    The code of a block from the offsets of its lines in text: line breaks normalized
+    to '\\n', up to indent leading spaces removed per line, surrounding whitespace stripped
+    """
+    raw = text[start:end]
+    if not indent and '\r' not in raw:
+        return raw.strip()
+    lines = LINE_BREAK_PATTERN.split(raw)
+    if indent:
+        lines = [line[min(indent, len(line) - len(line.lstrip(' '))):] for line in lines]
+    return '\n'.join(lines).strip()
+
+
+def code_digest(code: str) -> str:
+    """Short content hash of an example's code"""
+    return hashlib.sha256(code.encode('utf-8')).hexdigest()[:16]
+
+
+class ChapterSource:
+    """
+    The TypeScript/JavaScript code of one markdown file, stored once and shared by its
+    examples, with a table of where each block is and the headings above them. Prose
+    and other blocks are not kept. Text appended while the file is read is joined on
+    first use, or by finish().
+    """
+    __slots__ = ('path', 'blocks', 'headings', '_text', '_pending', '_length', '_numbering')
+
+    # Entries per block in the table: code_start, code_end (offsets in text), indent, start_line, end_line,
+    # heading (index in headings of the nearest heading above the block, -1 if none),
+    # opening_fence, closing_fence (markdown lines of the fences, 0 if unknown)
+    BLOCK_FIELDS = 8
+
+    def __init__(self, path: str, text: str = "") -> None:
+        self.path = path
+        self.blocks = array('q')
+        self.headings: list[str] = []  # Slugs, in order of appearance
+        self._text = text
+        self._pending: list[str] = []
+        self._length = len(text)
+        self._numbering: tuple[array, array] | None = None
+
+    def append(self, piece: str) -> int:
+        """Add text to the end and return its offset"""
+        offset = self._length
+        self._pending.append(piece)
+        self._length += len(piece)
+        return offset
+
+    def finish(self) -> None:
+        """Join the appended pieces into one string, so they are not kept individually"""
+        if self._pending:
+            self._text += ''.join(self._pending)
+            self._pending = []
+
+    @property
+    def text(self) -> str:
+        self.finish()
+        return self._text
+
+    def add_heading(self, slug: str) -> None:
+        """Record a heading; blocks added after it belong to it"""
+        self.headings.append(slug)
+
+    def add_block(self, code_start: int, code_end: int, indent: int, start_line: int, end_line: int,
+                  opening_fence: int = 0, closing_fence: int = 0) -> int:
+        """Record where a block's code is and return the block's index"""
+        self.blocks.extend((code_start, code_end, indent, start_line, end_line, len(self.headings) - 1,
+                            opening_fence, closing_fence))
+        return len(self.blocks) // self.BLOCK_FIELDS - 1
+
+    def block_field(self, index: int, field_number: int) -> int:
+        return self.blocks[index * self.BLOCK_FIELDS + field_number]
+
+    def code(self, index: int) -> str:
+        """The code of a block"""
+        start = index * self.BLOCK_FIELDS
+        code_start, code_end, indent = self.blocks[start:start + 3]
+        return code_text(self.text, code_start, code_end, indent)
+
+    def heading(self, index: int) -> str:
+        """Slug of the nearest heading above a block ('' if there is none)"""
+        heading = self.block_field(index, 5)
+        return self.headings[heading] if heading >= 0 else ""
+
+    def codes_under(self, heading: str) -> Iterator[str]:
+        """The code of every block whose nearest heading has the given slug"""
+        for block in range(len(self.blocks) // self.BLOCK_FIELDS):
+            if self.heading(block) == heading:
+                yield self.code(block)
+
+    def _numbers(self) -> tuple[array, array]:
+        """Per block: its position under its heading, and among the blocks there with the same code"""
+        count = len(self.blocks) // self.BLOCK_FIELDS
+        if self._numbering is None or len(self._numbering[0]) != count:
+            under_heading: dict[str, int] = {}
+            same_code: dict[tuple[str, str], int] = {}
+            positions, ordinals = array('q'), array('q')
+            for block in range(count):
+                heading = self.heading(block)
+                key = (heading, self.code(block))
+                under_heading[heading] = under_heading.get(heading, 0) + 1
+                same_code[key] = same_code.get(key, 0) + 1
+                positions.append(under_heading[heading])
+                ordinals.append(same_code[key])
+            self._numbering = (positions, ordinals)
+        return self._numbering
+
+    def position(self, index: int) -> int:
+        """1 + the number of earlier blocks with the same heading slug"""
+        return self._numbers()[0][index]
+
+    def ordinal(self, index: int) -> int:
+        """1 + the number of earlier blocks with the same heading slug and the same code"""
+        return self._numbers()[1][index]
+
+
+@dataclass(slots=True)
 class CodeExample:
-    """Represents a single code example extracted from markdown"""
+    """
+    Represents a single code example extracted from markdown. The code is not kept as
+    its own string: the example refers to a block of its chapter's shared code text
+    and builds the string on access.
+    """
     chapter: str
     number: int
-    code: str
-    source_file: str
+    source: ChapterSource
     code_type: CodeType
+    block: int = 0  # Index of the example's block in source
     filename: str = ""
 
     def __post_init__(self) -> None:
@@ -29,6 +159,83 @@ class CodeExample:
             extension = self.code_type.value
             self.filename = f"{self.chapter}_example_{self.number:02d}.{extension}"
 
+    @classmethod
+    def from_code(cls, chapter: str, number: int, code: str, source_file: str, code_type: CodeType,
+                  start_line: int = 0, end_line: int = 0, filename: str = "") -> "CodeExample":
+        """An example whose code is given as a string rather than found in a chapter"""
+        source = ChapterSource(source_file, code)
+        block = source.add_block(0, len(code), 0, start_line, end_line)
+        return cls(chapter, number, source, code_type, block, filename)
+
+    @property
+    def code(self) -> str:
+        return self.source.code(self.block)
+
+    @property
+    def source_file(self) -> str:
+        return self.source.path
+
+    @property
+    def start_line(self) -> int:
+        """First markdown line of the code (1-based, 0 if unknown)"""
+        return self.source.block_field(self.block, 3)
+
+    @property
+    def end_line(self) -> int:
+        """Last markdown line of the code"""
+        return self.source.block_field(self.block, 4)
+
+    @property
+    def opening_fence(self) -> int:
+        """Markdown line of the fence that opens the block (0 if unknown)"""
+        return self.source.block_field(self.block, 6)
+
+    @property
+    def closing_fence(self) -> int:
+        """Markdown line of the fence that closes the block (0 if unknown)"""
+        return self.source.block_field(self.block, 7)
+
+    def source_line(self, code_line: int) -> int | None:
+        """Markdown line of a 1-based line within the example's code"""
+        if not self.start_line or not 1 <= code_line <= self.end_line - self.start_line + 1:
+            return None
+        return self.start_line + code_line - 1
+
+    @property
+    def identity(self) -> str:
+        """Stable key derived from the example's content, unaffected by renumbering or moves"""
+        return f"{self.code_type.value}:{code_digest(self.code)}"
+
+    @property
+    def example_id(self) -> str:
+        """
+        Stable name of the example ('03/generic-constraints-1a2b3c4d'): its chapter, the slug
+        of the nearest heading above it and a hash of its code, with '-2', '-3'... appended to
+        repeats of the same code under the same heading. Adding, removing or editing other
+        examples leaves it unchanged; editing this example's code changes it.
+        """
+        digest = code_digest(self.code)[:8]
+        ordinal = self.source.ordinal(self.block)
+        suffix = f"-{ordinal}" if ordinal > 1 else ""
+        return f"{self.chapter}/{self.source.heading(self.block) or 'example'}-{digest}{suffix}"
+
+    @property
+    def key(self) -> str:
+        """
+        Place of the example in the book ('03/generic-constraints-2'): its chapter, the slug
+        of the nearest heading above it and its position among the blocks under that heading
+        ('-2', '-3'... after the first). Unlike example_id it survives edits to the example's
+        own code, so run history follows an example through edits; identity tracks the code.
+        """
+        position = self.source.position(self.block)
+        suffix = f"-{position}" if position > 1 else ""
+        return f"{self.chapter}/{self.source.heading(self.block) or 'example'}{suffix}"
+
+    @property
+    def section(self) -> str:
+        """The chapter and the slug of the heading above the example ('03/generic-constraints')"""
+        return f"{self.chapter}/{self.source.heading(self.block)}"
+
     @property
     def is_typescript(self) -> bool:
         """Check if this is a TypeScript example"""
@@ -40,6 +247,146 @@ class CodeExample:
         return self.code_type == CodeType.JAVASCRIPT
 
 
+@dataclass
+class Diagnostic:
+    """A single problem reported by a checker, attributed to a generated file"""
+    file: str  # Normalized path relative to the test directory ('' if not attributable)
+    line: int | None
+    column: int | None
+    code: str  # e.g. 'TS2304', 'SyntaxError', or 'ERROR' for tooling failures
+    message: str
+    severity: str = "error"
+    checker: str = "ts"  # 'ts', 'js' or 'run' (--execute)
+
+    def summary(self) -> str:
+        """Short form used in the consolidated report and console"""
+        if self.code == "ERROR":
+            return self.message
+        if self.checker == "js":
+            return f"JS: {self.code}: {self.message}"
+        if self.checker == "run":
+            return f"RUN: {self.code}: {self.message}"
+        return f"{self.code}: {self.message}"
+
+    def to_dict(self) -> dict:
+        """Convert to a JSON-serializable dict"""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Diagnostic":
+        """Create a Diagnostic from to_dict() output"""
+        return cls(**data)
+
+
+class DiagnosticIndex:
+    """Diagnostics grouped by normalized relative path for O(1) per-file lookups"""
+
+    def __init__(self) -> None:
+        self._by_file: dict[str, list[Diagnostic]] = {}
+
+    @staticmethod
+    def normalize(path: str) -> str:
+        """Normalize a path to forward slashes without a leading './'"""
+        normalized = path.replace('\\', '/')
+        return normalized[2:] if normalized.startswith('./') else normalized
+
+    def add(self, diagnostic: Diagnostic) -> None:
+        """Add one diagnostic to the index"""
+        self._by_file.setdefault(self.normalize(diagnostic.file), []).append(diagnostic)
+
+    def extend(self, diagnostics: list[Diagnostic]) -> None:
+        """Add several diagnostics to the index"""
+        for diagnostic in diagnostics:
+            self.add(diagnostic)
+
+    def for_file(self, path: str) -> list[Diagnostic]:
+        """All diagnostics for a generated file"""
+        return self._by_file.get(self.normalize(path), [])
+
+    def has_errors(self, path: str) -> bool:
+        """Check if a generated file has any diagnostics"""
+        return self.normalize(path) in self._by_file
+
+    @property
+    def failing_files(self) -> set[str]:
+        """Paths of all files with diagnostics (unattributed diagnostics excluded)"""
+        return {path for path in self._by_file if path}
+
+    def __iter__(self):
+        for diagnostics in self._by_file.values():
+            yield from diagnostics
+
+    def __len__(self) -> int:
+        return sum(len(diagnostics) for diagnostics in self._by_file.values())
+
+
+@dataclass
+class FileCheckResult:
+    """Result of checking one generated file"""
+    output: str  # Formatted section for the check results report
+    errors: list[str]
+    failing_path: str = ""  # Relative path when the file failed, '' otherwise
+    diagnostics: list[Diagnostic] = field(default_factory=list)
+    file: str = ""  # Relative path of the checked file ('' for run-level failures)
+    tooling_failure: bool = False  # The checker could not run, so there is no verdict to cache
+
+
+@dataclass
+class ProcessOutcome:
+    """Exit status and captured output of one checker subprocess"""
+    returncode: int | None
+    stdout: str = ""
+    stderr: str = ""
+    error: str = ""  # Why the process produced no usable result (timeout, spawn failure)
+    duration: float = 0.0  # Seconds the process ran
+    started: float = 0.0  # time.perf_counter() when the process was started
+    peak_mb: float | None = None  # Peak RSS of the process, where it could be measured
+
+
+@dataclass
+class ExpectedOutput:
+    """Output an example documents in its comments, for --execute"""
+    lines: list[str]
+    lenient: bool  # Inline "console.log(x) // value" comments rather than an exact "// Output:" block
+
+
+@dataclass
+class Makespan:
+    """Expected and measured wall-clock time of one checking phase"""
+    expected: float  # Simulated with recorded durations in longest-first order
+    listing_order: float  # Simulated with recorded durations in directory-listing order
+    actual: float
+    jobs: int
+    workers: int
+    with_history: int  # Jobs whose estimate came from a recorded duration
+
+
+@dataclass
+class MatrixCell:
+    """One TypeScript version and compilerOptions profile of a --matrix run"""
+    version: str  # npm version spec of typescript, as given
+    profile: str
+    options: dict[str, object]  # compilerOptions of the profile
+    toolchain_dir: Path | None = None
+    installed: str = ""  # Resolved TypeScript version
+    error: str = ""  # Why the cell's toolchain is unusable
+
+    @property
+    def label(self) -> str:
+        return f"{self.version}/{self.profile}"
+
+
+@dataclass
+class Span:
+    """One timed step of a run (a phase or a checker subprocess)"""
+    name: str
+    category: str  # "phase" (top level), "step" (part of a phase), "check" (checker process), ...
+    start: float  # Seconds since the run started
+    duration: float
+    thread: str  # Name of the thread that recorded it
+    args: dict[str, object] = field(default_factory=dict)
+
+
 @dataclass
 class TestConfig:
     """Configuration for the test runner"""
@@ -49,15 +396,38 @@ class TestConfig:
     cleanup: bool = True
     include_all_examples: bool = False
     show_successes: bool = False
+    batch_mode: str | None = None
+    cache_dir: Path = Path(".example_cache")
+    use_cache: bool = True
+    sync_workspace: bool = False
+    direct_invocation: bool = True
+    results_stream: Path = Path("test_results.jsonl")
+    executor: str = "thread"
+    check_timeout: float | None = 120.0
+    max_check_memory_mb: int | None = None
+    shard: tuple[int, int] | None = None  # (K, N): check only shard K of N
+    shard_durations: Path | None = None  # Durations file every shard balances by (None: by count)
+    trace_file: Path | None = None  # Chrome trace of the run's phases and subprocesses
+    record_history: bool = True  # Append each run to the history database in cache_dir
+    changed_since: str | None = None  # Git ref: check only examples changed since then
+    execute: bool = False  # Run examples that document their output and compare it
+    execute_timeout: float = 10.0  # Wall-clock seconds per executed example
+    execute_cpu_seconds: int = 5
+    execute_memory_mb: int = 256  # V8 heap limit per executed example
+    last_failed: bool = False  # Check only the examples that failed in the previous run
+    fail_fast: bool = False  # Stop starting checks after the first failure
+    matrix_versions: list[str] | None = None  # TypeScript versions of a compatibility matrix run
+    matrix_profiles: list[str] = field(default_factory=lambda: ["default"])
 
     @classmethod
     def from_args(cls, book_dir: str | Path = r".\docs\Chapters",
                   temp_dir: str | Path | None = None,
-                  specific_chapters: list[int] | None = None,
-                  cleanup: bool = True,
-                  include_all_examples: bool = False,
-                  show_successes: bool = False) -> "TestConfig":
-        """Create TestConfig with path resolution"""
+                  cache_dir: str | Path | None = None,
+                  **options: Any) -> "TestConfig":
+        """
+        Create TestConfig with path resolution. Any other field is given by its name;
+        strings given for Path fields are converted (an empty one to None).
+        """
         book_path = Path(book_dir)
 
         if temp_dir is None:
@@ -66,14 +436,27 @@ class TestConfig:
         else:
             temp_path = Path(temp_dir)
 
-        return cls(
-            book_dir=book_path,
-            temp_dir=temp_path,
-            specific_chapters=specific_chapters,
-            cleanup=cleanup,
-            include_all_examples=include_all_examples,
-            show_successes=show_successes
-        )
+        if cache_dir is None:
+            # Kept outside the test directory so it survives workspace rebuilds
+            cache_path = Path.cwd() / ".example_cache"
+        else:
+            cache_path = Path(cache_dir)
+
+        for config_field in fields(cls):
+            if config_field.name in options and config_field.type in (Path, Path | None):
+                value = options[config_field.name]
+                options[config_field.name] = Path(value) if value else None
+        if "check_timeout" in options:
+            options["check_timeout"] = options["check_timeout"] or None  # 0 disables the timeout
+        if options.get("matrix_profiles") is None:
+            options.pop("matrix_profiles", None)
+
+        return cls(book_dir=book_path, temp_dir=temp_path, cache_dir=cache_path, **options)
+
+    @property
+    def history_db(self) -> Path:
+        """SQLite database holding the history of all runs"""
+        return self.cache_dir / "history.sqlite3"
 
 
 @dataclass
@@ -85,13 +468,30 @@ class TestResults:
     type_check_passed: bool
     js_check_passed: bool
     errors: list[str]
+    diagnostics: DiagnosticIndex = field(default_factory=DiagnosticIndex)
+    cache_hits: int = 0
+    cache_misses: int = 0
+    provision_seconds: float = 0.0
+    concurrency_levels: list[int] = field(default_factory=list)
+    peak_checker_rss_mb: dict[str, float] = field(default_factory=dict)
+    makespans: dict[str, Makespan] = field(default_factory=dict)
+    spans: list[Span] = field(default_factory=list)
+    executed_examples: int = 0
+    execution_passed: bool = True
+    unchecked_examples: int = 0  # Examples without a check result
+    unchecked_reason: str = ""  # Why they were not checked ('stopped by --fail-fast', ...)
 
     @property
     def success(self) -> bool:
         """Check if the test run was successful"""
-        return self.type_check_passed and self.js_check_passed and len(self.errors) == 0
+        return self.type_check_passed and self.js_check_passed and self.execution_passed and len(self.errors) == 0
 
 
 class CommandNotFoundError(Exception):
     """Raised when npm or npx commands cannot be found"""
     pass
+
+
+class TsHostError(Exception):
+    """Raised when the TypeScript compiler host fails, times out or answers out of protocol"""
+    pass
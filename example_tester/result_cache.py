@@ -0,0 +1,134 @@
+"""
+Content-addressed on-disk cache for per-example check results
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+from models import CodeType, Diagnostic, FileCheckResult
+
+# Default upper bound for the total size of cached results
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Bumped whenever the stored entry layout changes, so old entries are never read
+CACHE_FORMAT = 2
+
+# Placeholders so a cached result can be replayed for an example that moved to a new file
+PATH_TOKEN = "{{path}}"
+NAME_TOKEN = "{{name}}"
+
+
+class ResultCache:
+    """
+    Stores check results keyed by a hash of the example code, its CodeType, the
+    compiler configuration and the resolved toolchain versions. A hit replays the
+    stored output and errors without starting a subprocess.
+    """
+
+    def __init__(self, cache_dir: Path, environment: dict[str, str],
+                 max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.cache_dir = cache_dir / "results"
+        self.environment = environment
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def key(self, code: str, code_type: CodeType, checker: str) -> str:
+        """Build the cache key for one example under the current environment"""
+        payload = json.dumps({
+            "code": code,
+            "code_type": code_type.value,
+            "checker": checker,
+            "environment": self.environment,
+            "format": CACHE_FORMAT,
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str, relative_path: str) -> FileCheckResult | None:
+        """Return the cached result for key, or None on a miss"""
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            os.utime(entry_path)  # Mark as recently used for eviction
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+
+        name = Path(relative_path).name
+
+        def restore(text: str) -> str:
+            return text.replace(PATH_TOKEN, relative_path).replace(NAME_TOKEN, name)
+
+        diagnostics = []
+        for data in entry["diagnostics"]:
+            diagnostic = Diagnostic.from_dict(data)
+            diagnostic.file = relative_path
+            diagnostic.message = restore(diagnostic.message)
+            diagnostics.append(diagnostic)
+
+        return FileCheckResult(
+            restore(entry["output"]),
+            [restore(error) for error in entry["errors"]],
+            relative_path if entry["failed"] else "",
+            diagnostics,
+            file=relative_path,
+        )
+
+    def put(self, key: str, relative_path: str, result: FileCheckResult) -> None:
+        """Store a check result, replacing the file's path and name with placeholders"""
+        name = Path(relative_path).name
+
+        def generalize(text: str) -> str:
+            return text.replace(relative_path, PATH_TOKEN).replace(name, NAME_TOKEN)
+
+        entry = {
+            "output": generalize(result.output),
+            "errors": [generalize(error) for error in result.errors],
+            "failed": bool(result.failing_path),
+            "diagnostics": [
+                {**diagnostic.to_dict(), "file": "", "message": generalize(diagnostic.message)}
+                for diagnostic in result.diagnostics
+            ],
+        }
+
+        entry_path = self._entry_path(key)
+        try:
+            entry_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = entry_path.with_suffix(f".{threading.get_ident()}.tmp")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(temp_path, entry_path)
+        except OSError as e:
+            print(f"⚠️  Warning: Could not write result cache entry: {e}")
+
+    def prune(self) -> int:
+        """Evict least recently used entries until the cache fits in max_bytes"""
+        try:
+            entries = [(p.stat().st_mtime, p.stat().st_size, p) for p in self.cache_dir.glob("*/*.json")]
+        except OSError:
+            return 0
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
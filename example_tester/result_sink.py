@@ -0,0 +1,126 @@
+"""
+Streaming JSONL sink for per-file check results
+"""
+
+import json
+import threading
+from collections.abc import Iterator
+from datetime import datetime
+from pathlib import Path
+from typing import TextIO
+
+from models import Diagnostic, DiagnosticIndex, FileCheckResult
+
+
+class JsonlResultSink:
+    """
+    Appends one JSON line per checked file as soon as its result is available and
+    flushes it, so results survive an interrupted run and nothing has to be buffered.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._file: TextIO | None = None
+        self._lock = threading.Lock()
+
+    def open(self, **metadata: object) -> None:
+        """Start a new results stream with a header line describing the run"""
+        self.close()
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self._write_line({"type": "run", "started": datetime.now().isoformat(timespec='seconds'), **metadata})
+
+    def _write_line(self, record: dict) -> None:
+        assert self._file is not None
+        with self._lock:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+
+    def write(self, checker: str, result: FileCheckResult) -> None:
+        """Append the result for one file"""
+        if self._file is None:
+            return
+        self._write_line({
+            "type": "result",
+            "checker": checker,
+            "file": result.file,
+            "status": "failed" if result.errors else "passed",
+            "output": result.output,
+            "errors": result.errors,
+            "diagnostics": [diagnostic.to_dict() for diagnostic in result.diagnostics],
+        })
+
+    def close(self) -> None:
+        """Close the stream"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def iter_records(path: Path) -> Iterator[dict]:
+    """Yield result records from a stream, skipping a line truncated by an interrupted write"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get("type") == "result":
+                    yield record
+    except OSError:
+        return
+
+
+def read_run_header(path: Path) -> dict | None:
+    """The run record at the start of a stream, or None if it is missing or unreadable"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            record = json.loads(f.readline())
+    except (OSError, ValueError):
+        return None
+    return record if isinstance(record, dict) and record.get("type") == "run" else None
+
+
+def record_to_result(record: dict) -> FileCheckResult:
+    """Rebuild the FileCheckResult a result record was written from"""
+    return FileCheckResult(
+        record["output"],
+        record["errors"],
+        record["file"] if record["status"] == "failed" else "",
+        [Diagnostic.from_dict(data) for data in record["diagnostics"]],
+        file=record["file"],
+    )
+
+
+def iter_sorted_outputs(path: Path, checker: str, include_successes: bool) -> Iterator[str]:
+    """
+    Yield the report sections for one checker ordered by file. Only the sort keys
+    and line offsets are held in memory; each section is re-read when it is written.
+    """
+    offsets: list[tuple[str, int]] = []
+    try:
+        with open(path, 'rb') as f:
+            offset = f.tell()
+            for raw_line in iter(f.readline, b''):
+                try:
+                    record = json.loads(raw_line)
+                except ValueError:
+                    record = {}
+                if (record.get("type") == "result" and record.get("checker") == checker and
+                        (include_successes or record.get("status") == "failed")):
+                    offsets.append((record.get("file", ""), offset))
+                offset = f.tell()
+
+            for _, offset in sorted(offsets):
+                f.seek(offset)
+                yield json.loads(f.readline())["output"]
+    except OSError:
+        return
+
+
+def load_diagnostics(path: Path) -> DiagnosticIndex:
+    """Rebuild the diagnostic index from a results stream"""
+    diagnostics = DiagnosticIndex()
+    for record in iter_records(path):
+        diagnostics.extend([Diagnostic.from_dict(data) for data in record["diagnostics"]])
+    return diagnostics
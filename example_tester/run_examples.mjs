@@ -0,0 +1,84 @@
+// Worker pool used by --execute
+//
+// Reads one JSON request on stdin:
+//   { modules: [path], workers, timeoutMs, cpuMs, heapMb }
+// and runs every module in a fresh worker thread, at most `workers` at once, so
+// examples never share globals but Node starts only once. Each worker has a V8
+// heap limit (resourceLimits), a wall-clock timeout and a CPU budget measured as
+// the active time of its event loop (a worker runs JavaScript on one thread).
+// Writes one JSON line per module as soon as it finishes:
+//   { module, stdout, stderr, exitCode, error: { name, message, stack } | null,
+//     limit: null | 'timeout' | 'cpu' | 'memory', seconds }
+
+import { Worker } from 'node:worker_threads';
+
+// How often the CPU budget of running workers is checked
+const CPU_POLL_MS = 100;
+
+function collect(stream) {
+    const chunks = [];
+    stream.on('data', (chunk) => chunks.push(chunk));
+    return new Promise((resolve) => stream.on('end', () => resolve(Buffer.concat(chunks).toString('utf8'))));
+}
+
+function run(module, { timeoutMs, cpuMs, heapMb }) {
+    return new Promise((resolve) => {
+        const started = process.hrtime.bigint();
+        const worker = new Worker(module, {
+            stdout: true,
+            stderr: true,
+            resourceLimits: { maxOldGenerationSizeMb: heapMb },
+        });
+        const stdout = collect(worker.stdout);
+        const stderr = collect(worker.stderr);
+        let error = null;
+        let limit = null;
+
+        const stop = (reason) => {
+            limit = limit || reason;
+            worker.terminate();
+        };
+        const timer = timeoutMs ? setTimeout(() => stop('timeout'), timeoutMs) : null;
+        const poll = cpuMs ? setInterval(() => {
+            if (worker.performance.eventLoopUtilization().active > cpuMs) {
+                stop('cpu');
+            }
+        }, CPU_POLL_MS) : null;
+
+        worker.on('error', (e) => {
+            if (e && e.code === 'ERR_WORKER_OUT_OF_MEMORY') {
+                limit = limit || 'memory';
+            } else {
+                error = { name: String(e && e.name || 'Error'), message: String(e && e.message || e), stack: String(e && e.stack || '') };
+            }
+        });
+        worker.on('exit', async (exitCode) => {
+            clearTimeout(timer);
+            clearInterval(poll);
+            resolve({
+                module,
+                stdout: await stdout,
+                stderr: await stderr,
+                exitCode,
+                error: limit ? null : error,
+                limit,
+                seconds: Number(process.hrtime.bigint() - started) / 1e9,
+            });
+        });
+    });
+}
+
+async function main(request) {
+    const queue = [...request.modules];
+    const workers = Math.max(1, Math.min(request.workers || 1, queue.length));
+    await Promise.all(Array.from({ length: workers }, async () => {
+        while (queue.length) {
+            const report = await run(queue.shift(), request);
+            process.stdout.write(JSON.stringify(report) + '\n');
+        }
+    }));
+}
+
+const chunks = [];
+process.stdin.on('data', (chunk) => chunks.push(chunk));
+process.stdin.on('end', () => main(JSON.parse(Buffer.concat(chunks).toString('utf8'))));
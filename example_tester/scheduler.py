@@ -0,0 +1,229 @@
+"""
+Memory-aware concurrency control for checker subprocesses
+"""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+# Assumed peak RSS of one checker process until one has been measured, in MB
+DEFAULT_PEAK_MB = {"ts": 300.0, "js": 60.0, "run": 60.0}
+
+# Number of most recent processes of a checker whose peak RSS makes up its estimate
+RECENT_PROCESSES = 20
+
+# os.wait4 reports the resource usage of the one child it reaps (not available on Windows,
+# where concurrency is then bounded by CPU count and the default estimates)
+MEASURES_CHILDREN = hasattr(os, 'wait4')
+
+# Peak RSS of the last process run with run_measured on each thread, for the slot it holds
+_measured = threading.local()
+
+# Share of the currently available memory that checker processes may take
+MEMORY_BUDGET = 0.8
+
+# Minimum time between two readings of the available memory, in seconds
+MEMORY_SAMPLE_INTERVAL = 0.1
+
+
+def _own_peak_mb() -> float:
+    """Peak RSS of the tester process itself, in MB"""
+    import resource  # Unix only, like os.wait4
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def available_memory_mb() -> float | None:
+    """Memory available to new processes, or None if it cannot be determined"""
+    try:
+        with open('/proc/meminfo', 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def reap(process: subprocess.Popen) -> float | None:
+    """
+    Wait for a child process, set its returncode and return its peak RSS in MB
+    (the largest of it and the descendants it waited for), or None if unknown.
+    On Linux ru_maxrss also covers the tester's pages the child held between fork
+    and exec, so a reading at or below the tester's own peak says nothing about the
+    checker and is dropped; any higher reading was reached after exec.
+    """
+    if not MEASURES_CHILDREN:
+        process.wait()
+        return None
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    peak_mb = usage.ru_maxrss / (1024 * 1024) if sys.platform == 'darwin' else usage.ru_maxrss / 1024
+    return peak_mb if peak_mb > _own_peak_mb() else None
+
+
+def run_measured(args: list[str] | str, *, input: str | None = None, timeout: float | None = None,
+                 check: bool = False, **kwargs) -> subprocess.CompletedProcess[str]:
+    """
+    subprocess.run(capture_output=True, text=True) that reaps the child itself to
+    measure its peak RSS, which the scheduler slot held by this thread picks up.
+    """
+    _measured.peak_mb = None
+    if not MEASURES_CHILDREN:
+        return subprocess.run(args, input=input, capture_output=True, text=True, timeout=timeout,
+                              check=check, **kwargs)
+    process = subprocess.Popen(args, stdin=subprocess.PIPE if input is not None else None,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, **kwargs)
+    output: dict[str, str] = {}
+
+    def drain(name: str, stream) -> None:
+        with stream:
+            output[name] = stream.read()
+
+    def feed() -> None:
+        try:
+            with process.stdin:
+                process.stdin.write(input)
+        except BrokenPipeError:
+            pass  # The child exited without reading all of it
+
+    def expire() -> None:
+        expired.set()
+        process.kill()
+
+    expired = threading.Event()
+    threads = [threading.Thread(target=drain, args=("stdout", process.stdout), daemon=True),
+               threading.Thread(target=drain, args=("stderr", process.stderr), daemon=True)]
+    if input is not None:
+        threads.append(threading.Thread(target=feed, daemon=True))
+    for thread in threads:
+        thread.start()
+    timer = threading.Timer(timeout, expire) if timeout else None
+    if timer:
+        timer.start()
+    try:
+        _measured.peak_mb = reap(process)
+    finally:
+        if timer:
+            timer.cancel()
+        for thread in threads:
+            thread.join()
+    if expired.is_set():
+        raise subprocess.TimeoutExpired(args, timeout, output.get("stdout"), output.get("stderr"))
+    if check and process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, args, output.get("stdout"), output.get("stderr"))
+    return subprocess.CompletedProcess(args, process.returncode, output.get("stdout", ""), output.get("stderr", ""))
+
+
+class MemoryAwareScheduler:
+    """
+    Caps the number of concurrently running checker processes by CPU count and by
+    available memory divided by the largest peak RSS among the checker's recent
+    processes, each measured when it is reaped.
+    The cap is re-evaluated every time a process is about to start, against the
+    available memory sampled at most every MEMORY_SAMPLE_INTERVAL seconds.
+    """
+
+    def __init__(self, memory_limit_mb: int | None = None) -> None:
+        self.memory_limit_mb = memory_limit_mb
+        self.cpu_limit = os.cpu_count() or 4
+        self.peak_mb: dict[str, float] = {}  # Largest measured peak RSS per checker
+        self._recent_mb: dict[str, deque[float]] = {}
+        self.levels: list[int] = []  # Concurrency limit in effect whenever a process was started
+        self.phase_level = 1  # Concurrency chosen when the current phase began
+        self._checker = "ts"
+        self._pending = 0
+        self._active = 0
+        self._condition = threading.Condition(threading.RLock())
+        self._available: tuple[float, float | None] | None = None  # (sampled at, MB available)
+
+    def child_env(self) -> dict[str, str] | None:
+        """Environment for checker processes: caps the V8 heap when a memory limit is configured"""
+        if not self.memory_limit_mb:
+            return None
+        env = dict(os.environ)
+        env['NODE_OPTIONS'] = f"{env.get('NODE_OPTIONS', '')} --max-old-space-size={self.memory_limit_mb}".strip()
+        return env
+
+    def estimate_mb(self, checker: str) -> float:
+        """Expected peak RSS of one process of the given checker"""
+        recent = self._recent_mb.get(checker)
+        if recent:
+            return max(recent)
+        return DEFAULT_PEAK_MB.get(checker, DEFAULT_PEAK_MB["ts"])
+
+    def available_mb(self, fresh: bool = False) -> float | None:
+        """Available memory, read again only once the last sample is MEMORY_SAMPLE_INTERVAL old"""
+        with self._condition:
+            now = time.monotonic()
+            if fresh or self._available is None or now - self._available[0] >= MEMORY_SAMPLE_INTERVAL:
+                self._available = (now, available_memory_mb())
+            return self._available[1]
+
+    def concurrency(self) -> int:
+        """Number of checker processes that may run at once right now"""
+        with self._condition:
+            limit = min(self.cpu_limit, max(1, self._pending))
+            available = self.available_mb()
+            if available is not None:
+                estimate = self.estimate_mb(self._checker)
+                # Memory of the processes already running is not available, but is ours to reuse
+                budget = available * MEMORY_BUDGET + self._active * estimate
+                limit = min(limit, max(1, int(budget // estimate)))
+            return limit
+
+    def begin(self, checker: str, pending: int) -> int:
+        """Start a phase of pending checks and report the concurrency chosen for it"""
+        with self._condition:
+            self._checker = checker
+            self._pending = pending
+            available = self.available_mb(fresh=True)
+        level = self.phase_level = self.concurrency()
+        memory_note = f", {available:.0f} MB available" if available is not None else ""
+        print(f"⚙️  Running up to {level} {checker} checks at once (CPU limit {self.cpu_limit}, "
+              f"~{self.estimate_mb(checker):.0f} MB per process{memory_note})")
+        return level
+
+    def try_acquire(self) -> bool:
+        """Claim a slot for one process if the current limit allows it"""
+        with self._condition:
+            level = self.concurrency()
+            if self._active >= level:
+                return False
+            self._active += 1
+            self.levels.append(level)
+            return True
+
+    def release(self, peak_mb: float | None = None) -> None:
+        """Free a slot after a process finished and fold its measured peak RSS into the estimate"""
+        with self._condition:
+            if peak_mb:
+                self._recent_mb.setdefault(self._checker, deque(maxlen=RECENT_PROCESSES)).append(peak_mb)
+                self.peak_mb[self._checker] = max(self.peak_mb.get(self._checker, 0.0), peak_mb)
+            self._active -= 1
+            self._pending -= 1
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """
+        Block the calling thread until a process may start, and hold the slot while it
+        runs; a process started with run_measured meanwhile supplies its peak RSS.
+        """
+        with self._condition:
+            self._condition.wait_for(self.try_acquire)
+        _measured.peak_mb = None
+        try:
+            yield
+        finally:
+            self.release(_measured.peak_mb)
@@ -0,0 +1,49 @@
+"""
+Deterministic partitioning of examples across CI shards
+"""
+
+import hashlib
+import json
+from collections.abc import Callable
+
+from models import CodeExample
+
+
+def parse_shard(text: str) -> tuple[int, int]:
+    """Parse 'K/N' (1-based shard K of N)"""
+    try:
+        index, count = (int(part) for part in text.split('/'))
+    except ValueError:
+        raise ValueError(f"expected K/N, got {text!r}") from None
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"shard {text!r} must satisfy 1 <= K <= N")
+    return index, count
+
+
+def example_key(example: CodeExample) -> str:
+    """Place of an example in the book, identical on every machine and unaffected by edits to its code"""
+    return example.key
+
+
+def partition(examples: list[CodeExample], count: int,
+              estimate: Callable[[CodeExample], float]) -> list[list[CodeExample]]:
+    """
+    Split examples into count shards with about equal estimated cost: longest first,
+    each to the currently cheapest shard. Ties are broken by example_key and shard
+    number, so the same inputs always give the same partition. Each shard keeps the
+    examples in their order in the book.
+    """
+    shards: list[list[int]] = [[] for _ in range(count)]
+    loads = [0.0] * count
+    costs = [estimate(example) for example in examples]
+    for position in sorted(range(len(examples)), key=lambda i: (-costs[i], example_key(examples[i]), i)):
+        target = min(range(count), key=lambda i: (loads[i], i))
+        shards[target].append(position)
+        loads[target] += costs[position]
+    return [[examples[position] for position in sorted(shard)] for shard in shards]
+
+
+def partition_fingerprint(shards: list[list[CodeExample]]) -> str:
+    """Hash of the complete assignment; every shard of one CI run should report the same value"""
+    assignment = [[example_key(example) for example in shard] for shard in shards]
+    return hashlib.sha256(json.dumps(assignment).encode('utf-8')).hexdigest()[:16]
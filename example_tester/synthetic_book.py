@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Synthetic book generator for benchmarks
+
+Writes chapters of prose interleaved with fenced code blocks in the
+variants the extractor has to handle: ts/js/typescript/javascript info
+strings, fences with attributes, tilde fences, non-code blocks and
+(optionally) CRLF line endings. A share of the examples can be given a
+deliberate error, marked with "bench-error" for fake_toolchain.py.
+
+Usage:
+    python synthetic_book.py --out synthetic_book --chapters 40 --examples 200
+"""
+
+import argparse
+import random
+from pathlib import Path
+
+PROSE = (
+    "Types describe the shape of values and let the compiler reject programs "
+    "that would fail at runtime. This paragraph exists to give the parser "
+    "realistic amounts of text to skip between code blocks."
+)
+
+TS_SNIPPET = """interface User{n} {{
+  id: number;
+  name: string;
+  tags: string[];
+}}
+
+function describe{n}(user: User{n}): string {{
+  return `${{user.name}} (${{user.tags.join(", ")}})`;
+}}"""
+
+JS_SNIPPET = """const items{n} = [1, 2, 3].map((x) => x * {n});
+
+function total{n}(values) {{
+  return values.reduce((sum, value) => sum + value, 0);
+}}
+
+console.log(total{n}(items{n}));"""
+
+OPENERS = [
+    ("```ts", "```", "ts"),
+    ("```js", "```", "js"),
+    ("```typescript", "```", "ts"),
+    ("```javascript", "```", "js"),
+    ('```ts title="example.ts"', "```", "ts"),
+    ("~~~js", "~~~", "js"),
+    ("```console", "```", None),
+]
+
+# Lines appended to an example to make it fail; real tsc and node reject them too
+ERROR_LINES = {
+    "ts": 'const broken{n}: number = "not a number"; // bench-error',
+    "js": "const broken{n} = ; // bench-error",
+}
+
+
+def generate_chapter(number: int, examples: int, rng: random.Random,
+                     error_rate: float = 0.0) -> tuple[str, int, int]:
+    """Markdown text of one chapter and its number of TypeScript/JavaScript examples and broken examples"""
+    parts = [f"# Chapter {number}\n"]
+    code_blocks = 0
+    broken = 0
+    for n in range(examples):
+        parts.append(" ".join([PROSE] * rng.randint(1, 4)) + "\n")
+        opener, closer, language = rng.choice(OPENERS)
+        if language == "ts":
+            body = TS_SNIPPET.format(n=n)
+        elif language == "js":
+            body = JS_SNIPPET.format(n=n)
+        else:
+            body = "$ npm test\n> all good"
+        if language is not None and rng.random() < error_rate:
+            body += "\n" + ERROR_LINES[language].format(n=n)
+            broken += 1
+        parts.append(f"{opener}\n{body}\n{closer}\n")
+        code_blocks += language is not None
+    return "\n".join(parts), code_blocks, broken
+
+
+def write_synthetic_book(out_dir: Path, chapters: int, examples: int, crlf: bool = False,
+                         seed: int = 0, error_rate: float = 0.0) -> tuple[int, int]:
+    """Write the chapters to out_dir and return the number of code examples and of broken ones"""
+    rng = random.Random(seed)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    total = total_broken = 0
+    for number in range(1, chapters + 1):
+        text, code_blocks, broken = generate_chapter(number, examples, rng, error_rate)
+        newline = "\r\n" if crlf else "\n"
+        with open(out_dir / f"{number:02d}.md", 'w', encoding='utf-8', newline=newline) as f:
+            f.write(text)
+        total += code_blocks
+        total_broken += broken
+    return total, total_broken
+
+
+def main() -> None:
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Write a synthetic markdown book for benchmarks')
+    parser.add_argument('--out', default='synthetic_book',
+                        help='Output directory (default: %(default)s)')
+    parser.add_argument('--chapters', type=int, default=40,
+                        help='Number of chapters (default: %(default)s)')
+    parser.add_argument('--examples', type=int, default=200,
+                        help='Code blocks per chapter (default: %(default)s)')
+    parser.add_argument('--crlf', action='store_true',
+                        help='Write CRLF line endings')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Share of examples given a deliberate error (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Random seed (default: %(default)s)')
+    args = parser.parse_args()
+
+    total, broken = write_synthetic_book(Path(args.out), args.chapters, args.examples, args.crlf,
+                                         args.seed, args.error_rate)
+    print(f"📚 Wrote {args.chapters} chapters with {total} code examples ({broken} broken) to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
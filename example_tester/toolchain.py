@@ -0,0 +1,115 @@
+"""
+Shared npm toolchain provisioning keyed by a fingerprint of package.json
+"""
+
+import hashlib
+import os
+import shutil
+import subprocess
+import time
+from pathlib import Path
+
+from models import TestConfig
+from tracing import Tracer
+from utils import CommandDiscovery
+
+
+class ToolchainProvisioner:
+    """
+    Installs the test directory's dependencies once per package.json fingerprint
+    into a shared toolchain directory and links it into the test directory.
+    npm install only runs when no toolchain matches the current package.json.
+    """
+
+    def __init__(self, config: TestConfig, command_discovery: CommandDiscovery,
+                 tracer: Tracer | None = None) -> None:
+        self.config = config
+        self.cmd_discovery = command_discovery
+        self.tracer = tracer or Tracer()
+        self.provision_seconds = 0.0
+
+    @staticmethod
+    def fingerprint(package_json: str) -> str:
+        """Hash of the package.json contents that identifies a toolchain"""
+        return hashlib.sha256(package_json.encode('utf-8')).hexdigest()
+
+    def toolchain_dir(self, fingerprint: str) -> Path:
+        """Shared directory holding the node_modules for a fingerprint"""
+        return self.config.cache_dir / "toolchains" / fingerprint[:16]
+
+    def install(self, package_json: str, toolchain_dir: Path) -> None:
+        """
+        Run npm install in a scratch directory and move it into place, so an
+        interrupted install never leaves a half-populated toolchain behind.
+        """
+        scratch_dir = toolchain_dir.with_name(f"{toolchain_dir.name}.tmp{os.getpid()}")
+        if scratch_dir.exists():
+            shutil.rmtree(scratch_dir)
+        scratch_dir.mkdir(parents=True)
+
+        try:
+            with open(scratch_dir / "package.json", 'w', encoding='utf-8') as f:
+                f.write(package_json)
+            with self.tracer.span("npm install", "subprocess"):
+                self.cmd_discovery.run_subprocess('npm', ['install'], scratch_dir, check=True)
+            try:
+                os.replace(scratch_dir, toolchain_dir)
+            except OSError:
+                # Another run finished installing the same toolchain first
+                if not (toolchain_dir / "node_modules").exists():
+                    raise
+        finally:
+            if scratch_dir.exists():
+                shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    def link_node_modules(self, target: Path) -> None:
+        """Make temp_dir/node_modules point at the shared toolchain's node_modules"""
+        link = self.config.temp_dir / "node_modules"
+        if link.is_symlink() or link.is_junction():
+            if link.resolve() == target.resolve():
+                return
+            link.unlink()
+        elif link.exists():
+            shutil.rmtree(link)
+
+        try:
+            os.symlink(target.resolve(), link, target_is_directory=True)
+            return
+        except OSError:
+            pass
+
+        if os.name == 'nt':
+            # Directory junctions don't need the symlink privilege on Windows
+            result = subprocess.run(['cmd', '/c', 'mklink', '/J', str(link), str(target.resolve())],
+                                    capture_output=True, text=True)
+            if result.returncode == 0:
+                return
+
+        print("⚠️  Warning: Could not link shared node_modules, copying instead")
+        shutil.copytree(target, link, symlinks=True)
+
+    def ensure(self, package_json: str) -> Path:
+        """Install the toolchain for package_json unless the shared cache has it; returns its directory"""
+        fingerprint = self.fingerprint(package_json)
+        toolchain_dir = self.toolchain_dir(fingerprint)
+        if (toolchain_dir / "node_modules").exists():
+            print(f"📦 Reusing toolchain {fingerprint[:12]} (dependencies already installed)")
+        else:
+            print(f"📦 Installing dependencies into toolchain {fingerprint[:12]}...")
+            self.install(package_json, toolchain_dir)
+        return toolchain_dir
+
+    def provision(self) -> Path:
+        """
+        Ensure the test directory has node_modules matching its package.json.
+        Returns the shared toolchain directory used.
+        """
+        start = time.perf_counter()
+        try:
+            package_json = (self.config.temp_dir / "package.json").read_text(encoding='utf-8')
+            toolchain_dir = self.ensure(package_json)
+            self.link_node_modules(toolchain_dir / "node_modules")
+            return toolchain_dir
+        finally:
+            self.provision_seconds = time.perf_counter() - start
+            print(f"⏱️  Provisioning took {self.provision_seconds:.2f}s")
@@ -0,0 +1,120 @@
+"""
+Wall-clock spans of a test run and their export as a Chrome trace
+"""
+
+import json
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from models import Span
+
+# Spans of this category are individual checker subprocesses
+CHECK_CATEGORY = "check"
+
+# Spans of this category are examples run by the --execute worker pool
+EXECUTE_CATEGORY = "execute"
+
+
+class Tracer:
+    """
+    Records named, timed spans from any thread. Times are seconds since the
+    tracer was created (or last reset).
+    """
+
+    def __init__(self) -> None:
+        self.origin = time.perf_counter()
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        """Drop recorded spans and restart the clock"""
+        with self._lock:
+            self.origin = time.perf_counter()
+            self.spans = []
+
+    def add(self, name: str, category: str, start: float, end: float, **args: object) -> None:
+        """Record a span from two time.perf_counter() readings"""
+        span = Span(name, category, start - self.origin, end - start, threading.current_thread().name, args)
+        with self._lock:
+            self.spans.append(span)
+
+    @contextmanager
+    def span(self, name: str, category: str, **args: object) -> Iterator[dict[str, object]]:
+        """Time the enclosed block; the yielded dict can be filled with more args"""
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            self.add(name, category, start, time.perf_counter(), **args)
+
+
+def slowest_spans(spans: list[Span], category: str, count: int) -> list[Span]:
+    """The count longest spans of a category"""
+    return sorted((span for span in spans if span.category == category),
+                  key=lambda span: span.duration, reverse=True)[:count]
+
+
+def assign_lanes(spans: list[Span]) -> list[int]:
+    """
+    Lane for each span such that spans in one lane never overlap: the first lane
+    that is free when the span starts. Concurrent subprocesses started from one
+    thread (the asyncio executor) would otherwise be drawn on top of each other.
+    """
+    lanes: list[int] = [0] * len(spans)
+    lane_ends: list[float] = []
+    for index in sorted(range(len(spans)), key=lambda i: spans[i].start):
+        span = spans[index]
+        lane = next((i for i, end in enumerate(lane_ends) if end <= span.start), len(lane_ends))
+        if lane == len(lane_ends):
+            lane_ends.append(0.0)
+        lane_ends[lane] = span.start + span.duration
+        lanes[index] = lane
+    return lanes
+
+
+def chrome_trace(spans: list[Span]) -> dict:
+    """
+    Trace Event Format document (chrome://tracing, ui.perfetto.dev): phases on
+    one track per Python thread, checker subprocesses on "checker N" tracks and
+    examples run by --execute on "worker N" tracks.
+    """
+    thread_ids: dict[str, int] = {}
+    events: list[dict] = []
+
+    def complete_event(span: Span, tid: int) -> dict:
+        return {
+            "name": span.name,
+            "cat": span.category,
+            "ph": "X",
+            "ts": round(span.start * 1_000_000, 1),
+            "dur": round(span.duration * 1_000_000, 1),
+            "pid": 1,
+            "tid": tid,
+            "args": span.args,
+        }
+
+    for span in spans:
+        if span.category not in (CHECK_CATEGORY, EXECUTE_CATEGORY):
+            tid = thread_ids.setdefault(span.thread, len(thread_ids) + 1)
+            events.append(complete_event(span, tid))
+
+    names = {tid: thread for thread, tid in thread_ids.items()}
+    for category, first_tid, label in ((CHECK_CATEGORY, 1000, "checker"), (EXECUTE_CATEGORY, 2000, "worker")):
+        lane_spans = [span for span in spans if span.category == category]
+        lanes = assign_lanes(lane_spans)
+        for span, lane in zip(lane_spans, lanes):
+            events.append(complete_event(span, first_tid + lane))
+        names.update({first_tid + lane: f"{label} {lane + 1}" for lane in set(lanes)})
+    events.extend({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": name}}
+                  for tid, name in names.items())
+    events.append({"name": "process_name", "ph": "M", "pid": 1, "tid": 0, "args": {"name": "example tester"}})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def write_chrome_trace(spans: list[Span], path: Path) -> None:
+    """Write spans as a Chrome trace JSON file"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(chrome_trace(spans), f)
@@ -0,0 +1,36 @@
+// TypeScript-to-JavaScript transpiler used by --execute
+//
+// Run with the test directory as working directory; typescript is loaded from
+// its node_modules. Reads a JSON array of { code, out } on stdin, strips the
+// types from each snippet with ts.transpileModule (no type checking) and writes
+// the JavaScript module to out. Writes a JSON array of { out, ok, message }.
+
+import { mkdirSync, writeFileSync } from 'node:fs';
+import { createRequire } from 'node:module';
+import path from 'node:path';
+
+const require = createRequire(path.join(process.cwd(), 'package.json'));
+const ts = require('typescript');
+
+const compilerOptions = {
+    target: ts.ScriptTarget.ES2022,
+    module: ts.ModuleKind.ESNext,
+};
+
+function transpile({ code, out }) {
+    try {
+        const { outputText } = ts.transpileModule(code, { compilerOptions, fileName: out.replace(/\.mjs$/, '.ts') });
+        mkdirSync(path.dirname(out), { recursive: true });
+        writeFileSync(out, outputText);
+        return { out, ok: true, message: null };
+    } catch (error) {
+        return { out, ok: false, message: String(error && error.message || error) };
+    }
+}
+
+const chunks = [];
+process.stdin.on('data', (chunk) => chunks.push(chunk));
+process.stdin.on('end', () => {
+    const snippets = JSON.parse(Buffer.concat(chunks).toString('utf8'));
+    process.stdout.write(JSON.stringify(snippets.map(transpile)));
+});
@@ -0,0 +1,115 @@
+// Persistent TypeScript compiler host used by ts_host.py
+//
+// Run with the test directory as working directory; typescript is loaded from
+// its node_modules. Reads one JSON request per line on stdin:
+//   { id, compilerOptions, snippets: [{ name, code }] }
+// and answers each with one JSON line on stdout:
+//   { id, results: [{ name, output, seconds, diagnostics: [{ line, column, code, category, message }] }] }
+// or { id, error } if the request could not be handled.
+//
+// Every snippet is checked as its own program, like a per-file tsc run, but
+// the programs are built through an in-memory CompilerHost: snippet text never
+// touches the disk, and parsed (and bound) lib.d.ts and @types source files are
+// cached across snippets and requests instead of being re-parsed per program.
+
+import { createRequire } from 'node:module';
+import path from 'node:path';
+import readline from 'node:readline';
+
+const require = createRequire(path.join(process.cwd(), 'package.json'));
+const ts = require('typescript');
+
+const currentDirectory = process.cwd();
+const sharedSourceFiles = new Map();
+const optionsCache = new Map();
+
+function compilerOptions(json) {
+    const key = JSON.stringify(json || {});
+    if (!optionsCache.has(key)) {
+        const { options, errors } = ts.convertCompilerOptionsFromJson(json || {}, currentDirectory);
+        if (errors.length) {
+            throw new Error(ts.flattenDiagnosticMessageText(errors[0].messageText, '\n'));
+        }
+        optionsCache.set(key, { ...options, noEmit: true });
+    }
+    return optionsCache.get(key);
+}
+
+function createHost(options, snippets) {
+    const host = ts.createCompilerHost(options, true);
+    const readFile = host.readFile.bind(host);
+    const fileExists = host.fileExists.bind(host);
+    host.getCurrentDirectory = () => currentDirectory;
+    host.fileExists = (fileName) => snippets.has(fileName) || fileExists(fileName);
+    host.readFile = (fileName) => snippets.get(fileName) ?? readFile(fileName);
+    host.getSourceFile = (fileName, languageVersion, onError) => {
+        if (snippets.has(fileName)) {
+            return ts.createSourceFile(fileName, snippets.get(fileName), languageVersion, true);
+        }
+        // Everything else (lib files, @types, imported modules) is shared between programs
+        const version = typeof languageVersion === 'object'
+            ? `${languageVersion.languageVersion}/${languageVersion.impliedNodeFormat}`
+            : `${languageVersion}`;
+        const key = `${version}|${fileName}`;
+        if (!sharedSourceFiles.has(key)) {
+            const text = readFile(fileName);
+            if (text === undefined) {
+                onError?.(`File not found: ${fileName}`);
+                return undefined;
+            }
+            sharedSourceFiles.set(key, ts.createSourceFile(fileName, text, languageVersion, false));
+        }
+        return sharedSourceFiles.get(key);
+    };
+    return host;
+}
+
+const formatHost = {
+    getCanonicalFileName: (fileName) => fileName,
+    getCurrentDirectory: () => currentDirectory,
+    getNewLine: () => '\n',
+};
+
+function checkSnippet(snippet, options) {
+    const started = performance.now();
+    const fileName = path.resolve(currentDirectory, snippet.name).split(path.sep).join('/');
+    const host = createHost(options, new Map([[fileName, snippet.code]]));
+    const program = ts.createProgram({ rootNames: [fileName], options, host });
+    const diagnostics = ts.getPreEmitDiagnostics(program);
+
+    return {
+        name: snippet.name,
+        output: ts.formatDiagnostics(diagnostics, formatHost),
+        seconds: (performance.now() - started) / 1000,
+        diagnostics: diagnostics.map((diagnostic) => {
+            const position = diagnostic.file && diagnostic.start !== undefined
+                ? diagnostic.file.getLineAndCharacterOfPosition(diagnostic.start)
+                : null;
+            return {
+                line: position ? position.line + 1 : null,
+                column: position ? position.character + 1 : null,
+                code: `TS${diagnostic.code}`,
+                category: ts.DiagnosticCategory[diagnostic.category].toLowerCase(),
+                // The whole message chain, indented like the lines tsc prints below a diagnostic
+                message: ts.flattenDiagnosticMessageText(diagnostic.messageText, '\n'),
+            };
+        }),
+    };
+}
+
+const input = readline.createInterface({ input: process.stdin, crlfDelay: Infinity });
+input.on('line', (line) => {
+    if (!line.trim()) {
+        return;
+    }
+    let request = {};
+    let response;
+    try {
+        request = JSON.parse(line);
+        const options = compilerOptions(request.compilerOptions);
+        response = { id: request.id, results: request.snippets.map((snippet) => checkSnippet(snippet, options)) };
+    } catch (error) {
+        response = { id: request.id ?? null, error: String(error && error.stack || error) };
+    }
+    process.stdout.write(JSON.stringify(response) + '\n');
+});
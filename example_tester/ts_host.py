@@ -0,0 +1,118 @@
+"""
+Client for ts_host.mjs, a long-running TypeScript compiler host
+"""
+
+import json
+import queue
+import subprocess
+import threading
+from collections import deque
+from pathlib import Path
+
+from models import TsHostError
+
+# Node script that checks snippets through the TypeScript compiler API
+TS_HOST_SCRIPT = Path(__file__).resolve().parent / "ts_host.mjs"
+
+# Last stderr lines of the host kept for error messages
+STDERR_LINES = 20
+
+
+class TypeScriptHost:
+    """
+    Keeps one ts_host.mjs process running in the test directory and sends it
+    batches of (name, source text) snippets over stdin, one JSON line per request.
+    Parsed lib and @types files stay cached in the host between requests.
+    """
+
+    def __init__(self, command: list[str], cwd: Path, env: dict[str, str] | None = None) -> None:
+        self.command = command + [str(TS_HOST_SCRIPT)]
+        self.cwd = cwd
+        self.env = env
+        self._process: subprocess.Popen[str] | None = None
+        self._responses: queue.Queue[str | None] = queue.Queue()
+        self._stderr: deque[str] = deque(maxlen=STDERR_LINES)
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the host process unless it is already running"""
+        if self._process is not None and self._process.poll() is None:
+            return
+        self._responses = queue.Queue()
+        self._process = subprocess.Popen(
+            self.command, cwd=self.cwd, env=self.env, text=True, encoding='utf-8',
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        )
+        threading.Thread(target=self._read_stdout, args=(self._process, self._responses), daemon=True).start()
+        threading.Thread(target=self._read_stderr, args=(self._process,), daemon=True).start()
+
+    def _read_stdout(self, process: subprocess.Popen[str], responses: "queue.Queue[str | None]") -> None:
+        assert process.stdout is not None
+        for line in process.stdout:
+            responses.put(line)
+        responses.put(None)  # The host exited
+
+    def _read_stderr(self, process: subprocess.Popen[str]) -> None:
+        assert process.stderr is not None
+        for line in process.stderr:
+            self._stderr.append(line.rstrip())
+
+    def check(self, snippets: list[tuple[str, str]], compiler_options: dict[str, object],
+              timeout: float | None = None) -> list[dict]:
+        """
+        Type-check each (name, code) snippet as its own program and return one report
+        per snippet: {name, output, seconds, diagnostics}. output is formatted like
+        tsc --pretty false; names are paths relative to the test directory.
+        """
+        with self._lock:
+            self.start()
+            assert self._process is not None and self._process.stdin is not None
+            self._next_id += 1
+            request = {
+                "id": self._next_id,
+                "compilerOptions": compiler_options,
+                "snippets": [{"name": name, "code": code} for name, code in snippets],
+            }
+            try:
+                self._process.stdin.write(json.dumps(request) + "\n")
+                self._process.stdin.flush()
+                line = self._responses.get(timeout=timeout)
+            except queue.Empty:
+                self.close(kill=True)
+                raise TsHostError(f"compiler host timed out after {timeout:g}s") from None
+            except OSError as e:
+                self.close()
+                raise TsHostError(f"compiler host stopped: {e}{self._stderr_tail()}") from None
+
+            if line is None:
+                self.close()
+                raise TsHostError(f"compiler host exited{self._stderr_tail()}")
+            try:
+                response = json.loads(line)
+            except ValueError:
+                raise TsHostError(f"unexpected output from compiler host: {line.strip()[:200]}") from None
+            if response.get("error"):
+                raise TsHostError(response["error"].splitlines()[0])
+            if response.get("id") != request["id"] or len(response.get("results", [])) != len(snippets):
+                self.close()
+                raise TsHostError("compiler host answered out of order")
+            return response["results"]
+
+    def _stderr_tail(self) -> str:
+        return (": " + " | ".join(self._stderr)) if self._stderr else ""
+
+    def close(self, kill: bool = False) -> None:
+        """Stop the host process: let it finish by closing its stdin, or kill it"""
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            if kill:
+                process.kill()
+            if process.stdin is not None:
+                process.stdin.close()
+            process.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            process.kill()
+            process.wait()
@@ -2,75 +2,124 @@
 TypeScript and JavaScript checking functionality
 """
 
+import json
+import re
 import subprocess
+import threading
+import time
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
 from collections.abc import Callable
+from typing import Any
 
-from models import CommandNotFoundError, TestConfig
+from async_runner import AsyncCheckRunner
+from batch_executor import BatchExecutor
+from check_records import CheckRecords
+from execution_runner import ExecutionRunner
+from file_generator import COMPILER_OPTIONS, WORKSPACE_DIRS, option_args
+from host_executor import HostExecutor
+from models import (CodeExample, CommandNotFoundError, Diagnostic, DiagnosticIndex,
+                    FileCheckResult, ProcessOutcome, TestConfig)
+from result_cache import ResultCache
+from result_sink import JsonlResultSink
+from scheduler import MemoryAwareScheduler
+from toolchain import ToolchainProvisioner
+from tracing import Tracer
 from utils import CommandDiscovery
 
+# How a section of the report announces that all files passed, or that some failed
+SUMMARY_WORDING = {
+    "TypeScript": ("TypeScript files passed type checking", "TypeScript checking failed"),
+    "JavaScript": ("JavaScript files passed syntax check", "JavaScript syntax check failed"),
+    "Execution": ("executed examples passed", "Example execution failed"),
+}
+
+# Report section of a check phase that --fail-fast skipped
+FAIL_FAST_SKIPPED = "⏭️  Skipped: an earlier check failed (--fail-fast)"
+
+# "file(line,col): error TS1234: message" and position-less "error TS1234: message"
+TS_DIAGNOSTIC_PATTERN = re.compile(
+    r'^(?:(?P<file>.+?)\((?P<line>\d+),(?P<column>\d+)\): )?(?P<severity>error|warning) (?P<code>TS\d+): (?P<message>.*)$'
+)
+# "SomeError: message" as printed by node --check
+JS_ERROR_PATTERN = re.compile(r'^(?P<code>\w*Error): (?P<message>.*)$')
+
 
 class TypeChecker:
     """
     Handles TypeScript compilation and JavaScript syntax checking.
     This class provides methods to check TypeScript and JavaScript files in parallel,
-    parsing output for errors, and reporting results in a unified way.
+    parsing output for errors, and reporting results in a unified way. The compiler
+    host, batched checks and --execute are delegated to their executors, which share
+    its records, scheduler and result stream.
     """
 
-    def __init__(self, config: TestConfig, command_discovery: CommandDiscovery) -> None:
+    def __init__(self, config: TestConfig, command_discovery: CommandDiscovery,
+                 tracer: Tracer | None = None) -> None:
         self.config = config
         self.cmd_discovery = command_discovery
+        self.tracer = tracer or Tracer()
+        self.provisioner = ToolchainProvisioner(config, command_discovery, self.tracer)
+        self.diagnostics = DiagnosticIndex()
+        self.sink: JsonlResultSink | None = None
+        self.scheduler = MemoryAwareScheduler(config.max_check_memory_mb)
+        self.records = CheckRecords(config, self.tracer, self.scheduler)
+        self.stop = threading.Event()  # Set on the first failure under --fail-fast
+        self.checked: set[str] = set()  # Relative paths of the files with a result in this run
+        self.host = HostExecutor(config, self)
+        self.batch = BatchExecutor(config, self)
+        self.execution = ExecutionRunner(config, self)
+        self.setup_error: str | None = None  # Why dependencies could not be provisioned, if they could not
 
-    def parse_typescript_errors(self, output: str) -> tuple[list[str], set[str]]:
-        """Parse TypeScript compiler output to extract error summaries and failing files."""
-        error_lines: list[str] = []
-        failing_files: set[str] = set()
-
-        for line in output.split('\n'):
-            line = line.strip()
-            if line and ': error TS' in line:
-                try:
-                    file_part = line.split('(')[0] if '(' in line else line.split(':')[0]
-                    if file_part:
-                        normalized_file = file_part.replace('\\', '/').strip()
-                        failing_files.add(normalized_file)
-                    parts = line.split(': error TS', 1)
-                    if len(parts) >= 2:
-                        error_part = parts[1]
-                        if ':' in error_part:
-                            error_code, message = error_part.split(':', 1)
-                            error_lines.append(f"TS{error_code.strip()}: {message.strip()}")
-                        else:
-                            error_lines.append(f"TS{error_part.strip()}")
-                except (IndexError, ValueError):
-                    error_lines.append(line)
-        return error_lines, failing_files
-
-    def parse_javascript_errors(self, output: str, js_files: list[Path]) -> tuple[list[str], set[str]]:
-        """Parse Node.js syntax check output for JavaScript files."""
-        error_lines: list[str] = []
-        failing_files: set[str] = set()
-        sections = output.split('\n\n')
-        for section in sections:
-            if not section.strip():
-                continue
-            lines = section.strip().split('\n')
-            if not lines:
-                continue
-            for line in lines:
-                if ('SyntaxError:' in line or 'ReferenceError:' in line or
-                    'TypeError:' in line or 'Error:' in line):
-                    for js_file in js_files:
-                        file_str = str(js_file.relative_to(self.config.temp_dir)).replace('\\', '/')
-                        if file_str in section or js_file.name in section:
-                            failing_files.add(file_str)
-                            error_lines.append(f"JS Error in {js_file.name}: {line.strip()}")
-                            break
-                    else:
-                        error_lines.append(f"JS Error: {line.strip()}")
-        return error_lines, failing_files
+    def parse_typescript_diagnostics(self, output: str) -> list[Diagnostic]:
+        """
+        Parse TypeScript compiler output (--pretty false) into Diagnostic records. The
+        indented lines tsc prints below a diagnostic continue its message chain.
+        """
+        diagnostics: list[Diagnostic] = []
+        for line in output.splitlines():
+            match = TS_DIAGNOSTIC_PATTERN.match(line.strip())
+            if not match and diagnostics and line.startswith(' ') and line.strip():
+                diagnostics[-1].message += '\n' + line.rstrip()
+            elif match:
+                diagnostics.append(Diagnostic(
+                    file=DiagnosticIndex.normalize(match['file'] or ''),
+                    line=int(match['line']) if match['line'] else None,
+                    column=int(match['column']) if match['column'] else None,
+                    code=match['code'],
+                    message=match['message'].strip(),
+                    severity=match['severity'],
+                    checker="ts",
+                ))
+        return diagnostics
+
+    def parse_node_check_diagnostics(self, stderr: str, relative_path: str) -> list[Diagnostic]:
+        """
+        Parse node --check stderr for one file: a "path:line" header, the source line,
+        a caret marking the column, and finally "SomeError: message".
+        """
+        lines = stderr.splitlines()
+        line_number: int | None = None
+        column: int | None = None
+        if lines and re.search(r':\d+$', lines[0]):
+            line_number = int(lines[0].rsplit(':', 1)[1])
+            if len(lines) > 2 and '^' in lines[2]:
+                column = lines[2].index('^') + 1
+
+        for line in lines:
+            match = JS_ERROR_PATTERN.match(line.strip())
+            if match:
+                return [Diagnostic(relative_path, line_number, column, match['code'],
+                                   match['message'].strip(), checker="js")]
+        return [Diagnostic(relative_path, line_number, column, "Error",
+                           stderr.strip() or "node --check failed", checker="js")]
+
+    def tooling_failure(self, error_msg: str, relative_path: str, checker: str) -> FileCheckResult:
+        """Result for a check that could not run at all."""
+        return FileCheckResult(error_msg, [error_msg], relative_path,
+                               [Diagnostic(relative_path, None, None, "ERROR", error_msg, checker=checker)],
+                               file=relative_path, tooling_failure=True)
 
     def find_language_files(self, pattern: str) -> list[Path]:
         """
@@ -79,7 +128,7 @@ class TypeChecker:
         files: list[Path] = []
         try:
             for item in self.config.temp_dir.iterdir():
-                if item.is_dir() and not item.name.startswith('.') and item.name != 'node_modules':
+                if item.is_dir() and not item.name.startswith('.') and item.name not in WORKSPACE_DIRS:
                     files.extend(item.glob(pattern))
         except OSError:
             pass
@@ -93,49 +142,82 @@ class TypeChecker:
         """Find TypeScript files in chapter directories only (exclude node_modules)."""
         return self.find_language_files("*.ts")
 
-    def check_single_javascript_file(self, js_file: Path) -> tuple[str, list[str], str]:
+    def single_check_args(self, file: Path, checker: str) -> list[str]:
+        """
+        Arguments for checking one generated file with node ('js') or tsc ('ts'). tsc ignores
+        tsconfig.json when given a file, so its compilerOptions are passed as flags.
+        """
+        if checker == "js":
+            return ['--check', self.records.relative_path(file)]
+        return [*option_args(COMPILER_OPTIONS), self.records.relative_path(file)]
+
+    def interpret_javascript_result(self, js_file: Path, returncode: int, stderr: str) -> FileCheckResult:
+        """Turn the exit status and stderr of node --check into a result."""
+        file_output = f"Checking {js_file.name}:"
+        relative_path = self.records.relative_path(js_file)
+        if returncode == 0:
+            file_output += " ✅ OK"
+            return FileCheckResult(file_output, [], file=relative_path)
+        file_output += f" ❌ FAILED\n{stderr}"
+        error_msg = f"JS Syntax Error in {js_file.name}: {stderr.strip()}"
+        return FileCheckResult(file_output, [error_msg], relative_path,
+                               self.parse_node_check_diagnostics(stderr, relative_path),
+                               file=relative_path)
+
+    def interpret_typescript_result(self, ts_file: Path, returncode: int, stdout: str, stderr: str) -> FileCheckResult:
+        """Turn the exit status and output of a tsc check into a result."""
+        file_output = f"Checking {ts_file.name}:"
+        relative_path = self.records.relative_path(ts_file)
+        if returncode == 0:
+            file_output += " ✅ OK"
+            return FileCheckResult(file_output, [], file=relative_path)
+        file_output += f" ❌ FAILED\n{stdout}"
+        diagnostics = self.parse_typescript_diagnostics(stdout)
+        if not diagnostics:
+            details = stdout.strip() or stderr.strip() or "tsc failed"
+            diagnostics = [Diagnostic(relative_path, None, None, "ERROR", details)]
+        return FileCheckResult(file_output, [d.summary() for d in diagnostics],
+                               relative_path, diagnostics, file=relative_path)
+
+    def check_single_javascript_file(self, js_file: Path) -> FileCheckResult:
         """Check a single JavaScript file and return results."""
+        start = time.perf_counter()
         try:
-            result = self.cmd_discovery.run_subprocess(
-                'node',
-                ['--check', str(js_file.relative_to(self.config.temp_dir))],
-                self.config.temp_dir
+            result = self.cmd_discovery.run_node(
+                self.single_check_args(js_file, "js"),
+                self.config.temp_dir,
+                timeout=self.config.check_timeout,
+                env=self.scheduler.child_env()
             )
-            file_output = f"Checking {js_file.name}:"
-            relative_path = str(js_file.relative_to(self.config.temp_dir)).replace('\\', '/')
-            if result.returncode == 0:
-                file_output += " ✅ OK"
-                return file_output, [], ""
-            else:
-                file_output += f" ❌ FAILED\n{result.stderr}"
-                error_msg = f"JS Syntax Error in {js_file.name}: {result.stderr.strip()}"
-                return file_output, [error_msg], relative_path
+            self.records.record_check(js_file, "js", start, time.perf_counter())
+            return self.interpret_javascript_result(js_file, result.returncode, result.stderr)
+        except subprocess.TimeoutExpired:
+            self.records.record_check(js_file, "js", start, time.perf_counter(), error="timeout")
+            error_msg = f"Error checking {js_file.name}: timed out after {self.config.check_timeout:g}s"
+            return self.tooling_failure(error_msg, self.records.relative_path(js_file), "js")
         except (CommandNotFoundError, subprocess.CalledProcessError) as e:
             error_msg = f"Error checking {js_file.name}: {e}"
-            relative_path = str(js_file.relative_to(self.config.temp_dir)).replace('\\', '/')
-            return error_msg, [error_msg], relative_path
+            return self.tooling_failure(error_msg, self.records.relative_path(js_file), "js")
 
-    def check_single_typescript_file(self, ts_file: Path) -> tuple[str, list[str], str]:
+    def check_single_typescript_file(self, ts_file: Path) -> FileCheckResult:
         """Check a single TypeScript file and return results."""
+        start = time.perf_counter()
         try:
-            result = self.cmd_discovery.run_subprocess(
-                'npx',
-                ['tsc', '--noEmit', '--strict', str(ts_file.relative_to(self.config.temp_dir))],
-                self.config.temp_dir
+            result = self.cmd_discovery.run_tsc(
+                self.single_check_args(ts_file, "ts"),
+                self.config.temp_dir,
+                timeout=self.config.check_timeout,
+                env=self.scheduler.child_env()
             )
-            file_output = f"Checking {ts_file.name}:"
-            relative_path = str(ts_file.relative_to(self.config.temp_dir)).replace('\\', '/')
-            if result.returncode == 0:
-                file_output += " ✅ OK"
-                return file_output, [], ""
-            else:
-                file_output += f" ❌ FAILED\n{result.stdout}"
-                file_errors, _ = self.parse_typescript_errors(result.stdout)
-                return file_output, file_errors, relative_path
+            self.records.record_check(ts_file, "ts", start, time.perf_counter())
+            return self.interpret_typescript_result(ts_file, result.returncode, result.stdout, result.stderr)
+        except subprocess.TimeoutExpired:
+            self.records.record_check(ts_file, "ts", start, time.perf_counter(), error="timeout")
+            error_msg = f"Error checking {ts_file.name}: timed out after {self.config.check_timeout:g}s"
+            return self.tooling_failure(error_msg, self.records.relative_path(ts_file), "ts")
         except (CommandNotFoundError, subprocess.CalledProcessError) as e:
             error_msg = f"Error checking {ts_file.name}: {e}"
-            relative_path = str(ts_file.relative_to(self.config.temp_dir)).replace('\\', '/')
-            return error_msg, [error_msg], relative_path
+            return self.tooling_failure(error_msg, self.records.relative_path(ts_file), "ts")
 
     def _filter_output_by_successes(self, output: str) -> str:
         """Filter output to show only errors if show_successes is False."""
@@ -157,41 +239,108 @@ class TypeChecker:
 
         return '\n\n'.join(filtered_sections)
 
-    def _parallel_file_check(
+    def typescript_version(self) -> str:
+        """Version of the TypeScript compiler installed in the test directory ('' if unknown)"""
+        try:
+            ts_package = self.config.temp_dir / "node_modules" / "typescript" / "package.json"
+            with open(ts_package, 'r', encoding='utf-8') as f:
+                return json.load(f).get("version", "")
+        except (OSError, ValueError):
+            return ""
+
+    def _create_result_cache(self) -> ResultCache | None:
+        """Create the result cache keyed on the compiler setup of the current test directory"""
+        if not self.config.use_cache:
+            return None
+
+        try:
+            tsconfig = (self.config.temp_dir / "tsconfig.json").read_text(encoding='utf-8')
+        except OSError:
+            tsconfig = ""
+
+        return ResultCache(self.config.cache_dir, {
+            "tsconfig": tsconfig,
+            "typescript": self.typescript_version(),
+            "node": self.cmd_discovery.get_version('node'),
+            "batch_mode": self.config.batch_mode or "",
+        })
+
+    def emit(self, results: list[FileCheckResult], checker: str) -> None:
+        """
+        Stream finished results to the sink. Their formatted output is dropped
+        afterwards, since the report re-reads it from the stream. Under --fail-fast,
+        a failing result stops the checks that have not started yet.
+        """
+        for result in results:
+            if result.file:
+                self.checked.add(result.file)
+            if result.errors and self.config.fail_fast and not self.stop.is_set():
+                self.stop.set()
+                print(f"🛑 {result.file or checker} failed: stopping the remaining checks (--fail-fast)")
+        if self.sink is None:
+            return
+        for result in results:
+            self.sink.write(checker, result)
+            result.output = ""
+
+    def run_in_parallel(self, items: list[Path], checker: Callable[[Path], Any], checker_name: str) -> list[Any]:
+        """
+        Runs checker over items in a thread pool and returns the results in completion order.
+        The scheduler decides how many of them run at once; exceptions are turned into
+        failing results so one bad item never aborts the run.
+        """
+        def scheduled(item: Path) -> Any:
+            with self.scheduler.slot():
+                return checker(item)
+
+        results: list[Any] = []
+        max_workers = min(len(items), os.cpu_count() or 4)
+        self.scheduler.begin(checker_name, len(items))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_to_item = {
+                executor.submit(scheduled, item): item
+                for item in items
+            }
+            try:
+                for future in as_completed(future_to_item):
+                    item = future_to_item[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        error_msg = f"Error processing {item.name}: {e}"
+                        result = self.tooling_failure(error_msg, "", checker_name)
+                    self.emit(result if isinstance(result, list) else [result], checker_name)
+                    results.append(result)
+                    if self.stop.is_set():
+                        # Checks already running finish; queued ones never start
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        break
+            except KeyboardInterrupt:
+                # Don't start queued checks; what was streamed so far is kept
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
+        return results
+
+    def summarize_results(
         self,
-        files: list[Path],
-        single_file_checker: Callable[[Path], tuple[str, list[str], str]],
+        results: list[FileCheckResult],
+        file_count: int,
         file_type: str,
     ) -> tuple[str, list[str], set[str]]:
         """
-        Checks files in parallel using the provided single_file_checker.
-        Returns formatted output, error strings, and set of failing files.
+        Combine per-file results into formatted output, error strings, and set of failing files.
+        Their diagnostics are added to self.diagnostics.
         """
-        if not files:
-            return f"✅ No {file_type} files to check", [], set()
-
-        print(f"Checking {len(files)} {file_type} files in parallel...")
         all_output: list[str] = []
         all_errors: list[str] = []
         all_failing_files: set[str] = set()
-        max_workers = min(len(files), os.cpu_count() or 4)
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_file = {
-                executor.submit(single_file_checker, file): file
-                for file in files
-            }
-            for future in as_completed(future_to_file):
-                file = future_to_file[future]
-                try:
-                    file_output, file_errors, failing_path = future.result()
-                    all_output.append(file_output)
-                    all_errors.extend(file_errors)
-                    if failing_path:
-                        all_failing_files.add(failing_path)
-                except Exception as e:
-                    error_msg = f"Error processing {file.name}: {e}"
-                    all_output.append(error_msg)
-                    all_errors.append(error_msg)
+        for result in results:
+            if result.output:
+                all_output.append(result.output)
+            all_errors.extend(result.errors)
+            self.diagnostics.extend(result.diagnostics)
+            if result.failing_path:
+                all_failing_files.add(result.failing_path)
 
         all_output.sort(key=lambda x: x.split(':')[0] if ':' in x else x)
 
@@ -205,49 +354,185 @@ class TypeChecker:
 
         full_output = '\n\n'.join(all_output)
 
+        passed, failed = SUMMARY_WORDING[file_type]
         if not all_errors:
             return (
-                f"✅ All {len(files)} {file_type} files passed "
-                f"{'syntax check' if file_type == 'JavaScript' else 'type checking'}!\n\n{full_output}",
+                f"✅ All {file_count} {passed}!\n\n{full_output}",
                 [],
                 set(),
             )
         else:
             return (
-                f"❌ {file_type} "
-                f"{'syntax check' if file_type == 'JavaScript' else 'checking'} failed:\n\n{full_output}",
+                f"❌ {failed}:\n\n{full_output}",
                 all_errors,
                 all_failing_files,
             )
 
+    def _parallel_file_check(
+        self,
+        files: list[Path],
+        single_file_checker: Callable[[Path], FileCheckResult],
+        file_type: str,
+    ) -> tuple[str, list[str], set[str]]:
+        """
+        Checks files in parallel using the provided single_file_checker.
+        Returns formatted output, error strings, and set of failing files.
+        """
+        if not files:
+            return f"✅ No {file_type} files to check", [], set()
+
+        print(f"Checking {len(files)} {file_type} files in parallel...")
+        checker_name = "js" if file_type == "JavaScript" else "ts"
+        ordered, estimates = self.records.longest_first(files)
+        start = time.perf_counter()
+        results = self.run_in_parallel(ordered, single_file_checker, checker_name)
+        self.records.record_makespan(checker_name, files, ordered, estimates, time.perf_counter() - start)
+        return self.summarize_results(results, len(files), file_type)
+
+    def _async_file_check(self, files: list[Path], file_type: str) -> tuple[str, list[str], set[str]]:
+        """
+        Checks files with one subprocess each, driven from an asyncio event loop with
+        bounded concurrency and a per-file timeout. Same return shape as _parallel_file_check.
+        """
+        if not files:
+            return f"✅ No {file_type} files to check", [], set()
+
+        checker_name = "js" if file_type == "JavaScript" else "ts"
+        results, uncached = self.records.split_cached(files, checker_name)
+        self.emit(results, checker_name)
+        if not uncached:
+            return self.summarize_results(results, len(files), file_type)
+
+        try:
+            command = self.cmd_discovery.command_vector("node" if checker_name == "js" else "tsc",
+                                                        self.config.temp_dir)
+        except CommandNotFoundError as e:
+            failures = [self.tooling_failure(f"Error checking {file.name}: {e}", self.records.relative_path(file),
+                                             checker_name) for file in uncached]
+            self.emit(failures, checker_name)
+            return self.summarize_results(results + failures, len(files), file_type)
+
+        def on_complete(file: Path, outcome: ProcessOutcome) -> None:
+            if outcome.duration:
+                self.records.record_check(file, checker_name, outcome.started, outcome.started + outcome.duration,
+                                          error=outcome.error)
+            if outcome.error or outcome.returncode is None:
+                result = self.tooling_failure(f"Error checking {file.name}: {outcome.error}",
+                                              self.records.relative_path(file), checker_name)
+            else:
+                if checker_name == "js":
+                    result = self.interpret_javascript_result(file, outcome.returncode, outcome.stderr)
+                else:
+                    result = self.interpret_typescript_result(file, outcome.returncode,
+                                                              outcome.stdout, outcome.stderr)
+                self.records.store_cached([file], [result], checker_name)
+            self.emit([result], checker_name)
+            results.append(result)
+
+        print(f"Checking {len(uncached)} {file_type} files with asyncio...")
+        ordered, estimates = self.records.longest_first(uncached)
+        self.scheduler.begin(checker_name, len(ordered))
+        runner = AsyncCheckRunner(self.config.temp_dir, self.scheduler, self.config.check_timeout,
+                                  self.scheduler.child_env(), self.stop)
+        start = time.perf_counter()
+        runner.run([(file, command + self.single_check_args(file, checker_name)) for file in ordered],
+                   on_complete)
+        self.records.record_makespan(checker_name, uncached, ordered, estimates, time.perf_counter() - start)
+        return self.summarize_results(results, len(files), file_type)
+
     def check_javascript_syntax(self) -> tuple[str, list[str], set[str]]:
         """Check JavaScript files for syntax errors using Node.js with parallel processing."""
         js_files = self.find_javascript_files()
+        if self.config.batch_mode:
+            return self.batch.run_javascript_check(js_files)
+        if self.config.executor == "async":
+            return self._async_file_check(js_files, "JavaScript")
         return self._parallel_file_check(
             js_files,
-            self.check_single_javascript_file,
+            self.records.cached("js", self.check_single_javascript_file),
             "JavaScript"
         )
 
     def run_typescript_check(self) -> tuple[str, list[str], set[str]]:
-        """Run TypeScript compiler on .ts files individually using parallel processing."""
+        """Run TypeScript compiler on .ts files individually (or in batches) using parallel processing."""
         print("Running TypeScript check...")
+        if self.config.executor == "host" and not self.config.batch_mode and self.records.examples_by_file:
+            return self.host.run([self.config.temp_dir / path for path, example
+                                  in self.records.examples_by_file.items() if example.is_typescript])
         ts_files = self.find_typescript_files()
+        if self.config.batch_mode:
+            return self.batch.run_typescript_check(ts_files)
+        if self.config.executor == "async":
+            return self._async_file_check(ts_files, "TypeScript")
         return self._parallel_file_check(
             ts_files,
-            self.check_single_typescript_file,
+            self.records.cached("ts", self.check_single_typescript_file),
             "TypeScript"
         )
-    def run_checks(self) -> tuple[str, str, list[str], set[str]]:
-        """Run both TypeScript and JavaScript checks and return combined results."""
-        print("Installing dependencies...")
+
+    def check_examples(self, examples: list[CodeExample], all_examples: list[CodeExample]) -> list[FileCheckResult]:
+        """
+        Check only the generated files of the given examples, reusing the provisioned
+        toolchain and the result cache from the last run_checks (used by watch mode).
+        """
+        self.records.track(all_examples)
+        self.stop.clear()
+        if self.records.result_cache is None:
+            self.records.result_cache = self._create_result_cache()
+
+        results: list[FileCheckResult] = []
+        if self.config.executor == "host":
+            results.extend(self.host.check_snippets([example for example in examples if example.is_typescript]))
+            examples = [example for example in examples if not example.is_typescript]
+        for checker_name, single_file_checker in (("ts", self.check_single_typescript_file),
+                                                  ("js", self.check_single_javascript_file)):
+            files = [self.config.temp_dir / example.filename for example in examples
+                     if example.code_type.value == checker_name]
+            if files:
+                results.extend(self.run_in_parallel(files, self.records.cached(checker_name, single_file_checker),
+                                                    checker_name))
+        self.records.save()
+        return results
+
+    def run_checks(self, examples: list[CodeExample] | None = None) -> tuple[str, str, list[str], DiagnosticIndex]:
+        """
+        Run both TypeScript and JavaScript checks and return the outputs, error strings
+        and an index of all diagnostics by file.
+        When the examples behind the generated files are given, results are cached per example.
+        """
+        self.diagnostics = DiagnosticIndex()
+        self.records.load(examples or [])
+        self.stop.clear()
+        self.checked = set()
+        self.setup_error = None
+        print("Provisioning dependencies...")
         try:
-            self.cmd_discovery.run_subprocess('npm', ['install'], self.config.temp_dir, check=True)
-        except (CommandNotFoundError, subprocess.CalledProcessError) as e:
+            with self.tracer.span("provision", "step"):
+                self.provisioner.provision()
+        except (CommandNotFoundError, subprocess.CalledProcessError, OSError) as e:
             error = f"ERROR: Could not install dependencies: {e}"
-            return error, error, [error], set()
-        ts_output, ts_errors, ts_failing = self.run_typescript_check()
-        js_output, js_errors, js_failing = self.check_javascript_syntax()
-        all_errors = ts_errors + js_errors
-        all_failing = ts_failing | js_failing
-        return ts_output, js_output, all_errors, all_failing
+            self.setup_error = error
+            self.diagnostics.add(Diagnostic("", None, None, "ERROR", error))
+            return error, error, [error], self.diagnostics
+        self.records.result_cache = self._create_result_cache()
+        with self.tracer.span("typescript checks", "step"):
+            ts_output, ts_errors, _ = self.run_typescript_check()
+        js_output, js_errors = FAIL_FAST_SKIPPED, []
+        if not self.stop.is_set():
+            with self.tracer.span("javascript checks", "step"):
+                js_output, js_errors, _ = self.check_javascript_syntax()
+        run_errors: list[str] = []
+        if self.config.execute and self.stop.is_set():
+            self.execution.output = FAIL_FAST_SKIPPED
+        elif self.config.execute:
+            with self.tracer.span("execution", "step"):
+                self.execution.output, run_errors, _ = self.execution.run(examples or [])
+        if self.records.result_cache is not None:
+            self.records.result_cache.prune()
+        self.records.save()
+        all_errors = ts_errors + js_errors + run_errors
+        return ts_output, js_output, all_errors, self.diagnostics
+
+    def close(self) -> None:
+        """Stop the compiler host, if one was started"""
+        self.host.close()
@@ -2,27 +2,57 @@
 Utility functions for command discovery and subprocess management
 """
 
+import json
+import os
+import shutil
 import subprocess
+import threading
 from pathlib import Path
 
 from models import CommandNotFoundError
+from scheduler import run_measured
+
+# npm/npx are .cmd shims on Windows and need a shell there; elsewhere the
+# argument vector is executed directly (shell=True would drop the arguments)
+USE_SHELL = os.name == 'nt'
 
 
 class CommandDiscovery:
     """Handles discovery and caching of npm/npx/node commands"""
 
-    def __init__(self) -> None:
+    def __init__(self, cache_path: Path | None = None) -> None:
         self._npm_cmd: str | None = None
         self._npx_cmd: str | None = None
         self._node_cmd: str | None = None
+        self._versions: dict[str, str] = {}
+        self._direct_tsc: dict[Path, list[str] | None] = {}
+        self._lock = threading.Lock()
+        self.cache_path = cache_path
+        self.use_direct = True
+
+    def _discovered(self) -> bool:
+        return (self._npm_cmd is not None and
+                self._npx_cmd is not None and
+                self._node_cmd is not None)
 
     def discover_commands(self) -> bool:
-        """Discover and cache npm, npx, and node commands"""
-        if (self._npm_cmd is not None and
-            self._npx_cmd is not None and
-            self._node_cmd is not None):
+        """Discover and cache npm, npx, and node commands (once, even when called from many threads)"""
+        if self._discovered():
             return True
 
+        with self._lock:
+            if self._discovered():
+                return True
+            if self._load_cached_discovery():
+                print(f"🔧 Using npm: {self._npm_cmd}, npx: {self._npx_cmd}, node: {self._node_cmd} (cached)")
+                return True
+            if not self._probe_commands():
+                return False
+            self._save_discovery()
+            return True
+
+    def _probe_commands(self) -> bool:
+        """Find working npm, npx and node commands by running each variant with --version"""
         npm_variants = ['npm', 'npm.cmd', 'npm.exe']
         npx_variants = ['npx', 'npx.cmd', 'npx.exe']
         node_variants = ['node', 'node.cmd', 'node.exe']
@@ -47,6 +77,63 @@ class CommandDiscovery:
         print(f"🔧 Using npm: {self._npm_cmd}, npx: {self._npx_cmd}, node: {self._node_cmd}")
         return True
 
+    @staticmethod
+    def _binary_stamp(command: str) -> dict[str, str | int] | None:
+        """Resolved location and mtime of a command on the current PATH"""
+        resolved = shutil.which(command)
+        if resolved is None:
+            return None
+        try:
+            return {"resolved": resolved, "mtime_ns": os.stat(resolved).st_mtime_ns}
+        except OSError:
+            return None
+
+    def _load_cached_discovery(self) -> bool:
+        """
+        Reuse commands and versions found by an earlier run, unless PATH or any of
+        the resolved binaries changed since they were probed.
+        """
+        if self.cache_path is None:
+            return False
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached["path"] != os.environ.get('PATH', ''):
+                return False
+            commands = cached["commands"]
+            for entry in commands.values():
+                if self._binary_stamp(entry["command"]) != entry["stamp"]:
+                    return False
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return False
+
+        self._npm_cmd = commands["npm"]["command"]
+        self._npx_cmd = commands["npx"]["command"]
+        self._node_cmd = commands["node"]["command"]
+        for entry in commands.values():
+            self._versions[entry["command"]] = entry["version"]
+        return True
+
+    def _save_discovery(self) -> None:
+        """Store the discovered commands with what invalidates them"""
+        if self.cache_path is None:
+            return
+        commands = {}
+        for cmd_type, command in (('npm', self._npm_cmd), ('npx', self._npx_cmd), ('node', self._node_cmd)):
+            assert command is not None  # Only saved after successful discovery
+            stamp = self._binary_stamp(command)
+            if stamp is None:
+                return  # Not resolvable on PATH (e.g. a shell builtin); probe again next time
+            commands[cmd_type] = {"command": command, "stamp": stamp, "version": self._versions.get(command, "")}
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = self.cache_path.with_suffix(".tmp")
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({"path": os.environ.get('PATH', ''), "commands": commands}, f, indent=2)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            print(f"⚠️  Warning: Could not save command discovery cache: {e}")
+
     def _find_working_command(self, variants: list[str]) -> str | None:
         """Find the first working command from a list of variants"""
         for cmd in variants:
@@ -55,13 +142,21 @@ class CommandDiscovery:
                                         capture_output=True,
                                         text=True,
                                         timeout=5,
-                                        shell=True)
+                                        shell=USE_SHELL)
                 if result.returncode == 0:
+                    self._versions[cmd] = result.stdout.strip()
                     return cmd
             except (subprocess.CalledProcessError, FileNotFoundError, subprocess.TimeoutExpired):
                 continue
         return None
 
+    def get_version(self, cmd_type: str) -> str:
+        """Return the --version output of a discovered command ('' if unknown)"""
+        if not self.discover_commands():
+            return ""
+        command = {'npm': self._npm_cmd, 'npx': self._npx_cmd, 'node': self._node_cmd}.get(cmd_type)
+        return self._versions.get(command, "") if command else ""
+
     def run_subprocess(self, cmd_type: str, args: list[str], temp_dir: Path, **kwargs) -> subprocess.CompletedProcess[str]:
         """Run subprocess with guaranteed non-None command"""
         if not self.discover_commands():
@@ -78,9 +173,68 @@ class CommandDiscovery:
 
         assert command is not None  # Guaranteed by discover_commands success
 
-        return subprocess.run([command] + args,
-                              cwd=temp_dir,
-                              capture_output=True,
-                              text=True,
-                              shell=True,
-                              **kwargs)
+        return run_measured([command] + args,
+                            cwd=temp_dir,
+                            shell=USE_SHELL,
+                            **kwargs)
+
+    def resolve_node(self) -> str | None:
+        """Absolute path of the node executable, or None if it is not on PATH"""
+        return shutil.which('node')
+
+    def resolve_tsc(self, temp_dir: Path) -> list[str] | None:
+        """
+        Argument vector that runs the test directory's local TypeScript compiler
+        directly with node, bypassing npx. Resolved once per test directory.
+        """
+        with self._lock:
+            if temp_dir not in self._direct_tsc:
+                node = self.resolve_node()
+                tsc_script = temp_dir / "node_modules" / "typescript" / "bin" / "tsc"
+                if node and tsc_script.exists():
+                    self._direct_tsc[temp_dir] = [node, str(tsc_script.resolve())]
+                else:
+                    self._direct_tsc[temp_dir] = None
+            return self._direct_tsc[temp_dir]
+
+    def run_direct(self, argv: list[str], cwd: Path, **kwargs) -> subprocess.CompletedProcess[str]:
+        """Exec an argument vector without a shell"""
+        return run_measured(argv,
+                            cwd=cwd,
+                            **kwargs)
+
+    def run_tsc(self, args: list[str], temp_dir: Path, **kwargs) -> subprocess.CompletedProcess[str]:
+        """Run the local TypeScript compiler directly, falling back to npx"""
+        direct = self.resolve_tsc(temp_dir) if self.use_direct else None
+        if direct is None:
+            return self.run_subprocess('npx', ['tsc'] + args, temp_dir, **kwargs)
+        return self.run_direct(direct + args, temp_dir, **kwargs)
+
+    def run_node(self, args: list[str], temp_dir: Path, **kwargs) -> subprocess.CompletedProcess[str]:
+        """Run node directly, falling back to the discovered node command"""
+        node = self.resolve_node() if self.use_direct else None
+        if node is None:
+            return self.run_subprocess('node', args, temp_dir, **kwargs)
+        return self.run_direct([node] + args, temp_dir, **kwargs)
+
+    def command_vector(self, cmd_type: str, temp_dir: Path) -> list[str]:
+        """
+        Base argument vector for 'tsc' or 'node' that can be exec'd without a shell:
+        the direct invocation when available, otherwise the discovered command.
+        """
+        if cmd_type == 'tsc':
+            direct = self.resolve_tsc(temp_dir) if self.use_direct else None
+            if direct is not None:
+                return direct
+        elif cmd_type == 'node':
+            node = self.resolve_node() if self.use_direct else None
+            if node is not None:
+                return [node]
+        else:
+            raise ValueError(f"Unknown command type: {cmd_type}")
+
+        if not self.discover_commands():
+            raise CommandNotFoundError("Could not discover npm/npx/node commands")
+        command = self._npx_cmd if cmd_type == 'tsc' else self._node_cmd
+        assert command is not None  # Guaranteed by discover_commands success
+        return [shutil.which(command) or command] + (['tsc'] if cmd_type == 'tsc' else [])
@@ -0,0 +1,63 @@
+"""
+Polling watcher for the book's markdown chapters, used by --watch
+"""
+
+import time
+from pathlib import Path
+
+from extractor import CodeExtractor
+from models import CodeExample
+
+# Seconds between checks of the chapter files' modification times
+POLL_INTERVAL = 0.25
+
+
+def changed_examples(previous: list[CodeExample], current: list[CodeExample]) -> list[CodeExample]:
+    """Examples of a chapter whose code did not appear in its previous version (added or edited)"""
+    known = {example.identity for example in previous}
+    return [example for example in current if example.identity not in known]
+
+
+class BookWatcher:
+    """Detects added, edited and deleted chapter files by polling their mtime and size"""
+
+    def __init__(self, extractor: CodeExtractor) -> None:
+        self.extractor = extractor
+        self._stamps: dict[Path, tuple[int, int]] = {}
+
+    def snapshot(self) -> dict[Path, tuple[int, int]]:
+        """Current (mtime, size) of every chapter file being tested"""
+        stamps: dict[Path, tuple[int, int]] = {}
+        for markdown_file in self.extractor.find_markdown_files():
+            try:
+                stat = markdown_file.stat()
+            except OSError:
+                continue
+            stamps[markdown_file] = (stat.st_mtime_ns, stat.st_size)
+        return stamps
+
+    def start(self) -> None:
+        """Take the baseline that later changes are compared against"""
+        self._stamps = self.snapshot()
+
+    def wait_for_changes(self) -> tuple[list[Path], list[Path]]:
+        """
+        Block until chapter files change and return (added or edited, deleted).
+        Waits for one quiet poll first so a save in progress is not read half-written.
+        """
+        while True:
+            time.sleep(POLL_INTERVAL)
+            current = self.snapshot()
+            if current == self._stamps:
+                continue
+            while True:
+                time.sleep(POLL_INTERVAL / 2)
+                settled = self.snapshot()
+                if settled == current:
+                    break
+                current = settled
+
+            changed = [path for path, stamp in current.items() if self._stamps.get(path) != stamp]
+            deleted = [path for path in self._stamps if path not in current]
+            self._stamps = current
+            return changed, deleted